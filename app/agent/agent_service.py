@@ -1,17 +1,33 @@
 from sqlalchemy.orm import Session
 from typing import Dict, Any
+import hashlib
 import json
 from datetime import datetime
 import logging
+import os
+import uuid
 
 from langchain_openai import ChatOpenAI
 from langchain.agents import create_tool_calling_agent, AgentExecutor
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnableLambda
 
-from app.agent.memory import DBMemoryStore
+from app.agent.memory import DBMemoryStore, prune_tool_records
 from app.agent.session_state import DBSessionStateStore
 from app.agent.langchain_tools import get_langchain_tools
-from langchain_core.messages import trim_messages
+from langchain_core.messages import AIMessage, trim_messages
+from langchain_core.tools import ToolException
+from pydantic import ValidationError
+from pydantic.v1 import ValidationError as ValidationErrorV1
+from app.agent.callbacks import StepCollector, TurnCallbackHandler
+from app.agent.response_cache import ResponseCache, build_response_cache
+from app.agent.session_lock import SessionLock
+from app.agent.model_router import FAST, FULL, FAST_MODEL, FULL_MODEL, get_router
+from app.agent.hedged_llm import BUDGET_FILLER, HedgedChatModel, TurnBudgetExceeded, turn_budget
+from app.agent.prefetch import Prefetcher
+from app.services.logging_service import log_agent_action_service
+from app.core.telemetry import turn_trace
+from app.db import models
 
 logger = logging.getLogger(__name__)
 
@@ -94,6 +110,10 @@ When a tool returns structured data:
 - Example: "ahmed at gmail dot com" must be interpreted as "ahmed@gmail.com".
 - Always confirm the full email address back to the user before saving.
 
+17. REUSE TOOL RESULTS:
+- Tool calls and results from earlier turns are part of the chat history.
+- Do not call 'lookup_patient', 'check_availability' or 'get_patient_appointments' again with the same arguments if the answer is already in the history, unless an appointment was booked or cancelled since then.
+
 LOGIC FLOW:
 1. IDENTIFICATION: Obtain 'phone_number' and call 'lookup_patient'.
 2. REGISTRATION: 
@@ -124,6 +144,8 @@ LOGIC FLOW:
             → Ask for confirmation.
         - If NOT available:
             → Suggest the closest available times (MAX 2 options).
+        - If none of the options suit the patient (or the day is fully booked):
+            → Offer to add them to the waitlist and call 'join_waitlist' if they agree.
 
     NEVER list all available slots unless the user explicitly asks.
    - POST-BOOKING: Transition to asking for notification preference (Email or WhatsApp).
@@ -139,6 +161,9 @@ CLINIC HOURS: The clinic is open Monday through Friday, 9:00 AM to 5:00 PM. We a
 Respond in natural language only.
 """
 
+# Changes whenever the prompt text changes, invalidating cached replies
+PROMPT_VERSION = hashlib.sha256(SYSTEM_PROMPT.encode()).hexdigest()[:12]
+
 
 # =========================
 # Agent Service
@@ -150,19 +175,35 @@ class AgentService:
         db: Session,
         memory_store: Any = None,
         state_store: Any = None,
+        llm: Any = None,
+        response_cache: Any = None,
+        fast_llm: Any = None,
+        router: Any = None,
     ):
         self.db = db
         self.memory_store = memory_store or DBMemoryStore(db)
         self.state_store = state_store or DBSessionStateStore(db)
+        self.response_cache = response_cache if response_cache is not None else build_response_cache(db)
 
 
-        # LLM
-        self.llm = ChatOpenAI(
-            model="gpt-4o",
+        # LLM (injectable so benchmarks can use a scripted fake model)
+        self.llm = llm or ChatOpenAI(
+            model=FULL_MODEL,
             temperature=0,
             stream_usage=True
         )
 
+        # Fast model for simple turns. With an injected `llm` and no
+        # `fast_llm`, every turn runs on `llm` (keeps benchmarks unchanged).
+        self.router = router or get_router()
+        self.fast_llm = fast_llm
+        if self.fast_llm is None and llm is None and os.getenv("MODEL_ROUTING_ENABLED", "true").lower() != "false":
+            self.fast_llm = ChatOpenAI(
+                model=FAST_MODEL,
+                temperature=0,
+                stream_usage=True
+            )
+
         self.trimmer = trim_messages(
             max_tokens=1000,
             strategy="last",
@@ -193,35 +234,183 @@ class AgentService:
         session_id: str,
         user_message: str
     ) -> Dict[str, Any]:
+
+        # Turns of the same session run one at a time, in arrival order,
+        # so concurrent messages cannot overwrite each other's session_state
+        lock = SessionLock(session_id, self.db.get_bind())
+        with turn_trace(session_id) as turn:
+            with turn.phase("session_lock"):
+                lock.acquire()
+            try:
+                result = self._run_turn(session_id, user_message, turn)
+            finally:
+                lock.release()
+
+        self._record_turn(turn)
+        return result
+
+    def _run_turn(self, session_id: str, user_message: str, turn) -> Dict[str, Any]:
         
         logger.debug(f"BEFORE RUN - SESSION: {session_id}")
         
-        session_state = self.state_store.get(session_id)
-        chat_history = self.memory_store.get(session_id)
+        with turn.phase("state_load"):
+            session_state = self.state_store.get(session_id)
+        with turn.phase("memory_load"):
+            chat_history = self.memory_store.get(session_id)
         
         logger.debug(f"STATE LOADED: {json.dumps(session_state, indent=2)}")
         
-        
-        trimmed_history = self.trimmer.invoke(chat_history)
+        with turn.phase("trim"):
+            trimmed_history = self.trimmer.invoke(prune_tool_records(chat_history))
         
         current_date_str = datetime.now().strftime("%A, %B %d, %Y")
 
 
-        self.memory_store.save(session_id, "user", user_message)
+        with turn.phase("persist"):
+            self.memory_store.save(session_id, "user", user_message)
+
+        # Response cache: repeated turns with identical context skip the LLM entirely
+        cache_key = cache_scope = None
+        state_free = not session_state and not chat_history
+        if self.response_cache is not None:
+            cache_scope = ResponseCache.scope(PROMPT_VERSION, current_date_str)
+            cache_key = ResponseCache.make_key(cache_scope, session_state, trimmed_history, user_message)
+            with turn.phase("cache_lookup"):
+                cached_reply = self.response_cache.lookup(cache_key, cache_scope, user_message, state_free)
+
+            if cached_reply is not None:
+                turn.attributes["response_cache"] = "hit"
+                with turn.phase("persist"):
+                    self.memory_store.save(session_id, "assistant", cached_reply)
+                    self.state_store.set(session_id, session_state)
+                return {"reply": cached_reply,
+                        "session_state": session_state}
 
+        state_before = json.dumps(session_state, sort_keys=True, default=str)
+
+
+        # Start the lookups this message will probably trigger, so they
+        # run while the model is still deciding to call them
+        prefetch = Prefetcher.start(user_message, session_state, trimmed_history)
 
         # Build tools WITH state reference
         tools = get_langchain_tools(
             db=self.db,
-            session_state=session_state
+            session_state=session_state,
+            prefetch=prefetch,
+            session_id=session_id
         )
 
+        inputs = {
+            "input": user_message,
+            "chat_history": trimmed_history,
+            "current_date": current_date_str,
+        }
+
+        # One deadline across every LLM call of the turn (both tiers, all
+        # iterations); past it the caller gets a short filler instead
+        steps = StepCollector()
+        try:
+            with turn_budget():
+                result = self._answer(session_id, user_message, session_state, trimmed_history, tools, inputs, turn, steps)
+        except TurnBudgetExceeded as e:
+            logger.warning(f"Turn budget exhausted for session {session_id}: {e}")
+            turn.attributes["budget_exhausted"] = True
+            # Tools that already ran (a booking, say) still get remembered
+            # and still keep the turn out of the response cache
+            result = {"output": BUDGET_FILLER, "intermediate_steps": list(steps.steps), "degraded": True}
+        finally:
+            prefetch.finish(turn)
+
+        reply = result["output"]
+        turn.attributes["repeat_tool_calls"] = self._repeat_tool_calls(chat_history, result.get("intermediate_steps", []))
+
+        if self.response_cache is not None:
+            # Only pure conversational turns are cacheable; anything that
+            # called a tool or changed session_state must always run live.
+            mutated = json.dumps(session_state, sort_keys=True, default=str) != state_before
+            if result.get("intermediate_steps") or mutated or result.get("degraded"):
+                self.response_cache.bypass()
+                turn.attributes["response_cache"] = "bypass"
+            else:
+                with turn.phase("cache_store"):
+                    self.response_cache.store(cache_key, cache_scope, user_message, reply, state_free)
+                turn.attributes["response_cache"] = "miss"
+
+        # Persist memory + state. Tool calls and results go in too, so later
+        # turns can reuse what a tool already returned instead of calling it again
+        with turn.phase("persist"):
+            self.memory_store.save_tool_steps(session_id, result.get("intermediate_steps", []))
+            self.memory_store.save(session_id, "assistant", reply)
+            self.state_store.set(session_id, session_state)
+
+
+
+        logger.debug(f"AFTER RUN - STATE SAVED: {json.dumps(session_state, indent=2)}")
+        
+
+        response = {"reply": reply,
+                    "session_state": session_state}
+        if result.get("degraded"):
+            response["degraded"] = True
+        return response
+
+    def _answer(self, session_id, user_message, session_state, trimmed_history, tools, inputs, turn, steps) -> Dict[str, Any]:
+        """
+        Runs the turn on the routed model tier, escalating fast-model failures.
+        `steps` collects every tool run across both tiers; the result carries
+        all of them.
+        """
+        tier, reason = FULL, "routing_disabled"
+        if self.fast_llm is not None:
+            tier, reason = self.router.route(user_message, session_state, trimmed_history)
+
+        escalation = None
+        fast_calls = []
+        if tier == FAST:
+            first_call = len(turn.llm_calls)
+            try:
+                result = self._run_agent(self.fast_llm, tools, inputs, session_state, turn, steps)
+                escalation = self._invalid_tool_call(result, tools)
+            except (ValidationError, ValidationErrorV1, ToolException) as e:
+                escalation = type(e).__name__
+            fast_calls = turn.llm_calls[first_call:]
+            self.router.observe(FAST, fast_calls)
+
+        if tier == FULL or escalation:
+            done = []
+            if escalation:
+                # Tools the fast model already ran are handed to the full model
+                # as completed calls, so it picks up from there instead of
+                # redoing them (notifications and waitlist joins have no guard)
+                logger.info(f"Escalating turn to full model: {escalation}")
+                self.router.escalated(escalation)
+                done = self._completed_calls(steps.steps, tools)
+            first_call = len(turn.llm_calls)
+            result = self._run_agent(self.llm, tools, inputs, session_state, turn, steps, done)
+            self.router.observe(FULL, turn.llm_calls[first_call:])
+
+        result["intermediate_steps"] = list(steps.steps)
+
+        turn.attributes["model_tier"] = tier
+        if self.fast_llm is not None:
+            self._log_routing(session_id, session_state, tier, reason, escalation, fast_calls)
+        return result
+
+    def _run_agent(self, llm, tools, inputs: Dict[str, Any], session_state: Dict[str, Any], turn,
+                   steps: StepCollector, done=()) -> Dict[str, Any]:
         # Build agent dynamically (important!)
         agent = create_tool_calling_agent(
-            llm=self.llm,
+            llm=HedgedChatModel(inner=llm),
             tools=tools,
             prompt=self.prompt,
         )
+        if done:
+            # Put the already-executed calls ahead of this run's own scratchpad
+            done = list(done)
+            agent = RunnableLambda(
+                lambda x: {**x, "intermediate_steps": done + list(x["intermediate_steps"])}
+            ) | agent
 
         executor = AgentExecutor(
             agent=agent,
@@ -229,28 +418,97 @@ class AgentService:
             verbose=True,
             handle_parsing_errors=True,
             max_iterations=10,
+            return_intermediate_steps=True,
         )
 
         # Invoke
-        result = executor.invoke(
-            {
-                "input": user_message,
-                "chat_history": trimmed_history,
-                "session_state": json.dumps(session_state),
-                "current_date": current_date_str,
-            }
+        with turn.phase("agent"):
+            return executor.invoke(
+                {**inputs, "session_state": json.dumps(session_state)},
+                config={"callbacks": [TurnCallbackHandler(turn), steps]},
+            )
+
+    @staticmethod
+    def _completed_calls(steps, tools):
+        """
+        Valid tool runs as scratchpad steps, each re-issued as its own
+        single-call AI message so every call has exactly one result (the
+        original message may also hold the invalid call that caused escalation).
+        """
+        from langchain.agents.output_parsers.tools import ToolAgentAction
+
+        names = {t.name for t in tools}
+        completed = []
+        for action, observation in steps:
+            if action.tool not in names:
+                continue
+            call_id = getattr(action, "tool_call_id", None) or f"call_{uuid.uuid4().hex[:24]}"
+            args = action.tool_input if isinstance(action.tool_input, dict) else {"input": action.tool_input}
+            message = AIMessage(content="", tool_calls=[{"name": action.tool, "args": args, "id": call_id}])
+            completed.append((
+                ToolAgentAction(tool=action.tool, tool_input=args, log=action.log,
+                                message_log=[message], tool_call_id=call_id),
+                observation,
+            ))
+        return completed
+
+    @staticmethod
+    def _repeat_tool_calls(chat_history, steps) -> int:
+        """Tool calls this turn that an earlier turn already made with the same arguments."""
+        seen = {
+            (call["name"], json.dumps(call["args"], sort_keys=True, default=str))
+            for m in chat_history if isinstance(m, dict)
+            for call in m.get("tool_calls", [])
+        }
+        return sum(
+            (action.tool, json.dumps(action.tool_input, sort_keys=True, default=str)) in seen
+            for action, _observation in steps
         )
 
-        reply = result["output"]
-
-        # Persist memory + state
-        self.memory_store.save(session_id, "assistant", reply)
-        self.state_store.set(session_id, session_state)
-
-
-
-        logger.debug(f"AFTER RUN - STATE SAVED: {json.dumps(session_state, indent=2)}")
-        
-
-        return {"reply": reply,
-                "session_state": session_state}
+    @staticmethod
+    def _invalid_tool_call(result: Dict[str, Any], tools) -> Any:
+        """Cause for escalation if the fast model produced an unusable tool call."""
+        names = {t.name for t in tools}
+        for action, _observation in result.get("intermediate_steps", []):
+            if action.tool == "_Exception":
+                return "unparseable_tool_call"
+            if action.tool not in names:
+                return "unknown_tool"
+        return None
+
+    def _log_routing(self, session_id, session_state, tier, reason, escalation, fast_calls) -> None:
+        """Routing decision plus estimated savings, for tuning the rules."""
+        decision = {"tier": tier, "reason": reason, "escalated": escalation}
+        if tier == FAST:
+            decision.update(self.router.savings(fast_calls, escalated=bool(escalation)))
+        try:
+            log_agent_action_service(
+                patient_id=session_state.get("patient_id"),
+                log_context=f"[Model Router] Session {session_id}",
+                agent_action="MODEL_ROUTED",
+                system_decision=json.dumps(decision),
+                confidence_score=None,
+                db=self.db,
+            )
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Failed to log routing decision: {e}")
+
+    def _record_turn(self, turn) -> None:
+        """Stores the per-turn latency summary; never fails the chat turn."""
+        summary = turn.summary()
+        try:
+            self.db.add(models.AgentTurn(
+                session_id=turn.session_id,
+                total_ms=summary["total_ms"],
+                llm_calls=len(turn.llm_calls),
+                tool_calls=len(turn.tool_calls),
+                db_queries=turn.db_queries,
+                prompt_tokens=turn.prompt_tokens,
+                completion_tokens=turn.completion_tokens,
+                breakdown=summary,
+            ))
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.warning(f"Could not record turn timings: {e}")
@@ -0,0 +1,124 @@
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from app.core.telemetry import LLM_CALL_SECONDS, LLM_TOKENS, TOOL_CALL_SECONDS, TurnTrace
+
+
+class TurnCallbackHandler(BaseCallbackHandler):
+    """
+    Records each LLM and tool call of an AgentExecutor run into a TurnTrace,
+    including token usage (from `stream_usage`) and the DB/external time
+    spent inside each tool.
+    """
+
+    def __init__(self, turn: TurnTrace):
+        self.turn = turn
+        self._llm_started: Dict[UUID, tuple] = {}
+        self._tool_started: Dict[UUID, tuple] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs) -> None:
+        model = (kwargs.get("invocation_params") or {}).get("model") or (kwargs.get("metadata") or {}).get("ls_model_name", "unknown")
+        self._llm_started[run_id] = (time.perf_counter(), model)
+
+    def on_llm_end(self, response, *, run_id: UUID, **kwargs) -> None:
+        started, model = self._llm_started.pop(run_id, (None, "unknown"))
+        if started is None:
+            return
+        elapsed = time.perf_counter() - started
+
+        usage = {}
+        try:
+            usage = response.generations[0][0].message.usage_metadata or {}
+        except (AttributeError, IndexError):
+            pass
+        if not usage and response.llm_output:
+            token_usage = response.llm_output.get("token_usage") or {}
+            usage = {
+                "input_tokens": token_usage.get("prompt_tokens", 0),
+                "output_tokens": token_usage.get("completion_tokens", 0),
+            }
+
+        prompt_tokens = usage.get("input_tokens", 0)
+        completion_tokens = usage.get("output_tokens", 0)
+
+        self.turn.llm_calls.append({
+            "model": model,
+            "ms": round(elapsed * 1000, 1),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+        })
+        self.turn.phases["llm"] = self.turn.phases.get("llm", 0.0) + elapsed
+        LLM_CALL_SECONDS.labels(model=model).observe(elapsed)
+        LLM_TOKENS.labels(kind="prompt").inc(prompt_tokens)
+        LLM_TOKENS.labels(kind="completion").inc(completion_tokens)
+
+    def on_llm_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self._llm_started.pop(run_id, None)
+
+    def on_tool_start(self, serialized, input_str, *, run_id: UUID, **kwargs) -> None:
+        name = (serialized or {}).get("name", "unknown")
+        self._tool_started[run_id] = (
+            time.perf_counter(),
+            name,
+            self.turn.db_queries,
+            self.turn.db_seconds,
+            dict(self.turn.external_seconds),
+        )
+
+    def on_tool_end(self, output, *, run_id: UUID, **kwargs) -> None:
+        self._finish_tool(run_id, error=None)
+
+    def on_tool_error(self, error, *, run_id: UUID, **kwargs) -> None:
+        self._finish_tool(run_id, error=str(error))
+
+    def _finish_tool(self, run_id: UUID, error: Optional[str]) -> None:
+        entry = self._tool_started.pop(run_id, None)
+        if entry is None:
+            return
+        started, name, db_queries, db_seconds, external = entry
+        elapsed = time.perf_counter() - started
+
+        call = {
+            "tool": name,
+            "ms": round(elapsed * 1000, 1),
+            "db_queries": self.turn.db_queries - db_queries,
+            "db_ms": round((self.turn.db_seconds - db_seconds) * 1000, 1),
+        }
+        for service, seconds in self.turn.external_seconds.items():
+            spent = seconds - external.get(service, 0.0)
+            if spent:
+                call[f"{service}_ms"] = round(spent * 1000, 1)
+        if error:
+            call["error"] = error
+
+        self.turn.tool_calls.append(call)
+        self.turn.phases["tools"] = self.turn.phases.get("tools", 0.0) + elapsed
+        TOOL_CALL_SECONDS.labels(tool=name).observe(elapsed)
+
+
+class StepCollector(BaseCallbackHandler):
+    """
+    Collects the (action, observation) pairs of every tool an AgentExecutor
+    runs, as they finish. Unlike the executor's own `intermediate_steps`
+    they survive a run that is cut short (turn deadline, escalation to the
+    full model), and one collector can span several runs of a turn.
+    """
+
+    def __init__(self):
+        self.steps: List[Tuple[Any, Any]] = []
+        self._pending: List[Any] = []
+
+    def on_agent_action(self, action, **kwargs) -> None:
+        # The executor reports each action right before running its tool
+        self._pending.append(action)
+
+    def on_tool_end(self, output, **kwargs) -> None:
+        if self._pending:
+            self.steps.append((self._pending.pop(0), output))
+
+    def on_tool_error(self, error, **kwargs) -> None:
+        if self._pending:
+            self._pending.pop(0)
@@ -0,0 +1,218 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatResult
+from prometheus_client import Counter
+
+logger = logging.getLogger(__name__)
+
+# Wall-clock budget for all LLM calls of one chat turn (voice needs an answer fast)
+TURN_DEADLINE_SECONDS = float(os.getenv("TURN_DEADLINE_SECONDS", "8"))
+HEDGING_ENABLED = os.getenv("LLM_HEDGING_ENABLED", "true").lower() != "false"
+# Hedge after this long until a model has enough samples for a p95
+HEDGE_DEFAULT_SECONDS = float(os.getenv("LLM_HEDGE_DEFAULT_SECONDS", "4"))
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+# A hedge that cannot come back before the deadline only burns tokens
+HEDGE_MIN_REMAINING_SECONDS = 1.0
+
+BUDGET_FILLER = os.getenv(
+    "TURN_BUDGET_FILLER",
+    "I'm still working on that. Could you give me a moment and then say 'continue'?",
+)
+
+LLM_HEDGES = Counter(
+    "agent_llm_hedges_total", "Duplicate LLM requests sent for slow calls, by which response won", ["winner"],
+)
+BUDGET_EXHAUSTED = Counter(
+    "agent_turn_budget_exhausted_total", "Chat turns that ran out of their LLM deadline budget",
+)
+HEDGES_SKIPPED = Counter(
+    "agent_llm_hedges_skipped_total", "Slow LLM calls not hedged because all hedge slots were busy",
+)
+
+_deadline: ContextVar[Optional[float]] = ContextVar("turn_deadline", default=None)
+
+# Each duplicate request holds one of these slots until the provider
+# answers it, even after it has lost. Primaries never wait for a slot, so
+# slow leftovers cannot delay new calls and feed back into more hedging;
+# when the slots are full, slow calls just go unhedged.
+_hedge_slots = threading.BoundedSemaphore(int(os.getenv("LLM_HEDGE_POOL", "32")))
+
+
+def _spawn(fn, *args, on_done=None) -> Future:
+    """Runs fn on its own daemon thread; the call outlives the caller if it gives up."""
+    future: Future = Future()
+
+    def run():
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            if on_done is not None:
+                on_done()
+
+    threading.Thread(target=run, name="llm-call", daemon=True).start()
+    return future
+
+
+class TurnBudgetExceeded(Exception):
+    """The turn's LLM deadline passed before the model answered."""
+
+
+@contextmanager
+def turn_budget(seconds: float = TURN_DEADLINE_SECONDS):
+    """Every HedgedChatModel call inside the block shares one deadline."""
+    token = _deadline.set(time.monotonic() + seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_budget() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+# =========================
+# Latency Tracking
+# =========================
+
+class LatencyTracker:
+    """Rolling window of call latencies per model, for the hedging threshold."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, model: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.window)).append(seconds)
+
+    def hedge_after(self, model: str) -> float:
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_SECONDS
+        return samples[min(len(samples) - 1, int(len(samples) * HEDGE_PERCENTILE))]
+
+
+_tracker = LatencyTracker()
+
+
+def get_latency_tracker() -> LatencyTracker:
+    return _tracker
+
+
+# =========================
+# Wrapper
+# =========================
+
+class HedgedChatModel(BaseChatModel):
+    """
+    Wraps a chat model so that each call:
+
+    - fails with TurnBudgetExceeded once the turn's deadline (set with
+      `turn_budget`) has passed, instead of waiting out a slow response;
+    - sends one duplicate request when the first has taken longer than the
+      model's recent p95, and returns whichever answers first.
+
+    LLM calls have no side effects, so a duplicate is only extra tokens.
+    Outside a `turn_budget` block calls are hedged but have no deadline.
+    """
+
+    inner: BaseChatModel
+    # Extra _generate kwargs of a RunnableBinding the inner model's
+    # bind_tools returned (e.g. ChatOpenAI's formatted `tools`)
+    inner_kwargs: Dict[str, Any] = {}
+    hedging: bool = HEDGING_ENABLED
+
+    @property
+    def _llm_type(self) -> str:
+        return f"hedged-{self.inner._llm_type}"
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self.inner, "model_name", None) or getattr(self.inner, "model", None) or self.inner._llm_type
+
+    @property
+    def _identifying_params(self) -> Dict[str, Any]:
+        # Reported as invocation_params["model"] to the turn callbacks
+        return {"model": self.model_name}
+
+    def bind_tools(self, tools, **kwargs):
+        # Keep whatever the wrapped model's bind_tools produced: a copy of
+        # the model with the tools on it, or a RunnableBinding whose kwargs
+        # go into every _generate call
+        bound = self.inner.bind_tools(tools, **kwargs)
+        if isinstance(bound, BaseChatModel):
+            return self.model_copy(update={"inner": bound})
+        if isinstance(getattr(bound, "bound", None), BaseChatModel):
+            return self.model_copy(update={
+                "inner": bound.bound,
+                "inner_kwargs": {**self.inner_kwargs, **bound.kwargs},
+            })
+        raise TypeError(f"Cannot hedge {type(bound).__name__} returned by {self.model_name}.bind_tools")
+
+    def get_num_tokens(self, text: str) -> int:
+        return self.inner.get_num_tokens(text)
+
+    def get_num_tokens_from_messages(self, messages: List[BaseMessage], tools=None) -> int:
+        return self.inner.get_num_tokens_from_messages(messages)
+
+    def _call(self, messages, stop, kwargs) -> ChatResult:
+        started = time.perf_counter()
+        result = self.inner._generate(messages, stop=stop, **{**self.inner_kwargs, **kwargs})
+        get_latency_tracker().observe(self.model_name, time.perf_counter() - started)
+        return result
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        remaining = remaining_budget()
+        if remaining is not None and remaining <= 0:
+            BUDGET_EXHAUSTED.inc()
+            raise TurnBudgetExceeded("Turn deadline passed before the LLM call")
+
+        primary = _spawn(self._call, messages, stop, kwargs)
+        hedge_after = get_latency_tracker().hedge_after(self.model_name)
+        first_wait = hedge_after if remaining is None else min(hedge_after, remaining)
+
+        done, _ = wait([primary], timeout=first_wait)
+        if done:
+            return primary.result()
+
+        pending = [primary]
+        remaining = remaining_budget()
+        hedged = self.hedging and (remaining is None or remaining > HEDGE_MIN_REMAINING_SECONDS)
+        if hedged and not _hedge_slots.acquire(blocking=False):
+            HEDGES_SKIPPED.inc()
+            hedged = False
+        if hedged:
+            logger.info(f"LLM call to {self.model_name} exceeded {hedge_after:.2f}s, sending a hedged request")
+            pending.append(_spawn(self._call, messages, stop, kwargs, on_done=_hedge_slots.release))
+
+        while True:
+            done, _ = wait(pending, timeout=remaining_budget(), return_when=FIRST_COMPLETED)
+            if not done:
+                BUDGET_EXHAUSTED.inc()
+                raise TurnBudgetExceeded(f"No answer from {self.model_name} within the turn deadline")
+            future = done.pop()
+            pending.remove(future)
+            if future.exception() is not None and pending:
+                # One request failed; the other may still answer
+                continue
+            if hedged and future.exception() is None:
+                LLM_HEDGES.labels(winner="primary" if future is primary else "hedge").inc()
+            return future.result()
@@ -1,7 +1,9 @@
 from langchain.tools import StructuredTool
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+from app.agent.tool_memo import availability_dependencies, get_tool_memo, patient_dependencies
+from app.services.appointment_service import log_appointments_retrieval
 from app.tools.agent_tools import (
     lookup_patient_tool,
     create_patient_tool,
@@ -9,14 +11,59 @@ from app.tools.agent_tools import (
     create_appointment_tool,
     send_notification_tool,
     get_patient_appointments_tool,
-    cancel_appointment_tool       
+    cancel_appointment_tool,
+    join_waitlist_tool
 )
 
 
 def get_langchain_tools(
     db: Session,
-    session_state: Dict[str, Any]
+    session_state: Dict[str, Any],
+    prefetch: Any = None,
+    session_id: Optional[str] = None
 ):
+    # Repeat reads within a session are served from the tool memo until a
+    # write touches the day / patient they depend on
+    memo = get_tool_memo() if session_id else None
+
+    def check_availability(appointment_date, service_type_id, requested_time=None):
+        def compute():
+            return check_availability_tool(
+                appointment_date=appointment_date,
+                service_type_id=service_type_id,
+                requested_time=requested_time,
+                db=db,
+                session_state=session_state,
+                prefetch=prefetch
+            )
+
+        if memo is None:
+            return compute()
+        args = (str(appointment_date).strip(), str(service_type_id).strip().lower(), (requested_time or "").strip())
+        result, _ = memo.call(db, session_id, "check_availability", args,
+                              availability_dependencies(appointment_date), compute)
+        return result
+
+    def get_patient_appointments(patient_id):
+        def compute():
+            return get_patient_appointments_tool(
+                patient_id=patient_id,
+                db=db,
+                session_state=session_state
+            )
+
+        if memo is None or not patient_id:
+            return compute()
+        result, hit = memo.call(db, session_id, "get_patient_appointments", (str(patient_id),),
+                                patient_dependencies(patient_id), compute)
+        if hit:
+            # Every read of a patient's appointments is audited, memoized or not
+            log_appointments_retrieval(db, int(patient_id), len(result.get("appointments", [])), source="session memo")
+            if result.get("appointments"):
+                # The tool's side effect: cancel_appointment picks from this list
+                session_state["pending_appointments"] = result["appointments"]
+        return result
+
     return [
         StructuredTool.from_function(
             name="lookup_patient",
@@ -25,7 +72,8 @@ def get_langchain_tools(
                 lookup_patient_tool(
                     phone_number=phone_number,
                     db=db,
-                    session_state=session_state
+                    session_state=session_state,
+                    prefetch=prefetch
                 )
         ),
 
@@ -54,14 +102,7 @@ def get_langchain_tools(
                 "and optionally requested_time (HH:MM). "
                 "Returns whether the requested time is available or suggests closest times."
             ),
-            func=lambda appointment_date, service_type_id, requested_time=None:
-                check_availability_tool(
-                    appointment_date=appointment_date,
-                    service_type_id=service_type_id,
-                    requested_time=requested_time,
-                    db=db,
-                    session_state=session_state
-                )
+            func=check_availability
         ),
 
         StructuredTool.from_function(
@@ -84,12 +125,7 @@ def get_langchain_tools(
                 "Retrieves upcoming appointments and presents them as a numbered list. "
                 "Ask the user which number they want to cancel."
             ),
-            func=lambda patient_id:
-                get_patient_appointments_tool(
-                    patient_id=patient_id,
-                    db=db,
-                    session_state=session_state
-                )
+            func=get_patient_appointments
         ),
 
         StructuredTool.from_function(
@@ -119,5 +155,25 @@ def get_langchain_tools(
                 )
         ),
 
+        StructuredTool.from_function(
+            name="join_waitlist",
+            description=(
+                "Add the patient to the waitlist when no suitable slot is available. "
+                "Requires patient_id, service_type_id and date_from (YYYY-MM-DD); "
+                "optionally date_to (YYYY-MM-DD) and preferred_time (HH:MM). "
+                "The patient is emailed automatically if a matching slot frees up."
+            ),
+            func=lambda patient_id, service_type_id, date_from, date_to=None, preferred_time=None:
+                join_waitlist_tool(
+                    patient_id=patient_id,
+                    service_type_id=service_type_id,
+                    date_from=date_from,
+                    date_to=date_to,
+                    preferred_time=preferred_time,
+                    db=db,
+                    session_state=session_state
+                )
+        ),
+
     ]
 
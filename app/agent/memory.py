@@ -1,9 +1,104 @@
+import json
+import os
+import uuid
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Any, List, Dict, Tuple
 from sqlalchemy.orm import Session
 
 from app.db import models
 
+# Tool outputs are replayed into every later prompt; longer ones are cut here
+TOOL_RESULT_MAX_CHARS = int(os.getenv("MEMORY_TOOL_RESULT_MAX_CHARS", "800"))
+# ...and only the most recent few, so they cannot crowd the dialogue out of
+# the history token budget
+MEMORY_MAX_TOOL_RESULTS = int(os.getenv("MEMORY_MAX_TOOL_RESULTS", "3"))
+
+
+# =========================
+# Tool Steps
+# =========================
+
+def compact_tool_steps(steps: List[Tuple[Any, Any]]) -> List[Dict[str, Any]]:
+    """
+    (action, observation) pairs from AgentExecutor's intermediate_steps as
+    one tool_call and one tool_result record each, JSON-encoded and trimmed
+    to TOOL_RESULT_MAX_CHARS. Parser errors ('_Exception') are not kept.
+    """
+    records = []
+    for action, observation in steps:
+        if action.tool == "_Exception":
+            continue
+        tool_call_id = getattr(action, "tool_call_id", None) or f"call_{uuid.uuid4().hex[:24]}"
+        args = action.tool_input if isinstance(action.tool_input, dict) else {"input": action.tool_input}
+        output = observation if isinstance(observation, str) else json.dumps(
+            observation, default=str, separators=(",", ":")
+        )
+        if len(output) > TOOL_RESULT_MAX_CHARS:
+            output = output[:TOOL_RESULT_MAX_CHARS] + "...[truncated]"
+        records.append({
+            "message_type": "tool_call",
+            "tool_name": action.tool,
+            "tool_call_id": tool_call_id,
+            "content": json.dumps(args, default=str, separators=(",", ":")),
+        })
+        records.append({
+            "message_type": "tool_result",
+            "tool_name": action.tool,
+            "tool_call_id": tool_call_id,
+            "content": output,
+        })
+    return records
+
+
+def to_chat_message(message_type: str, role: str, content: str, tool_name: str = None, tool_call_id: str = None) -> Dict[str, Any]:
+    """A stored record as a chat message dict (tool calls in the format trim_messages accepts)."""
+    if message_type == "tool_call":
+        return {
+            "role": "assistant",
+            "content": "",
+            "tool_calls": [{
+                "id": tool_call_id,
+                "name": tool_name,
+                "args": json.loads(content),
+                "type": "tool_call",
+            }],
+        }
+    if message_type == "tool_result":
+        return {"role": "tool", "content": content, "tool_call_id": tool_call_id}
+    return {"role": role, "content": content}
+
+
+def prune_tool_records(history: List[Dict[str, Any]], max_results: int = None) -> List[Dict[str, Any]]:
+    """
+    History to replay: of the stored tool calls, only the latest per
+    (tool, args) and at most `max_results` overall, each with its result.
+    Dialogue messages are all kept.
+    """
+    if max_results is None:
+        max_results = MEMORY_MAX_TOOL_RESULTS
+    keep, seen = set(), set()
+    for message in reversed(history):
+        for call in reversed(message.get("tool_calls") or []):
+            key = (call["name"], json.dumps(call["args"], sort_keys=True, default=str))
+            if key not in seen and len(keep) < max_results:
+                keep.add(call["id"])
+            seen.add(key)
+
+    pruned = []
+    for message in history:
+        if message.get("tool_calls"):
+            calls = [c for c in message["tool_calls"] if c["id"] in keep]
+            if calls:
+                pruned.append({**message, "tool_calls": calls})
+            elif message.get("content"):
+                pruned.append({"role": message["role"], "content": message["content"]})
+        elif message.get("role") == "tool":
+            if message.get("tool_call_id") in keep:
+                pruned.append(message)
+        else:
+            pruned.append(message)
+    return pruned
+
 
 # =========================
 # Abstract Memory Interface
@@ -12,7 +107,7 @@ from app.db import models
 class MemoryStore(ABC):
 
     @abstractmethod
-    def get(self, session_id: str) -> List[Dict[str, str]]:
+    def get(self, session_id: str) -> List[Dict[str, Any]]:
         """Return list of messages for a session"""
         pass
 
@@ -21,6 +116,11 @@ class MemoryStore(ABC):
         """Save a single message"""
         pass
 
+    @abstractmethod
+    def save_tool_steps(self, session_id: str, steps: List[Tuple[Any, Any]]) -> None:
+        """Save a turn's tool calls and results, in order, before its reply"""
+        pass
+
 
 # =========================
 # In-Memory Implementation
@@ -28,9 +128,9 @@ class MemoryStore(ABC):
 
 class InMemoryStore(MemoryStore):
     def __init__(self):
-        self.data: Dict[str, List[Dict[str, str]]] = {}
+        self.data: Dict[str, List[Dict[str, Any]]] = {}
 
-    def get(self, session_id: str) -> List[Dict[str, str]]:
+    def get(self, session_id: str) -> List[Dict[str, Any]]:
         return self.data.get(session_id, [])
 
     def save(self, session_id: str, role: str, content: str) -> None:
@@ -39,6 +139,12 @@ class InMemoryStore(MemoryStore):
             "content": content
         })
 
+    def save_tool_steps(self, session_id: str, steps: List[Tuple[Any, Any]]) -> None:
+        self.data.setdefault(session_id, []).extend(
+            to_chat_message(r["message_type"], "tool", r["content"], r["tool_name"], r["tool_call_id"])
+            for r in compact_tool_steps(steps)
+        )
+
 
 # =========================
 # Database Implementation
@@ -48,16 +154,17 @@ class DBMemoryStore(MemoryStore):
     def __init__(self, db: Session):
         self.db = db
 
-    def get(self, session_id: str) -> List[Dict[str, str]]:
+    def get(self, session_id: str) -> List[Dict[str, Any]]:
         rows = (
             self.db.query(models.Conversation)
             .filter(models.Conversation.session_id == session_id)
-            .order_by(models.Conversation.timestamp.asc())
+            # Tool steps of a turn share one commit (and timestamp)
+            .order_by(models.Conversation.timestamp.asc(), models.Conversation.id.asc())
             .all()
         )
 
         return [
-            {"role": row.role, "content": row.content}
+            to_chat_message(row.message_type, row.role, row.content, row.tool_name, row.tool_call_id)
             for row in rows
         ]
 
@@ -70,3 +177,18 @@ class DBMemoryStore(MemoryStore):
         self.db.add(msg)
         self.db.commit()
         self.db.refresh(msg)
+
+    def save_tool_steps(self, session_id: str, steps: List[Tuple[Any, Any]]) -> None:
+        records = compact_tool_steps(steps)
+        if not records:
+            return
+        # One commit, so a call is never stored without its result
+        self.db.add_all([
+            models.Conversation(
+                session_id=session_id,
+                role="assistant" if r["message_type"] == "tool_call" else "tool",
+                **r
+            )
+            for r in records
+        ])
+        self.db.commit()
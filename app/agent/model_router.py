@@ -0,0 +1,177 @@
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter
+
+ROUTING_DECISIONS = Counter(
+    "agent_model_route_total", "Model routing decisions by tier and reason", ["tier", "reason"],
+)
+ROUTING_ESCALATIONS = Counter(
+    "agent_model_escalations_total", "Fast-model turns re-run on the full model", ["cause"],
+)
+
+FAST = "fast"
+FULL = "full"
+
+FAST_MODEL = os.getenv("FAST_MODEL", "gpt-4o-mini")
+FULL_MODEL = os.getenv("FULL_MODEL", "gpt-4o")
+
+# USD per 1M (prompt, completion) tokens
+MODEL_PRICES = {
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+# Weight of the newest sample in the per-tier LLM call latency average
+LATENCY_EWMA_ALPHA = 0.2
+
+
+# =========================
+# Routing Rules
+# =========================
+
+_SMALL_TALK = re.compile(
+    r"^(hi|hello|hey|good (morning|afternoon|evening)|thanks?( you)?( so much)?|thank you very much|"
+    r"ok(ay)?|cool|great|perfect|awesome|bye|goodbye|see you|have a (good|nice) day)\b[\s\w,!.]*$"
+)
+_AFFIRMATIVE = re.compile(r"^(yes|yeah|yep|sure|ok(ay)?|confirm(ed)?|go ahead|please do|correct)\b")
+_EMAIL = re.compile(r"^[\w.+-]+@[\w-]+(\.[\w-]+)+$")
+_PHONE = re.compile(r"^\+?[\d\s().-]{7,20}$")
+_SPELLED = re.compile(r"^([a-z](\s*[-,.]?\s*)){2,40}$")
+_NAME = re.compile(r"^(my name is |it'?s |i'?m )?[a-z][a-z'-]+( [a-z][a-z'-]+){0,3}$")
+
+# Anything that can lead to booking, cancelling or rescheduling needs the full model
+_INTENT_WORDS = re.compile(
+    r"\b(book|appointment|cancel|reschedul\w*|move|change|available|availability|slot|"
+    r"waitlist|tomorrow|today|monday|tuesday|wednesday|thursday|friday|saturday|sunday|"
+    r"am|pm|\d{1,2}:\d{2})\b"
+)
+
+
+def _last_assistant_message(history: List[Any]) -> str:
+    for m in reversed(history):
+        if isinstance(m, dict):
+            role, content = m.get("role"), m.get("content", "")
+        else:
+            role, content = m.type, str(m.content)
+        if role in ("assistant", "ai"):
+            return content
+    return ""
+
+
+def classify(user_message: str, session_state: Dict[str, Any], history: List[Any]) -> Tuple[str, str]:
+    """
+    Picks a tier for one turn. Returns (tier, reason).
+
+    Only turns that cannot start a booking flow go to the fast model:
+    greetings/thanks, and bare single-field answers (email, phone number,
+    a name or a spelled-out word) while collecting patient details.
+    """
+    text = re.sub(r"\s+", " ", user_message.strip().lower())
+
+    if not text:
+        return FAST, "empty"
+    if session_state.get("pending_appointments"):
+        return FULL, "pending_appointments"
+    if _INTENT_WORDS.search(text):
+        return FULL, "intent"
+
+    # A "yes" to "Shall I book it?" triggers create_appointment
+    if _AFFIRMATIVE.match(text) and _last_assistant_message(history).rstrip().endswith("?"):
+        return FULL, "confirmation"
+
+    if _SMALL_TALK.match(text) and len(text.split()) <= 6:
+        return FAST, "small_talk"
+    if _EMAIL.match(text):
+        return FAST, "single_field_email"
+    if _PHONE.match(text):
+        return FAST, "single_field_phone"
+    if _SPELLED.match(text):
+        return FAST, "single_field_spelled"
+    if _NAME.match(text) and "name" in _last_assistant_message(history).lower():
+        return FAST, "single_field_name"
+
+    return FULL, "default"
+
+
+# =========================
+# Router
+# =========================
+
+class ModelRouter:
+    """
+    Chooses between a fast and a full chat model per turn and keeps the
+    running per-call latency of each tier, used to estimate what routing
+    saved. `classifier` can be swapped for a learned one with the same
+    signature as `classify`.
+    """
+
+    def __init__(
+        self,
+        fast_model: str = FAST_MODEL,
+        full_model: str = FULL_MODEL,
+        classifier=classify,
+    ):
+        self.fast_model = fast_model
+        self.full_model = full_model
+        self.classifier = classifier
+        self._latency: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def route(self, user_message: str, session_state: Dict[str, Any], history: List[Any]) -> Tuple[str, str]:
+        tier, reason = self.classifier(user_message, session_state, history)
+        ROUTING_DECISIONS.labels(tier=tier, reason=reason).inc()
+        return tier, reason
+
+    def escalated(self, cause: str) -> None:
+        ROUTING_ESCALATIONS.labels(cause=cause).inc()
+
+    def observe(self, tier: str, calls: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            for call in calls:
+                previous = self._latency.get(tier)
+                self._latency[tier] = call["ms"] if previous is None else (
+                    LATENCY_EWMA_ALPHA * call["ms"] + (1 - LATENCY_EWMA_ALPHA) * previous
+                )
+
+    def _cost(self, model: str, calls: List[Dict[str, Any]]) -> float:
+        prompt_price, completion_price = MODEL_PRICES.get(model, MODEL_PRICES[FULL_MODEL])
+        return sum(
+            c.get("prompt_tokens", 0) * prompt_price + c.get("completion_tokens", 0) * completion_price
+            for c in calls
+        ) / 1_000_000
+
+    def savings(
+        self,
+        fast_calls: List[Dict[str, Any]],
+        escalated: bool,
+    ) -> Dict[str, Optional[float]]:
+        """
+        Estimated latency and cost saved versus running the same calls on the
+        full model. An escalated turn saved nothing: the fast attempt is waste.
+        """
+        fast_ms = sum(c["ms"] for c in fast_calls)
+        fast_cost = self._cost(self.fast_model, fast_calls)
+        if escalated:
+            return {"saved_ms": round(-fast_ms, 1), "saved_usd": round(-fast_cost, 6)}
+
+        full_call_ms = self._latency.get(FULL)
+        saved_ms = None if full_call_ms is None else round(full_call_ms * len(fast_calls) - fast_ms, 1)
+        saved_usd = self._cost(self.full_model, fast_calls) - fast_cost
+        return {"saved_ms": saved_ms, "saved_usd": round(saved_usd, 6)}
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_router() -> ModelRouter:
+    """Process-wide router, so latency averages survive across requests."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter()
+    return _router
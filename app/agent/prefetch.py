@@ -0,0 +1,260 @@
+import contextvars
+import logging
+import os
+import re
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "true").lower() != "false"
+# A warmed result older than this is recomputed rather than served
+PREFETCH_MAX_AGE_SECONDS = float(os.getenv("PREFETCH_MAX_AGE_SECONDS", "15"))
+
+PREFETCHES = Counter(
+    "agent_prefetch_total", "Speculative tool prefetches by outcome", ["tool", "outcome"],
+)
+PREFETCH_SAVED_SECONDS = Histogram(
+    "agent_prefetch_saved_seconds", "Tool latency hidden behind the LLM call by a prefetch hit", ["tool"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+)
+
+# Each prefetch holds its own DB session (Session is not thread-safe)
+_pool = ThreadPoolExecutor(max_workers=int(os.getenv("PREFETCH_POOL", "8")), thread_name_prefix="prefetch")
+
+
+# =========================
+# Prediction
+# =========================
+
+_PHONE = re.compile(r"\+?\d[\d\s().-]{8,18}\d")
+_ISO_DATE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+_WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+_MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+_MONTH_DAY = re.compile(r"\b(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+(\d{1,2})(?:st|nd|rd|th)?\b")
+_DAY_MONTH = re.compile(r"\b(\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b")
+# Same names check_availability_tool accepts, plus the IDs the prompt lists
+_SERVICES = [
+    (re.compile(r"\b(initial consult(ation)?|consultation|service(_type_id)?\s*(id\s*)?1)\b"), 1),
+    (re.compile(r"\b(follow[- ]?up|service(_type_id)?\s*(id\s*)?2)\b"), 2),
+    (re.compile(r"\b(lab review|lab results?|service(_type_id)?\s*(id\s*)?3)\b"), 3),
+]
+
+
+def phone_variants(text: str) -> List[str]:
+    """Spellings the model is likely to pass to lookup_patient for a number in `text`."""
+    match = _PHONE.search(text)
+    if not match:
+        return []
+    raw = match.group(0).strip()
+    digits = re.sub(r"\D", "", raw)
+    if not 10 <= len(digits) <= 15:
+        return []
+    variants = [raw, digits] + (["+" + digits] if raw.startswith("+") else [])
+    return list(dict.fromkeys(variants))
+
+
+def parse_date(text: str, today: date) -> Optional[date]:
+    """The date a message asks about, for the simple phrasings people use."""
+    text = text.lower()
+    match = _ISO_DATE.search(text)
+    if match:
+        try:
+            return date.fromisoformat(match.group(1))
+        except ValueError:
+            return None
+    if re.search(r"\btoday\b", text):
+        return today
+    if re.search(r"\btomorrow\b", text):
+        return today + timedelta(days=1)
+    for i, name in enumerate(_WEEKDAYS):
+        if re.search(rf"\b{name}\b", text):
+            return today + timedelta(days=(i - today.weekday()) % 7 or 7)
+
+    match = _MONTH_DAY.search(text)
+    month_day = (match.group(1), match.group(2)) if match else None
+    if not month_day:
+        match = _DAY_MONTH.search(text)
+        month_day = (match.group(2), match.group(1)) if match else None
+    if month_day:
+        month, day = _MONTHS.index(month_day[0]) + 1, int(month_day[1])
+        try:
+            candidate = date(today.year, month, day)
+        except ValueError:
+            return None
+        return candidate if candidate >= today else candidate.replace(year=today.year + 1)
+    return None
+
+
+def service_type(texts: Iterable[str]) -> Optional[int]:
+    """Service type named most recently in `texts` (newest first)."""
+    for text in texts:
+        text = text.lower()
+        for pattern, service_type_id in _SERVICES:
+            if pattern.search(text):
+                return service_type_id
+    return None
+
+
+def _message_text(message: Any) -> str:
+    return message.get("content", "") if isinstance(message, dict) else str(message.content)
+
+
+def predict(
+    user_message: str,
+    session_state: Dict[str, Any],
+    history: List[Any],
+    today: date,
+) -> List[Tuple[str, Tuple[Any, ...]]]:
+    """(tool, args) the model will most likely call first for this message."""
+    predictions = []
+
+    phones = phone_variants(user_message)
+    known = re.sub(r"\D", "", str(session_state.get("phone_number") or ""))
+    if phones and not (known and known == re.sub(r"\D", "", phones[0])):
+        predictions.append(("lookup_patient", tuple(phones)))
+
+    day = parse_date(user_message, today)
+    if day and day >= today:
+        texts = [user_message] + [_message_text(m) for m in reversed(history)]
+        service_type_id = service_type(texts)
+        if service_type_id:
+            predictions.append(("check_availability", (day, service_type_id)))
+    return predictions
+
+
+# =========================
+# Prefetcher
+# =========================
+
+def _lookup_patient(*phones: str) -> Dict[str, Any]:
+    from app.db import models
+
+    db = SessionLocal()
+    try:
+        rows = db.query(models.Patient).filter(models.Patient.phone_number.in_(phones)).all()
+        by_phone = {p.phone_number: p for p in rows}
+        # Detached but fully loaded; the tool only reads columns
+        return {phone: by_phone.get(phone) for phone in phones}
+    finally:
+        db.close()
+
+
+def _check_availability(day: date, service_type_id: int) -> Dict[Any, Any]:
+    from app.services.availability_service import check_availability
+
+    db = SessionLocal()
+    try:
+        return {(day.isoformat(), service_type_id): check_availability(day, service_type_id, db)}
+    finally:
+        db.close()
+
+
+_LOADERS = {
+    "lookup_patient": _lookup_patient,
+    "check_availability": _check_availability,
+}
+
+# The `take` keys each loader's result will hold, known before it finishes
+_KEYS = {
+    "lookup_patient": lambda *phones: set(phones),
+    "check_availability": lambda day, service_type_id: {(day.isoformat(), service_type_id)},
+}
+
+
+class _Warm:
+    def __init__(self, tool: str, keys: set, future: Future):
+        self.tool = tool
+        self.keys = keys
+        self.future = future
+        self.started = time.monotonic()
+        self.used = False
+
+
+class Prefetcher:
+    """
+    Starts the read-only part of the tools a message will probably trigger
+    (patient lookup, slot computation) while the first LLM call is in
+    flight. Tools ask `take` for their data; a matching warmed result is
+    served, anything else runs live. Side effects (session_state updates)
+    stay in the tools, so a wrong guess only costs the wasted read.
+
+        prefetch = Prefetcher.start(user_message, session_state, history)
+        ...
+        prefetch.finish(turn)
+    """
+
+    def __init__(self):
+        self._warm: List[_Warm] = []
+        self.saved_seconds = 0.0
+        self.hits: List[str] = []
+
+    @classmethod
+    def start(cls, user_message: str, session_state: Dict[str, Any], history: List[Any]) -> "Prefetcher":
+        prefetcher = cls()
+        if not PREFETCH_ENABLED:
+            return prefetcher
+        try:
+            predictions = predict(user_message, session_state, history, datetime.now().date())
+        except Exception as e:
+            logger.warning(f"Prefetch prediction failed: {e}")
+            return prefetcher
+        for tool, args in predictions:
+            # Run in the turn's context, so the reads' DB time is charged to it
+            ctx = contextvars.copy_context()
+            future = _pool.submit(ctx.run, cls._timed, _LOADERS[tool], args)
+            prefetcher._warm.append(_Warm(tool, _KEYS[tool](*args), future))
+        return prefetcher
+
+    @staticmethod
+    def _timed(loader: Callable, args: Tuple[Any, ...]):
+        started = time.perf_counter()
+        result = loader(*args)
+        return result, time.perf_counter() - started
+
+    def take(self, tool: str, key: Any, compute: Callable[[], Any]) -> Any:
+        """The warmed result for (tool, key) if there is a fresh one, else `compute()`."""
+        for warm in self._warm:
+            # A wrong guess must not make the live call wait for its read
+            if warm.tool != tool or warm.used or key not in warm.keys:
+                continue
+            if time.monotonic() - warm.started > PREFETCH_MAX_AGE_SECONDS:
+                continue
+            waited_from = time.perf_counter()
+            try:
+                results, loader_seconds = warm.future.result()
+            except Exception as e:
+                warm.used = True
+                PREFETCHES.labels(tool=tool, outcome="error").inc()
+                logger.warning(f"Prefetch of {tool} failed, running it live: {e}")
+                break
+
+            warm.used = True
+            saved = max(0.0, loader_seconds - (time.perf_counter() - waited_from))
+            self.saved_seconds += saved
+            self.hits.append(tool)
+            PREFETCHES.labels(tool=tool, outcome="hit").inc()
+            PREFETCH_SAVED_SECONDS.labels(tool=tool).observe(saved)
+            return results[key]
+        return compute()
+
+    def finish(self, turn=None) -> None:
+        """Counts prefetches no tool asked for as wasted and notes the savings on the turn."""
+        wasted = []
+        for warm in self._warm:
+            if not warm.used:
+                warm.future.cancel()
+                wasted.append(warm.tool)
+                PREFETCHES.labels(tool=warm.tool, outcome="wasted").inc()
+        if turn is not None and self._warm:
+            turn.attributes["prefetch"] = {
+                "hits": self.hits,
+                "wasted": wasted,
+                "saved_ms": round(self.saved_seconds * 1000, 1),
+            }
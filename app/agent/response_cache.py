@@ -0,0 +1,179 @@
+import hashlib
+import json
+import math
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Counter
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+CACHE_RESULTS = Counter(
+    "agent_response_cache_total", "Response cache lookups by outcome", ["result"],
+)
+
+RESPONSE_CACHE_TTL = timedelta(seconds=int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400")))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "10000"))
+SEMANTIC_THRESHOLD = float(os.getenv("RESPONSE_CACHE_SEMANTIC_THRESHOLD", "0.95"))
+SEMANTIC_CANDIDATES = 200
+
+
+def normalize_input(text: str) -> str:
+    text = re.sub(r"\s+", " ", text.strip().lower())
+    return text.rstrip(" .!?")
+
+
+def _serialize_history(history: List[Any]) -> List[List[str]]:
+    serialized = []
+    for m in history:
+        if isinstance(m, dict):
+            serialized.append([m.get("role", ""), m.get("content", "")])
+        else:
+            serialized.append([m.type, str(m.content)])
+    return serialized
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ResponseCache:
+    """
+    Postgres-backed cache of final agent replies.
+
+    Exact hits are keyed on (scope, normalized state, trimmed history,
+    normalized input), where scope is the system prompt version plus the
+    current date. State-free turns (no session state, no history) can also
+    be matched by embedding similarity when an `embeddings` model is given.
+    Only turns that made no tool calls and left session_state untouched
+    are ever stored, so state-mutating turns always bypass the cache.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        embeddings: Any = None,
+        ttl: timedelta = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+    ):
+        self.db = db
+        self.embeddings = embeddings
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    @staticmethod
+    def scope(prompt_version: str, current_date: str) -> str:
+        return f"{prompt_version}:{current_date}"
+
+    @staticmethod
+    def make_key(scope: str, session_state: Dict[str, Any], history: List[Any], user_message: str) -> str:
+        payload = json.dumps(
+            [scope, session_state, _serialize_history(history), normalize_input(user_message)],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _fresh(self, entry: models.ResponseCacheEntry) -> bool:
+        return entry.created_at >= datetime.now(timezone.utc) - self.ttl
+
+    def _touch(self, entry: models.ResponseCacheEntry) -> str:
+        entry.hits += 1
+        entry.last_hit_at = datetime.now(timezone.utc)
+        self.db.commit()
+        return entry.reply
+
+    def lookup(self, key: str, scope: str, user_message: str, state_free: bool) -> Optional[str]:
+        entry = self.db.get(models.ResponseCacheEntry, key)
+        if entry and self._fresh(entry):
+            CACHE_RESULTS.labels(result="hit").inc()
+            return self._touch(entry)
+
+        if state_free and self.embeddings is not None:
+            reply = self._semantic_lookup(scope, user_message)
+            if reply is not None:
+                CACHE_RESULTS.labels(result="semantic_hit").inc()
+                return reply
+
+        CACHE_RESULTS.labels(result="miss").inc()
+        return None
+
+    def _semantic_lookup(self, scope: str, user_message: str) -> Optional[str]:
+        vector = self.embeddings.embed_query(normalize_input(user_message))
+        candidates = (
+            self.db.query(models.ResponseCacheEntry)
+            .filter(
+                models.ResponseCacheEntry.state_free == True,
+                models.ResponseCacheEntry.scope == scope,
+                models.ResponseCacheEntry.embedding.isnot(None),
+            )
+            .order_by(models.ResponseCacheEntry.last_hit_at.desc())
+            .limit(SEMANTIC_CANDIDATES)
+            .all()
+        )
+
+        best, best_score = None, SEMANTIC_THRESHOLD
+        for entry in candidates:
+            score = _cosine(vector, entry.embedding)
+            if score >= best_score and self._fresh(entry):
+                best, best_score = entry, score
+        return self._touch(best) if best else None
+
+    def store(self, key: str, scope: str, user_message: str, reply: str, state_free: bool) -> None:
+        embedding = None
+        if state_free and self.embeddings is not None:
+            embedding = self.embeddings.embed_query(normalize_input(user_message))
+
+        stmt = insert(models.ResponseCacheEntry).values(
+            key=key,
+            scope=scope,
+            reply=reply,
+            state_free=state_free,
+            embedding=embedding,
+            hits=0,
+        ).on_conflict_do_nothing(index_elements=["key"])
+        self.db.execute(stmt)
+        self.db.commit()
+        self._evict()
+
+    def bypass(self) -> None:
+        CACHE_RESULTS.labels(result="bypass").inc()
+
+    def _evict(self) -> None:
+        """Drops expired rows, then least-recently-hit rows beyond max_entries."""
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        self.db.query(models.ResponseCacheEntry).filter(
+            models.ResponseCacheEntry.created_at < cutoff
+        ).delete(synchronize_session=False)
+
+        overflow = self.db.query(models.ResponseCacheEntry).count() - self.max_entries
+        if overflow > 0:
+            stale = (
+                self.db.query(models.ResponseCacheEntry.key)
+                .order_by(models.ResponseCacheEntry.last_hit_at.asc())
+                .limit(overflow)
+                .subquery()
+            )
+            self.db.query(models.ResponseCacheEntry).filter(
+                models.ResponseCacheEntry.key.in_(stale.select())
+            ).delete(synchronize_session=False)
+        self.db.commit()
+
+
+def build_response_cache(db: Session) -> Optional[ResponseCache]:
+    """Cache configured from env; None when RESPONSE_CACHE_ENABLED=false."""
+    if os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "false":
+        return None
+
+    embeddings = None
+    if os.getenv("RESPONSE_CACHE_SEMANTIC", "false").lower() == "true":
+        from langchain_openai import OpenAIEmbeddings
+        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+
+    return ResponseCache(db, embeddings=embeddings)
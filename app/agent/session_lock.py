@@ -0,0 +1,108 @@
+import hashlib
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# Cross-process ordering; only needed when several workers serve /chat
+ADVISORY_LOCK_ENABLED = os.getenv("SESSION_ADVISORY_LOCK", "true").lower() != "false"
+
+
+class _Ticket:
+    """FIFO ticket lock for one session_id, so queued turns run in arrival order."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.next_ticket = 0
+        self.serving = 0
+
+
+_tickets: Dict[str, _Ticket] = {}
+_tickets_lock = threading.Lock()
+
+
+def advisory_key(session_id: str) -> int:
+    """Signed 64-bit key for pg_advisory_lock derived from the session_id."""
+    return int.from_bytes(hashlib.sha256(session_id.encode()).digest()[:8], "big", signed=True)
+
+
+class SessionLock:
+    """
+    Serializes turns of one session; different sessions never wait on each
+    other. Within a process, turns queue FIFO on an in-memory ticket lock.
+    Across processes, the holder also takes a session-level Postgres
+    advisory lock on a dedicated connection (the ORM session hands its
+    connection back to the pool on every commit, so it cannot hold one).
+
+        lock = SessionLock(session_id, engine)
+        lock.acquire()
+        try:
+            ...
+        finally:
+            lock.release()
+    """
+
+    def __init__(self, session_id: str, bind: Optional[Engine] = None):
+        self.session_id = session_id
+        self.bind = bind
+        self._ticket: Optional[_Ticket] = None
+        self._conn: Optional[Connection] = None
+
+    def acquire(self) -> None:
+        with _tickets_lock:
+            ticket = _tickets.setdefault(self.session_id, _Ticket())
+            mine = ticket.next_ticket
+            ticket.next_ticket += 1
+
+        with ticket.cond:
+            while ticket.serving != mine:
+                ticket.cond.wait()
+        self._ticket = ticket
+
+        if ADVISORY_LOCK_ENABLED and self.bind is not None:
+            try:
+                self._conn = self.bind.connect()
+                self._conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": advisory_key(self.session_id)})
+            except Exception:
+                if self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+                self._release_ticket()
+                raise
+
+    def release(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": advisory_key(self.session_id)})
+                self._conn.rollback()
+            except Exception as e:
+                # A pooled connection must never keep holding the lock
+                logger.warning(f"Advisory unlock failed for session {self.session_id}: {e}")
+                self._conn.invalidate()
+            finally:
+                self._conn.close()
+                self._conn = None
+        self._release_ticket()
+
+    def _release_ticket(self) -> None:
+        ticket, self._ticket = self._ticket, None
+        if ticket is None:
+            return
+        with _tickets_lock:
+            with ticket.cond:
+                ticket.serving += 1
+                ticket.cond.notify_all()
+                if ticket.serving == ticket.next_ticket:
+                    _tickets.pop(self.session_id, None)
+
+    def __enter__(self) -> "SessionLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
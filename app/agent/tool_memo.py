@@ -0,0 +1,155 @@
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from prometheus_client import Counter
+from sqlalchemy.orm import Session
+
+from app.core.http_cache import read_versions
+
+logger = logging.getLogger(__name__)
+
+TOOL_MEMO_ENABLED = os.getenv("TOOL_MEMO_ENABLED", "true").lower() != "false"
+# Google Calendar busy time and the booking lead time are invisible to the
+# version counters; this bounds how long a memoized answer can miss them
+TOOL_MEMO_TTL_SECONDS = float(os.getenv("TOOL_MEMO_TTL_SECONDS", "60"))
+TOOL_MEMO_MAX_ENTRIES = int(os.getenv("TOOL_MEMO_MAX_ENTRIES", "5000"))
+
+# Clinic setup that changes what check_availability returns for any day
+# (statement-level counters, see app.core.http_cache)
+AVAILABILITY_CONFIG_TABLES = (
+    "service_types",
+    "business_hours",
+    "providers",
+    "provider_hours",
+    "provider_services",
+)
+
+TOOL_MEMO = Counter(
+    "agent_tool_memo_total", "Per-session tool result memo lookups by outcome", ["tool", "outcome"],
+)
+
+
+def day_key(appointment_date: Any) -> Optional[str]:
+    """'day:YYYY-MM-DD' for a tool's date argument, or None if it does not parse."""
+    if isinstance(appointment_date, datetime):
+        appointment_date = appointment_date.date()
+    if isinstance(appointment_date, date):
+        return f"day:{appointment_date.isoformat()}"
+    try:
+        return f"day:{datetime.strptime(str(appointment_date).strip(), '%Y-%m-%d').date().isoformat()}"
+    except ValueError:
+        return None
+
+
+def availability_dependencies(appointment_date: Any) -> Optional[Tuple[str, ...]]:
+    key = day_key(appointment_date)
+    return None if key is None else (key,) + AVAILABILITY_CONFIG_TABLES
+
+
+def patient_dependencies(patient_id: Any) -> Optional[Tuple[str, ...]]:
+    try:
+        return (f"patient:{int(patient_id)}",)
+    except (TypeError, ValueError):
+        return None
+
+
+class _Entry:
+    __slots__ = ("created", "versions", "value")
+
+    def __init__(self, versions: Dict[str, int], value: Any):
+        self.created = time.monotonic()
+        self.versions = versions
+        self.value = value
+
+
+class ToolMemo:
+    """
+    Remembers read-only tool results for the rest of a session, so the model
+    asking for the same slots or appointment list again within a conversation
+    does not redo the queries (and the Google Calendar call).
+
+    Every entry records the write counters (cache_versions) of what it was
+    computed from: the day for availability, the patient for their
+    appointments. Bookings, cancellations and blocked slots bump those
+    counters in the same transaction, so the next lookup sees a different
+    version and recomputes; writes to other days or patients leave the entry
+    alone. Errors are never memoized.
+    """
+
+    def __init__(self, max_entries: int = TOOL_MEMO_MAX_ENTRIES, ttl: float = TOOL_MEMO_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        db: Session,
+        session_id: str,
+        tool: str,
+        args: Tuple[Any, ...],
+        dependencies: Optional[Iterable[str]],
+        compute: Callable[[], Any],
+    ) -> Tuple[Any, bool]:
+        """
+        `compute()`'s result for (session, tool, args), reused while the
+        dependencies' versions are unchanged. Returns (result, hit).
+        """
+        if dependencies is None:
+            return compute(), False
+
+        # Read before computing: a write landing mid-compute then makes the
+        # entry stale rather than letting it outlive the write
+        try:
+            versions = read_versions(db, dependencies)
+        except Exception as e:
+            logger.warning(f"Tool memo version read failed, running {tool} live: {e}")
+            return compute(), False
+
+        key = (session_id, tool, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        if entry is not None:
+            if time.monotonic() - entry.created > self.ttl:
+                outcome = "expired"
+            elif entry.versions != versions:
+                outcome = "stale"
+            else:
+                TOOL_MEMO.labels(tool=tool, outcome="hit").inc()
+                return copy.deepcopy(entry.value), True
+        else:
+            outcome = "miss"
+        TOOL_MEMO.labels(tool=tool, outcome=outcome).inc()
+
+        result = compute()
+        if isinstance(result, dict) and "error" in result:
+            return result, False
+
+        with self._lock:
+            self._entries[key] = _Entry(versions, copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result, False
+
+
+_memo: Optional[ToolMemo] = None
+
+
+def get_tool_memo() -> Optional[ToolMemo]:
+    """Process-wide memo, or None when TOOL_MEMO_ENABLED is false."""
+    global _memo
+    if not TOOL_MEMO_ENABLED:
+        return None
+    if _memo is None:
+        _memo = ToolMemo()
+    return _memo
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import List, Optional, Tuple
+from datetime import date, timedelta
+
+from app.db.session import get_db
+from app.services import analytics_service
+from app.schemas.analytics import (
+    AgentActionCountOut,
+    CancellationRatesOut,
+    ServiceTypeBookingsOut,
+    UtilizationOut,
+)
+
+router = APIRouter()
+
+DEFAULT_RANGE_DAYS = 30
+MAX_RANGE_DAYS = 366
+
+
+def _date_range(date_from: Optional[date], date_to: Optional[date]) -> Tuple[date, date]:
+    """Defaults to the last 30 days; rollups are read per day, so the span is capped."""
+    date_to = date_to or date.today()
+    date_from = date_from or date_to - timedelta(days=DEFAULT_RANGE_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range is limited to {MAX_RANGE_DAYS} days")
+    return date_from, date_to
+
+
+@router.get("/utilization", response_model=List[UtilizationOut])
+def get_utilization(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    by_hour: bool = Query(False),
+    db: Session = Depends(get_db),
+):
+    """Booked minutes as a share of bookable clinic time, per day (or per day and hour)."""
+    date_from, date_to = _date_range(date_from, date_to)
+    return analytics_service.utilization(db, date_from, date_to, by_hour=by_hour)
+
+
+@router.get("/service-types", response_model=List[ServiceTypeBookingsOut])
+def get_service_type_bookings(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    date_from, date_to = _date_range(date_from, date_to)
+    return analytics_service.bookings_by_service_type(db, date_from, date_to)
+
+
+@router.get("/cancellations", response_model=CancellationRatesOut)
+def get_cancellation_rates(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    date_from, date_to = _date_range(date_from, date_to)
+    return analytics_service.cancellation_rates(db, date_from, date_to)
+
+
+@router.get("/agent-actions", response_model=List[AgentActionCountOut])
+def get_agent_action_counts(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    db: Session = Depends(get_db),
+):
+    date_from, date_to = _date_range(date_from, date_to)
+    return analytics_service.agent_action_counts(db, date_from, date_to)
+
+
+@router.post("/refresh")
+def refresh_analytics(db: Session = Depends(get_db)):
+    """Runs a refresh pass now instead of waiting for the background refresher."""
+    refreshed = analytics_service.refresh_rollups(db)
+    if refreshed is None:
+        raise HTTPException(status_code=409, detail="A refresh is already running")
+    return {"refreshed": refreshed, "refreshed_at": analytics_service.last_refreshed(db)}
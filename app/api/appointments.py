@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
+from datetime import date
 
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.responses import page_response
+from app.core.search import MIN_QUERY_LENGTH
 from app.db.session import get_db
 from app.schemas.appointment import AppointmentCreate, AppointmentOut
+from app.schemas.pagination import Page
 from app.services import appointment_service
+from app.services.export_service import APPOINTMENT_COLUMNS, EXPORT_FORMATS, stream_appointments
 
 router = APIRouter()
 
@@ -26,9 +33,81 @@ def create_appointment_api(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[AppointmentOut])
-def list_appointments(db: Session = Depends(get_db)):
-    return appointment_service.get_appointments(db)
+@router.get("/", response_model=Page[AppointmentOut])
+def list_appointments(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    patient_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Keyset-paginated appointments, newest date first.
+    Pass back `next_cursor` as `cursor` to fetch the following page.
+    """
+    try:
+        items, next_cursor = appointment_service.get_appointments(
+            db=db,
+            limit=limit,
+            cursor=cursor,
+            date_from=date_from,
+            date_to=date_to,
+            status=status,
+            patient_id=patient_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return page_response(request, items, APPOINTMENT_COLUMNS, next_cursor)
+
+
+@router.get("/search", response_model=Page[AppointmentOut])
+def search_appointments(
+    q: str = Query(..., min_length=MIN_QUERY_LENGTH),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Search by date prefix (e.g. `2026-03`), appointment id, or the patient's
+    name, phone or email. Paginated like the list endpoint.
+    """
+    try:
+        items, next_cursor = appointment_service.search_appointments(
+            db=db, q=q, limit=limit, cursor=cursor, status=status,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/export")
+def export_appointments(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    patient_id: Optional[int] = None,
+):
+    """
+    Streams every matching appointment as CSV or NDJSON (for billing/compliance exports).
+    """
+    return StreamingResponse(
+        stream_appointments(
+            fmt=format,
+            date_from=date_from,
+            date_to=date_to,
+            status=status,
+            patient_id=patient_id,
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="appointments.{format}"'},
+    )
 
 
 @router.patch("/{appointment_id}/status", response_model=AppointmentOut)
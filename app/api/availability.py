@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from datetime import date
 from typing import List, Dict, Any
 
 from app.db.session import get_db
+from app.core.http_cache import AVAILABILITY_CACHE_CONTROL, availability_etag, conditional_get
 from app.services.availability_service import check_availability
 
 router = APIRouter()
@@ -13,11 +14,21 @@ router = APIRouter()
 def get_availability(
     appointment_date: date,
     service_type_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """
     Returns available time slots for a given date and service type.
+    Answers 304 when the client's If-None-Match is still current, without
+    recomputing slots or calling Google.
     """
+    # The version is read before the slots, so a concurrent write can only
+    # make the ETag older than the body (costing one extra 200), never newer
+    etag = availability_etag(db, appointment_date, service_type_id)
+    not_modified = conditional_get(request, response, etag, AVAILABILITY_CACHE_CONTROL)
+    if not_modified:
+        return not_modified
 
     try:
         slots = check_availability(
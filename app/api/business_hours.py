@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.session import get_db
 from app.db import models
+from app.core.http_cache import REFERENCE_CACHE_CONTROL, conditional_get, resource_etag
 from app.schemas.business_hours import BusinessHourCreate, BusinessHourOut
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[BusinessHourOut])
-def list_business_hours(db: Session = Depends(get_db)):
+def list_business_hours(request: Request, response: Response, db: Session = Depends(get_db)):
+    not_modified = conditional_get(
+        request, response, resource_etag(db, ["business_hours"]), REFERENCE_CACHE_CONTROL
+    )
+    if not_modified:
+        return not_modified
     return db.query(models.BusinessHour).all()
 
 
@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, TYPE_CHECKING
 
 from app.db.session import get_db
-from app.agent.agent_service import AgentService
+from app.core.admission import AdmissionRejected, get_admission_controller, session_priority
+
+if TYPE_CHECKING:
+    from app.agent.agent_service import AgentService
 
 
 router = APIRouter()
@@ -28,18 +32,40 @@ class ChatResponse(BaseModel):
 # Chat Endpoint
 # =========================
 
+def get_agent_service(db: Session = Depends(get_db)) -> "AgentService":
+    # Overridable via app.dependency_overrides (e.g. fake LLM in load tests).
+    # Imported here so the LangChain/OpenAI stack loads on the first chat, not at startup.
+    from app.agent.agent_service import AgentService
+    return AgentService(db)
+
+
 @router.post("/", response_model=ChatResponse)
-def chat_endpoint(request: ChatRequest, db: Session = Depends(get_db)):
+async def chat_endpoint(
+    request: ChatRequest,
+    agent=Depends(get_agent_service),
+    db: Session = Depends(get_db),
+):
     """
     Main chat endpoint for the AI Booking Agent.
+    Turns pass the admission controller first; when it is saturated the
+    client gets a 429 with Retry-After instead of a timed-out LLM call.
     """
 
-    agent = AgentService(db)
+    priority = await run_in_threadpool(session_priority, db, request.session_id)
 
-    result = agent.handle_message(
-        session_id=request.session_id,
-        user_message=request.message
-    )
+    try:
+        async with get_admission_controller().admit(priority):
+            result = await run_in_threadpool(
+                agent.handle_message,
+                session_id=request.session_id,
+                user_message=request.message
+            )
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail="The assistant is busy right now. Please try again in a moment.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
 
     
     reply = result.get("reply")
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.events import get_broadcaster
+from app.core.security import decode_access_token
+
+router = APIRouter()
+
+# Comment line sent while idle so proxies do not close the stream
+HEARTBEAT_SECONDS = 15
+
+
+@router.get("/")
+async def stream_events(request: Request, token: str = Query(...)):
+    """
+    Server-Sent Events for the admin dashboard: `appointment` (insert or
+    status update), `log` (new AgentLog row) and `resync` (events were
+    dropped; refetch the lists). EventSource cannot send headers, so the
+    bearer token comes in the query string.
+    """
+    try:
+        decode_access_token(token)
+    except ValueError as e:
+        raise HTTPException(status_code=401, detail=str(e))
+
+    broadcaster = get_broadcaster()
+    subscriber = broadcaster.subscribe()
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
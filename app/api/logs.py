@@ -1,23 +1,67 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
+from datetime import datetime
 
+from app.core.pagination import MAX_PAGE_SIZE
+from app.core.responses import page_response
 from app.db.session import get_db
 from app.services.logging_service import get_logs # Using the function we added
+from app.services.export_service import EXPORT_FORMATS, LOG_COLUMNS, stream_logs
 from app.schemas.agent_log import AgentLogOut
+from app.schemas.pagination import Page
 
 router = APIRouter()
 
-@router.get("/", response_model=List[AgentLogOut])
+@router.get("/", response_model=Page[AgentLogOut])
 def list_logs(
-    limit: int = 100, 
+    request: Request,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    patient_id: Optional[int] = None,
+    action: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
     db: Session = Depends(get_db)
 ):
     """
     Returns the recent audit logs for the admin dashboard using the AgentLogOut schema.
+    Pass back `next_cursor` as `cursor` to page further into history.
     """
     try:
-        logs = get_logs(db=db, limit=limit)
-        return logs
+        logs, next_cursor = get_logs(
+            db=db,
+            limit=limit,
+            cursor=cursor,
+            patient_id=patient_id,
+            action=action,
+            created_from=created_from,
+            created_to=created_to,
+        )
+        return page_response(request, logs, LOG_COLUMNS, next_cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
+
+@router.get("/export")
+def export_logs(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    patient_id: Optional[int] = None,
+    action: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    return StreamingResponse(
+        stream_logs(
+            fmt=format,
+            patient_id=patient_id,
+            action=action,
+            created_from=created_from,
+            created_to=created_to,
+        ),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="agent_logs.{format}"'},
+    )
\ No newline at end of file
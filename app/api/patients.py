@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Optional
+from datetime import datetime
 
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.core.responses import page_response
+from app.core.search import MIN_QUERY_LENGTH
 from app.db.session import get_db
 from app.schemas.patient import PatientCreate, PatientOut
+from app.schemas.pagination import Page
 from app.services import patient_service
+from app.services.export_service import EXPORT_FORMATS, PATIENT_COLUMNS, stream_patients
 
 router = APIRouter()
 
@@ -27,9 +34,58 @@ def create_patient_api(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[PatientOut])
-def list_patients(db: Session = Depends(get_db)):
-    return db.query(patient_service.models.Patient).all()
+@router.get("/", response_model=Page[PatientOut])
+def list_patients(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+):
+    try:
+        items, next_cursor = patient_service.list_patients(
+            db=db,
+            limit=limit,
+            cursor=cursor,
+            created_from=created_from,
+            created_to=created_to,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return page_response(request, items, PATIENT_COLUMNS, next_cursor)
+
+
+@router.get("/search", response_model=Page[PatientOut])
+def search_patients(
+    q: str = Query(..., min_length=MIN_QUERY_LENGTH),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Substring search on name, phone and email, best matches first.
+    """
+    try:
+        items, next_cursor = patient_service.search_patients(db=db, q=q, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/export")
+def export_patients(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    return StreamingResponse(
+        stream_patients(fmt=format, created_from=created_from, created_to=created_to),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="patients.{format}"'},
+    )
 
 
 @router.get("/lookup/{phone_number}", response_model=PatientOut)
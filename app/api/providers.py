@@ -0,0 +1,65 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List
+
+from app.db.session import get_db
+from app.schemas.provider import (
+    ProviderBlockedSlotCreate,
+    ProviderCreate,
+    ProviderHourIn,
+    ProviderHourOut,
+    ProviderOut,
+)
+from app.services import provider_service
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[ProviderOut])
+def list_providers(db: Session = Depends(get_db)):
+    return provider_service.list_providers(db)
+
+
+@router.post("/", response_model=ProviderOut)
+def create_provider(provider: ProviderCreate, db: Session = Depends(get_db)):
+    try:
+        return provider_service.create_provider(db=db, **provider.model_dump())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.put("/{provider_id}/services")
+def set_provider_services(provider_id: int, service_type_ids: List[int], db: Session = Depends(get_db)):
+    if not provider_service.provider_exists(db, provider_id):
+        raise HTTPException(status_code=404, detail=f"Provider {provider_id} not found")
+    try:
+        provider_service.set_provider_services(db, provider_id, service_type_ids)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"provider_id": provider_id, "service_type_ids": service_type_ids}
+
+
+@router.put("/{provider_id}/hours", response_model=List[ProviderHourOut])
+def set_provider_hours(provider_id: int, hours: List[ProviderHourIn], db: Session = Depends(get_db)):
+    if not provider_service.provider_exists(db, provider_id):
+        raise HTTPException(status_code=404, detail=f"Provider {provider_id} not found")
+    try:
+        return provider_service.set_provider_hours(db, provider_id, [h.model_dump() for h in hours])
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{provider_id}/blocked-slots")
+def block_provider_time(provider_id: int, block: ProviderBlockedSlotCreate, db: Session = Depends(get_db)):
+    try:
+        slot = provider_service.block_provider_time(
+            db=db,
+            provider_id=provider_id,
+            blocked_date=block.date,
+            start_time=block.start_time,
+            end_time=block.end_time,
+            reason=block.reason,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"id": slot.id, "provider_id": provider_id}
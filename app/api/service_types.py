@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.db.session import get_db
 from app.db import models
+from app.core.http_cache import REFERENCE_CACHE_CONTROL, conditional_get, resource_etag
 from app.schemas.service_type import ServiceTypeCreate, ServiceTypeOut
 
 router = APIRouter()
 
 
 @router.get("/", response_model=List[ServiceTypeOut])
-def list_service_types(db: Session = Depends(get_db)):
+def list_service_types(request: Request, response: Response, db: Session = Depends(get_db)):
+    not_modified = conditional_get(
+        request, response, resource_etag(db, ["service_types"]), REFERENCE_CACHE_CONTROL
+    )
+    if not_modified:
+        return not_modified
     return db.query(models.ServiceType).filter(models.ServiceType.active == True).all()
 
 
@@ -0,0 +1,163 @@
+import asyncio
+import heapq
+import itertools
+import math
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+# Limits are per worker process: divide the OpenAI tier by the worker count
+MAX_CONCURRENT_TURNS = int(os.getenv("CHAT_MAX_CONCURRENT_TURNS", "8"))
+MAX_QUEUE = int(os.getenv("CHAT_MAX_QUEUE", "32"))
+MAX_WAIT_SECONDS = float(os.getenv("CHAT_MAX_WAIT_SECONDS", "10"))
+# Token bucket in turns: OpenAI requests-per-minute / LLM calls per turn
+OPENAI_RPM = float(os.getenv("OPENAI_RPM", "500"))
+LLM_CALLS_PER_TURN = float(os.getenv("LLM_CALLS_PER_TURN", "3"))
+TURN_BURST = int(os.getenv("CHAT_TURN_BURST", "10"))
+
+# Lower value is served first
+PRIORITY_IN_PROGRESS = 0
+PRIORITY_NEW = 1
+
+QUEUE_DEPTH = Gauge("chat_admission_queue_depth", "Chat turns waiting for admission")
+ACTIVE_TURNS = Gauge("chat_admission_active_turns", "Chat turns currently admitted")
+WAIT_SECONDS = Histogram(
+    "chat_admission_wait_seconds", "Time a chat turn waited for admission", ["priority"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20),
+)
+REJECTED = Counter("chat_admission_rejected_total", "Chat turns rejected as busy", ["reason"])
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Chat admission rejected ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Gate in front of LLM-bound chat turns, for one event loop.
+
+    A turn starts when fewer than `max_concurrent` turns are running and the
+    token bucket (refilled at `rate` turns/second, up to `burst`) has a
+    token. Otherwise it waits in a priority queue; in-progress bookings are
+    served before new sessions, FIFO within a priority. A full queue, or a
+    wait longer than `max_wait`, raises AdmissionRejected with a Retry-After
+    estimate instead of piling more work onto the provider.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = MAX_CONCURRENT_TURNS,
+        max_queue: int = MAX_QUEUE,
+        max_wait: float = MAX_WAIT_SECONDS,
+        rate: float = OPENAI_RPM / LLM_CALLS_PER_TURN / 60,
+        burst: int = TURN_BURST,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.rate = rate
+        self.burst = burst
+
+        self._active = 0
+        self._tokens = float(burst)
+        self._refilled = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled) * self.rate)
+        self._refilled = now
+
+    def _waiting(self) -> int:
+        return sum(1 for _, _, f in self._waiters if not f.done())
+
+    def _can_start(self) -> bool:
+        self._refill()
+        return self._active < self.max_concurrent and self._tokens >= 1
+
+    def _start(self) -> None:
+        self._active += 1
+        self._tokens -= 1
+        ACTIVE_TURNS.set(self._active)
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        while self._waiters and self._can_start():
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # timed out while queued
+                continue
+            self._start()
+            future.set_result(None)
+        QUEUE_DEPTH.set(self._waiting())
+
+        # Slots free but bucket empty: wake up when the next token lands
+        if self._waiters and self._active < self.max_concurrent and self._timer is None:
+            delay = max(0.0, (1 - self._tokens) / self.rate)
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def retry_after(self) -> int:
+        """Seconds until a newly queued turn would plausibly be admitted."""
+        return max(1, math.ceil((self._waiting() + 1) / self.rate))
+
+    @asynccontextmanager
+    async def admit(self, priority: int = PRIORITY_NEW):
+        started = time.monotonic()
+        if not self._waiters and self._can_start():
+            self._start()
+        else:
+            if self._waiting() >= self.max_queue:
+                REJECTED.labels(reason="queue_full").inc()
+                raise AdmissionRejected("queue_full", self.retry_after())
+
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._seq), future))
+            QUEUE_DEPTH.set(self._waiting())
+            self._dispatch()
+
+            await asyncio.wait({future}, timeout=self.max_wait)
+            if not future.done():
+                future.cancel()
+                QUEUE_DEPTH.set(self._waiting())
+                REJECTED.labels(reason="timeout").inc()
+                raise AdmissionRejected("timeout", self.retry_after())
+
+        WAIT_SECONDS.labels(priority=str(priority)).observe(time.monotonic() - started)
+        try:
+            yield
+        finally:
+            self._active -= 1
+            ACTIVE_TURNS.set(self._active)
+            self._dispatch()
+
+
+def session_priority(db: Session, session_id: str) -> int:
+    """Sessions that already identified a patient or picked appointments go first."""
+    row = db.query(models.SessionState.data).filter(
+        models.SessionState.session_id == session_id
+    ).first()
+    state = row[0] if row else {}
+    if state.get("patient_id") or state.get("phone_number") or state.get("pending_appointments"):
+        return PRIORITY_IN_PROGRESS
+    return PRIORITY_NEW
+
+
+_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """Per-process controller; only touched from the event loop thread."""
+    global _controller
+    if _controller is None:
+        _controller = AdmissionController()
+    return _controller
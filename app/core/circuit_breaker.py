@@ -0,0 +1,142 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Callable, Optional
+
+from prometheus_client import Counter, Gauge
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+BREAKER_STATE = Gauge(
+    "circuit_breaker_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)", ["name"],
+)
+BREAKER_TRANSITIONS = Counter(
+    "circuit_breaker_transitions_total", "Circuit breaker state changes", ["name", "to"],
+)
+BREAKER_CALLS = Counter(
+    "circuit_breaker_calls_total", "Calls through a circuit breaker by outcome",
+    ["name", "operation", "outcome"],
+)
+
+
+class CircuitOpen(Exception):
+    """Raised instead of calling the dependency while the breaker is open."""
+
+
+class DeadlineExceeded(Exception):
+    """The call did not return within its deadline (it may still finish in the background)."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with per-call deadlines.
+
+    Closed: calls go through; `failure_threshold` failures or timeouts in a
+    row open the circuit. Open: calls fail fast with CircuitOpen for
+    `cooldown` seconds. Half-open: one probe call is let through at a time
+    (the rest keep failing fast); success closes the circuit, failure opens
+    it again.
+
+    Deadlines are enforced by running the call on a small worker pool, so a
+    hung socket costs the caller `deadline` seconds, not the client timeout.
+    `is_failure` decides which exceptions count against the dependency
+    (e.g. a 404 is the caller's problem, a 503 is not).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        cooldown: float = 30.0,
+        max_workers: int = 8,
+        is_failure: Callable[[BaseException], bool] = lambda e: True,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.is_failure = is_failure
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-call")
+        BREAKER_STATE.labels(name=name).set(_STATE_VALUES[CLOSED])
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                return HALF_OPEN
+            return self._state
+
+    def _transition(self, state: str) -> None:
+        # Caller holds self._lock
+        if state == self._state:
+            return
+        self._state = state
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+        BREAKER_STATE.labels(name=self.name).set(_STATE_VALUES[state])
+        BREAKER_TRANSITIONS.labels(name=self.name, to=state).inc()
+
+    def _admit(self) -> bool:
+        """Returns whether this call is the half-open probe."""
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    raise CircuitOpen(f"{self.name} circuit is open")
+                self._transition(HALF_OPEN)
+            if self._state == HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpen(f"{self.name} circuit is half-open, probe in flight")
+                self._probing = True
+                return True
+            return False
+
+    def _record(self, ok: bool, probe: bool) -> None:
+        with self._lock:
+            if probe:
+                self._probing = False
+            if ok:
+                self._failures = 0
+                self._transition(CLOSED)
+                return
+            self._failures += 1
+            if probe or self._failures >= self.failure_threshold:
+                self._transition(OPEN)
+
+    def call(self, operation: str, fn: Callable[..., Any], *args, deadline: Optional[float] = None, **kwargs) -> Any:
+        try:
+            probe = self._admit()
+        except CircuitOpen:
+            BREAKER_CALLS.labels(name=self.name, operation=operation, outcome="short_circuited").inc()
+            raise
+
+        # The pool thread runs in the caller's context, so the current turn
+        # (and tracing span) still see the call
+        ctx = contextvars.copy_context()
+        future = self._pool.submit(ctx.run, fn, *args, **kwargs)
+        try:
+            result = future.result(timeout=deadline)
+        except FutureTimeout:
+            self._record(False, probe)
+            BREAKER_CALLS.labels(name=self.name, operation=operation, outcome="timeout").inc()
+            raise DeadlineExceeded(f"{self.name}.{operation} exceeded {deadline}s")
+        except Exception as e:
+            counted = self.is_failure(e)
+            # Errors that say nothing about the dependency's health still end a probe
+            self._record(not counted, probe)
+            BREAKER_CALLS.labels(
+                name=self.name, operation=operation, outcome="failure" if counted else "error",
+            ).inc()
+            raise
+
+        self._record(True, probe)
+        BREAKER_CALLS.labels(name=self.name, operation=operation, outcome="success").inc()
+        return result
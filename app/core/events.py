@@ -0,0 +1,216 @@
+import asyncio
+import json
+import logging
+import select
+import threading
+from typing import Any, Dict, Optional, Set
+
+from prometheus_client import Gauge
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "admin_events"
+# Events a slow client may fall behind by before it is told to resync
+CLIENT_QUEUE_SIZE = 256
+RECONNECT_SECONDS = 5
+
+SUBSCRIBERS = Gauge("admin_event_subscribers", "Dashboards connected to /events")
+
+
+# =========================
+# Triggers
+# =========================
+
+# Small deltas only: NOTIFY payloads are capped at 8000 bytes
+TRIGGER_DDL = [
+    f"""
+    CREATE OR REPLACE FUNCTION notify_appointment_event() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{CHANNEL}', json_build_object(
+            'type', 'appointment',
+            'op', lower(TG_OP),
+            'row', json_build_object(
+                'id', NEW.id,
+                'patient_id', NEW.patient_id,
+                'service_type_id', NEW.service_type_id,
+                'provider_id', NEW.provider_id,
+                'appointment_date', NEW.appointment_date,
+                'start_time', NEW.start_time,
+                'end_time', NEW.end_time,
+                'status', NEW.status,
+                'sync_status', NEW.sync_status,
+                'google_event_id', NEW.google_event_id,
+                'created_at', NEW.created_at
+            )
+        )::text);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    f"""
+    CREATE OR REPLACE FUNCTION notify_agent_log_event() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('{CHANNEL}', json_build_object(
+            'type', 'log',
+            'op', 'insert',
+            'row', json_build_object(
+                'id', NEW.id,
+                'patient_id', NEW.patient_id,
+                'agent_action', NEW.agent_action,
+                'log_context', left(NEW.log_context, 300),
+                'system_decision', left(NEW.system_decision, 1000),
+                'confidence_score', NEW.confidence_score,
+                'created_at', NEW.created_at
+            )
+        )::text);
+        RETURN NEW;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS appointments_notify_insert ON appointments",
+    """
+    CREATE TRIGGER appointments_notify_insert AFTER INSERT ON appointments
+    FOR EACH ROW EXECUTE FUNCTION notify_appointment_event()
+    """,
+    "DROP TRIGGER IF EXISTS appointments_notify_status ON appointments",
+    """
+    CREATE TRIGGER appointments_notify_status AFTER UPDATE OF status ON appointments
+    FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status)
+    EXECUTE FUNCTION notify_appointment_event()
+    """,
+    "DROP TRIGGER IF EXISTS agent_logs_notify_insert ON agent_logs",
+    """
+    CREATE TRIGGER agent_logs_notify_insert AFTER INSERT ON agent_logs
+    FOR EACH ROW EXECUTE FUNCTION notify_agent_log_event()
+    """,
+]
+
+
+def install_triggers(engine: Engine) -> None:
+    """Creates (or replaces) the NOTIFY triggers; run from the migration step."""
+    with engine.begin() as conn:
+        for ddl in TRIGGER_DDL:
+            conn.execute(text(ddl))
+
+
+# =========================
+# Listener / Fan-out
+# =========================
+
+class _Subscriber:
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.overflowed = False
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        # Runs on the subscriber's event loop
+        if self.overflowed:
+            if not self.queue.empty():
+                return
+            self.overflowed = False
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog and tell the dashboard to refetch instead
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+
+class EventBroadcaster:
+    """
+    One LISTEN connection per worker process, fanned out to any number of
+    SSE clients. The listener thread starts with the first subscriber and
+    reconnects on its own if the connection drops (clients get a `resync`
+    event, since notifications sent meanwhile are lost).
+    """
+
+    def __init__(self, engine: Engine, channel: str = CHANNEL):
+        self.engine = engine
+        self.channel = channel
+        self._subscribers: Set[_Subscriber] = set()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def subscribe(self) -> _Subscriber:
+        subscriber = _Subscriber(asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscriber)
+            SUBSCRIBERS.set(len(self._subscribers))
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="admin-events-listener", daemon=True)
+                self._thread.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber: _Subscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+            SUBSCRIBERS.set(len(self._subscribers))
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _publish(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(subscriber.offer, event)
+            except RuntimeError:
+                # Loop already closed; the client is gone
+                self.unsubscribe(subscriber)
+
+    def _run(self) -> None:
+        first = True
+        while not self._stop.is_set():
+            try:
+                self._listen(announce_resync=not first)
+            except Exception as e:
+                logger.warning(f"Admin event listener lost its connection, retrying: {e}")
+            first = False
+            self._stop.wait(RECONNECT_SECONDS)
+
+    def _listen(self, announce_resync: bool) -> None:
+        # A dedicated connection outside the pool, in autocommit for LISTEN
+        raw = self.engine.raw_connection()
+        raw.detach()
+        pg = raw.driver_connection
+        try:
+            pg.autocommit = True
+            with pg.cursor() as cur:
+                cur.execute(f"LISTEN {self.channel}")
+            if announce_resync:
+                self._publish({"type": "resync"})
+
+            while not self._stop.is_set():
+                if select.select([pg], [], [], 5.0) == ([], [], []):
+                    continue
+                pg.poll()
+                while pg.notifies:
+                    notify = pg.notifies.pop(0)
+                    try:
+                        self._publish(json.loads(notify.payload))
+                    except ValueError:
+                        logger.warning(f"Ignoring malformed admin event: {notify.payload[:200]}")
+        finally:
+            raw.close()
+
+
+_broadcaster: Optional[EventBroadcaster] = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_broadcaster() -> EventBroadcaster:
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                from app.db.database import engine
+                _broadcaster = EventBroadcaster(engine)
+    return _broadcaster
@@ -0,0 +1,168 @@
+import hashlib
+import os
+import time
+from typing import Dict, Iterable, Optional
+
+from fastapi import Request, Response
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db import models
+
+# Clinic setup changes rarely; clients and CDNs may reuse it this long unasked
+REFERENCE_MAX_AGE = int(os.getenv("REFERENCE_CACHE_MAX_AGE", "300"))
+AVAILABILITY_MAX_AGE = int(os.getenv("AVAILABILITY_CACHE_MAX_AGE", "15"))
+# Availability also depends on Google Calendar and the clock (lead time), which
+# no trigger sees; its ETags roll over at least this often
+AVAILABILITY_ETAG_SECONDS = int(os.getenv("AVAILABILITY_ETAG_SECONDS", "60"))
+
+REFERENCE_CACHE_CONTROL = f"public, max-age={REFERENCE_MAX_AGE}, stale-while-revalidate={REFERENCE_MAX_AGE}"
+AVAILABILITY_CACHE_CONTROL = f"public, max-age={AVAILABILITY_MAX_AGE}"
+
+# Tables whose writes change what GET /availability returns
+AVAILABILITY_TABLES = (
+    "service_types",
+    "business_hours",
+    "blocked_slots",
+    "appointments",
+    "providers",
+    "provider_hours",
+    "provider_services",
+)
+
+
+# =========================
+# Triggers
+# =========================
+
+# Statement-level, so a bulk write bumps once; the bump commits with the write
+VERSION_TRIGGER_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION bump_cache_version() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO cache_versions (name, version) VALUES (TG_TABLE_NAME, 1)
+        ON CONFLICT (name) DO UPDATE SET version = cache_versions.version + 1;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+]
+for _table in AVAILABILITY_TABLES:
+    # Sync bookkeeping on appointments (sync_status, google_event_id) leaves slots unchanged
+    _update = (
+        "UPDATE OF status, appointment_date, start_time, end_time, provider_id"
+        if _table == "appointments" else "UPDATE"
+    )
+    VERSION_TRIGGER_DDL += [
+        f"DROP TRIGGER IF EXISTS {_table}_cache_version ON {_table}",
+        f"""
+        CREATE TRIGGER {_table}_cache_version
+        AFTER INSERT OR {_update} OR DELETE OR TRUNCATE ON {_table}
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_cache_version()
+        """,
+    ]
+
+
+# Row-level counters per day ('day:2025-03-14') and per patient ('patient:42'),
+# so the agent's tool memo only drops what a booking or block actually touched
+SCHEDULE_TRIGGER_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION bump_schedule_versions() RETURNS trigger AS $$
+    DECLARE
+        keys text[] := '{}';
+    BEGIN
+        IF TG_TABLE_NAME = 'appointments' THEN
+            IF TG_OP <> 'INSERT' THEN
+                keys := keys || ('day:' || to_char(OLD.appointment_date, 'YYYY-MM-DD'))
+                             || ('patient:' || OLD.patient_id);
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                keys := keys || ('day:' || to_char(NEW.appointment_date, 'YYYY-MM-DD'))
+                             || ('patient:' || NEW.patient_id);
+            END IF;
+        ELSE
+            IF TG_OP <> 'INSERT' THEN
+                keys := keys || ('day:' || to_char(OLD.date, 'YYYY-MM-DD'));
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                keys := keys || ('day:' || to_char(NEW.date, 'YYYY-MM-DD'));
+            END IF;
+        END IF;
+        INSERT INTO cache_versions (name, version)
+        SELECT DISTINCT k, 1 FROM unnest(keys) AS k
+        ON CONFLICT (name) DO UPDATE SET version = cache_versions.version + 1;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS appointments_schedule_version ON appointments",
+    """
+    CREATE TRIGGER appointments_schedule_version
+    AFTER INSERT OR UPDATE OF status, appointment_date, start_time, end_time, provider_id, patient_id
+        OR DELETE ON appointments
+    FOR EACH ROW EXECUTE FUNCTION bump_schedule_versions()
+    """,
+    "DROP TRIGGER IF EXISTS blocked_slots_schedule_version ON blocked_slots",
+    """
+    CREATE TRIGGER blocked_slots_schedule_version
+    AFTER INSERT OR UPDATE OR DELETE ON blocked_slots
+    FOR EACH ROW EXECUTE FUNCTION bump_schedule_versions()
+    """,
+]
+
+
+def install_version_triggers(engine: Engine) -> None:
+    """Creates (or replaces) the cache version triggers; run from the migration step."""
+    with engine.begin() as conn:
+        for ddl in VERSION_TRIGGER_DDL + SCHEDULE_TRIGGER_DDL:
+            conn.execute(text(ddl))
+
+
+# =========================
+# Conditional GET
+# =========================
+
+def read_versions(db: Session, names: Iterable[str]) -> Dict[str, int]:
+    """Current write counters for `names` (0 for anything never written)."""
+    names = list(names)
+    found = dict(
+        db.query(models.CacheVersion.name, models.CacheVersion.version)
+        .filter(models.CacheVersion.name.in_(names))
+        .all()
+    )
+    return {name: found.get(name, 0) for name in names}
+
+
+def resource_etag(db: Session, tables: Iterable[str], *parts) -> str:
+    """Strong ETag from the tables' write counters plus any request-specific parts."""
+    tables = sorted(tables)
+    versions = read_versions(db, tables)
+    key = ":".join([f"{t}={versions[t]}" for t in tables] + [str(p) for p in parts])
+    return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+
+def availability_etag(db: Session, *parts) -> str:
+    bucket = int(time.time() // AVAILABILITY_ETAG_SECONDS)
+    return resource_etag(db, AVAILABILITY_TABLES, bucket, *parts)
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match
+    candidates = (c.strip() for c in if_none_match.split(","))
+    return etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+
+def conditional_get(request: Request, response: Response, etag: str, cache_control: str) -> Optional[Response]:
+    """
+    Sets ETag and Cache-Control on `response`. Returns a bodiless 304 to send
+    instead when the client already holds this version, else None.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
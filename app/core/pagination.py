@@ -0,0 +1,114 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def _to_jsonable(value: Any) -> Any:
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Packs the sort key of the last row into an opaque, URL-safe cursor.
+    """
+    raw = json.dumps([_to_jsonable(v) for v in values]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if not isinstance(values, list):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def keyset_page(
+    query: Query,
+    columns: Sequence[Any],
+    cursor: Optional[str],
+    limit: int,
+    parsers: Sequence[Any] = (),
+) -> Tuple[list, Optional[str]]:
+    """
+    Applies descending keyset pagination over `columns` (last one must be
+    unique, usually the primary key). Uses a row-value comparison so
+    Postgres can walk a matching composite index instead of OFFSET scans.
+
+    `parsers` converts decoded cursor values back to Python types
+    (e.g. date.fromisoformat) and must line up with `columns`.
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(columns):
+            raise ValueError("Invalid cursor")
+        if parsers:
+            try:
+                values = [parse(v) for parse, v in zip(parsers, values)]
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+        query = query.filter(tuple_(*columns) < tuple_(*values))
+
+    rows = (
+        query.order_by(*[c.desc() for c in columns])
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+
+    return rows, next_cursor
+
+
+def ranked_page(
+    query: Query,
+    score: Any,
+    id_column: Any,
+    cursor: Optional[str],
+    limit: int,
+) -> Tuple[list, Optional[str]]:
+    """
+    Keyset pagination for relevance-ranked results, ordered by (score, id)
+    descending. `query` must select (entity, score); returns the entities.
+    """
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != 2:
+            raise ValueError("Invalid cursor")
+        try:
+            last_score, last_id = float(values[0]), int(values[1])
+        except (TypeError, ValueError):
+            raise ValueError("Invalid cursor")
+        query = query.filter(tuple_(score, id_column) < tuple_(last_score, last_id))
+
+    rows = (
+        query.order_by(score.desc(), id_column.desc())
+        .limit(limit + 1)
+        .all()
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        entity, last_score = rows[-1]
+        next_cursor = encode_cursor([last_score, getattr(entity, id_column.key)])
+
+    return [entity for entity, _ in rows], next_cursor
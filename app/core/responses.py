@@ -0,0 +1,60 @@
+import gzip
+import json
+from datetime import date, datetime, time
+from typing import Any, Optional, Sequence
+
+from fastapi import Request, Response
+
+try:
+    import orjson
+except ImportError:  # stdlib fallback, same output
+    orjson = None
+
+# Smaller bodies are not worth the CPU (and often fit one TCP segment anyway)
+GZIP_MIN_BYTES = 1024
+# Level 5 gets most of the ratio of 9 at a fraction of the cost on JSON
+GZIP_LEVEL = 5
+
+
+def _json_default(value: Any):
+    if isinstance(value, datetime):
+        # Match Pydantic / orjson UTC_Z output for aware datetimes
+        return value.isoformat().replace("+00:00", "Z")
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def dumps(payload: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_UTC_Z)
+    return json.dumps(payload, default=_json_default, separators=(",", ":")).encode()
+
+
+def json_response(request: Request, payload: Any) -> Response:
+    """JSON response, gzipped when the client accepts it and the body is large."""
+    body = dumps(payload)
+    headers = {"Vary": "Accept-Encoding"}
+    if len(body) >= GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+        headers["Content-Encoding"] = "gzip"
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def page_response(
+    request: Request,
+    rows: Sequence[Sequence[Any]],
+    columns: Sequence[Any],
+    next_cursor: Optional[str],
+) -> Response:
+    """
+    Fast path for list endpoints: `rows` are plain column tuples selected in
+    `columns` order and go straight to JSON, skipping ORM instances and
+    per-row Pydantic validation. The route keeps its `response_model` for
+    the OpenAPI schema; the columns must produce that shape.
+    """
+    names = [c.key for c in columns]
+    return json_response(request, {
+        "items": [dict(zip(names, row)) for row in rows],
+        "next_cursor": next_cursor,
+    })
@@ -0,0 +1,66 @@
+import re
+from datetime import date
+from typing import Optional, Tuple
+
+# pg_trgm needs at least one full trigram to use the GIN index for
+# ILIKE '%q%'; a 1-2 character query falls back to scanning every patient
+MIN_QUERY_LENGTH = 3
+
+_DATE_PREFIX = re.compile(r"^(\d{4})(?:-(\d{1,2})(?:-(\d{0,2}))?)?$")
+
+
+def like_pattern(q: str) -> str:
+    """Substring ILIKE pattern with the user's wildcards escaped."""
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _digit_span(text: str, low: int, high: int) -> Optional[Tuple[int, int]]:
+    """Values in [low, high] whose two-digit form starts with `text`."""
+    if len(text) == 2:
+        value = int(text)
+        return (value, value) if low <= value <= high else None
+    first = int(text) * 10
+    span = (max(low, first), min(high, first + 9))
+    return span if span[0] <= span[1] else None
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+
+
+def date_prefix_range(q: str) -> Optional[Tuple[date, date]]:
+    """
+    Turns an ISO date prefix ("2026", "2026-03", "2026-03-1") into the
+    half-open date range it covers, so it can use a btree range scan.
+    Returns None when `q` is not a date prefix.
+    """
+    match = _DATE_PREFIX.match(q.strip())
+    if not match:
+        return None
+
+    year = int(match.group(1))
+    if not 1900 <= year <= 2100:
+        return None
+    month_text, day_text = match.group(2), match.group(3)
+
+    if month_text is None:
+        return date(year, 1, 1), date(year + 1, 1, 1)
+
+    if day_text is not None:
+        # "2026-3-" or "2026-3-14": a complete month before the dash
+        months = (int(month_text), int(month_text)) if 1 <= int(month_text) <= 12 else None
+    else:
+        months = _digit_span(month_text, 1, 12)
+    if months is None:
+        return None
+
+    if not day_text:
+        return date(year, months[0], 1), _month_end(year, months[1])
+
+    month = months[0]
+    last_day = (_month_end(year, month) - date(year, month, 1)).days
+    days = _digit_span(day_text, 1, last_day)
+    if days is None:
+        return None
+    return date(year, month, days[0]), date.fromordinal(date(year, month, days[1]).toordinal() + 1)
@@ -1,23 +1,42 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Any, Union
-from jose import jwt
-from passlib.context import CryptContext
 
 
 SECRET_KEY = "hkshfkjsdhfkjsdhfkjsdhfkjssd"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# jose / passlib (and their crypto backends) are imported on first use to keep startup fast
+
+@lru_cache(maxsize=1)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def create_access_token(subject: Union[str, Any]) -> str:
+    from jose import jwt
+
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    return encoded_jwt
+
+def decode_access_token(token: str) -> str:
+    """Returns the token subject; raises ValueError if invalid or expired."""
+    from jose import JWTError, jwt
+
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError as e:
+        raise ValueError(f"Invalid token: {e}")
+    subject = payload.get("sub")
+    if not subject:
+        raise ValueError("Invalid token: missing subject")
+    return subject
@@ -0,0 +1,174 @@
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from opentelemetry import trace
+from prometheus_client import Counter, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+tracer = trace.get_tracer("healthcare-booking-agent")
+
+# =========================
+# Prometheus Metrics
+# =========================
+
+TURN_SECONDS = Histogram(
+    "agent_turn_seconds", "End-to-end latency of one chat turn",
+    buckets=(0.25, 0.5, 1, 2, 3, 5, 8, 13, 21, 34),
+)
+PHASE_SECONDS = Histogram(
+    "agent_phase_seconds", "Latency of each phase of a chat turn", ["phase"],
+)
+LLM_CALL_SECONDS = Histogram(
+    "agent_llm_call_seconds", "Latency of individual LLM calls", ["model"],
+    buckets=(0.25, 0.5, 1, 2, 3, 5, 8, 13, 21),
+)
+TOOL_CALL_SECONDS = Histogram(
+    "agent_tool_call_seconds", "Latency of individual tool calls", ["tool"],
+)
+EXTERNAL_CALL_SECONDS = Histogram(
+    "external_call_seconds", "Latency of calls to external services", ["service"],
+)
+LLM_TOKENS = Counter(
+    "agent_llm_tokens_total", "Tokens consumed by LLM calls", ["kind"],
+)
+
+
+def configure_tracing() -> None:
+    """
+    Installs an OTLP span exporter when OTEL_EXPORTER_OTLP_ENDPOINT is set.
+    Without it the API stays a no-op and spans cost next to nothing.
+    """
+    if not os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+        return
+
+    from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": os.getenv("OTEL_SERVICE_NAME", "healthcare-booking-agent")})
+    )
+    provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+    trace.set_tracer_provider(provider)
+
+
+# =========================
+# Per-Turn Trace
+# =========================
+
+class TurnTrace:
+    """
+    Collects the timing breakdown of a single `handle_message` call.
+    Every phase is also emitted as an OpenTelemetry span and observed
+    into the Prometheus histograms.
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.llm_calls: List[Dict[str, Any]] = []
+        self.tool_calls: List[Dict[str, Any]] = []
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.external_seconds: Dict[str, float] = {}
+        self.total_seconds: Optional[float] = None
+        # Free-form tags for the turn (e.g. response cache outcome)
+        self.attributes: Dict[str, Any] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        with tracer.start_as_current_span(f"agent.{name}"):
+            try:
+                yield
+            finally:
+                elapsed = time.perf_counter() - started
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed
+                PHASE_SECONDS.labels(phase=name).observe(elapsed)
+
+    def finish(self) -> None:
+        self.total_seconds = time.perf_counter() - self.started
+        TURN_SECONDS.observe(self.total_seconds)
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(c.get("prompt_tokens", 0) for c in self.llm_calls)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(c.get("completion_tokens", 0) for c in self.llm_calls)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "total_ms": round((self.total_seconds or 0) * 1000, 1),
+            "phases_ms": {k: round(v * 1000, 1) for k, v in self.phases.items()},
+            "llm_calls": self.llm_calls,
+            "tool_calls": self.tool_calls,
+            "db_queries": self.db_queries,
+            "db_ms": round(self.db_seconds * 1000, 1),
+            "external_ms": {k: round(v * 1000, 1) for k, v in self.external_seconds.items()},
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "attributes": self.attributes,
+        }
+
+
+_current_turn: ContextVar[Optional[TurnTrace]] = ContextVar("current_turn", default=None)
+
+
+@contextmanager
+def turn_trace(session_id: str):
+    turn = TurnTrace(session_id)
+    token = _current_turn.set(turn)
+    try:
+        with tracer.start_as_current_span("agent.turn") as span:
+            span.set_attribute("session_id", session_id)
+            yield turn
+    finally:
+        turn.finish()
+        _current_turn.reset(token)
+
+
+def current_turn() -> Optional[TurnTrace]:
+    return _current_turn.get()
+
+
+@contextmanager
+def external_call(service: str):
+    """Times a call to an external service (e.g. Google Calendar)."""
+    started = time.perf_counter()
+    with tracer.start_as_current_span(f"external.{service}"):
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            EXTERNAL_CALL_SECONDS.labels(service=service).observe(elapsed)
+            turn = _current_turn.get()
+            if turn is not None:
+                turn.external_seconds[service] = turn.external_seconds.get(service, 0.0) + elapsed
+
+
+# =========================
+# DB Query Accounting
+# =========================
+
+def instrument_engine(engine: Engine) -> None:
+    """Counts queries and time spent in the DB against the current turn."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_started"].pop()
+        turn = _current_turn.get()
+        if turn is not None:
+            turn.db_queries += 1
+            turn.db_seconds += time.perf_counter() - started
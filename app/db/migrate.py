@@ -0,0 +1,22 @@
+"""
+Explicit schema migration step. Run before starting the API:
+
+    python -m app.db.migrate
+"""
+from app.core.events import install_triggers
+from app.core.http_cache import install_version_triggers
+from app.db.database import engine
+from app.db.session import create_tables
+
+
+def migrate() -> None:
+    create_tables()
+    # NOTIFY triggers behind the admin /events stream
+    install_triggers(engine)
+    # Write counters behind the ETags of public reads and the agent's tool memo
+    install_version_triggers(engine)
+
+
+if __name__ == "__main__":
+    migrate()
+    print("Database schema is up to date.")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Time, DateTime, ForeignKey, Boolean, Float
+from sqlalchemy import Column, Integer, String, Date, Time, DateTime, ForeignKey, Boolean, Float, Index
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 from sqlalchemy.sql import func
@@ -19,11 +19,21 @@ class Patient(Base):
     email = Column(String, nullable=True)
     is_insured = Column(Boolean, default=False)
     insurance_provider = Column(String, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     appointments = relationship("Appointment", back_populates="patient")
     logs = relationship("AgentLog", back_populates="patient")
 
+    # Substring search from the admin dashboard (requires the pg_trgm extension)
+    __table_args__ = (
+        Index("ix_patients_full_name_trgm", "full_name",
+              postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"}),
+        Index("ix_patients_phone_number_trgm", "phone_number",
+              postgresql_using="gin", postgresql_ops={"phone_number": "gin_trgm_ops"}),
+        Index("ix_patients_email_trgm", "email",
+              postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+    )
+
 
 class ServiceType(Base):
     __tablename__ = "service_types"
@@ -59,6 +69,65 @@ class BlockedSlot(Base):
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
     reason = Column(String, nullable=True)
+    # NULL blocks the whole clinic; otherwise only this provider
+    provider_id = Column(Integer, ForeignKey("providers.id"), nullable=True)
+
+    __table_args__ = (
+        Index("ix_blocked_slots_date_provider", "date", "provider_id"),
+    )
+
+
+# -----------------------------
+# Providers (doctors / rooms)
+# -----------------------------
+
+class Provider(Base):
+    """A bookable resource with its own hours, blocks and calendar"""
+    __tablename__ = "providers"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, nullable=False)
+    kind = Column(String, nullable=False, default="doctor")  # doctor | room
+    # Google Calendar checked for busy time and used for events;
+    # NULL skips the busy check and files events on the clinic's primary calendar
+    calendar_id = Column(String, nullable=True)
+    active = Column(Boolean, default=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    hours = relationship("ProviderHour", back_populates="provider")
+    services = relationship("ProviderService", back_populates="provider")
+
+
+class ProviderHour(Base):
+    """Working hours per weekday; a missing day falls back to the clinic's BusinessHour"""
+    __tablename__ = "provider_hours"
+
+    id = Column(Integer, primary_key=True, index=True)
+    provider_id = Column(Integer, ForeignKey("providers.id"), nullable=False)
+    day_of_week = Column(String, nullable=False)
+    open_time = Column(Time, nullable=True)
+    close_time = Column(Time, nullable=True)
+    is_closed = Column(Boolean, default=False)
+
+    provider = relationship("Provider", back_populates="hours")
+
+    __table_args__ = (
+        Index("uq_provider_hours_provider_day", "provider_id", "day_of_week", unique=True),
+    )
+
+
+class ProviderService(Base):
+    """Which service types a provider can deliver"""
+    __tablename__ = "provider_services"
+
+    provider_id = Column(Integer, ForeignKey("providers.id"), primary_key=True)
+    service_type_id = Column(Integer, ForeignKey("service_types.id"), primary_key=True)
+
+    provider = relationship("Provider", back_populates="services")
+
+    __table_args__ = (
+        Index("ix_provider_services_service_type", "service_type_id", "provider_id"),
+    )
 
 
 class Appointment(Base):
@@ -76,13 +145,27 @@ class Appointment(Base):
     sync_status = Column(String, default="not_synced")
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Drives incremental analytics refreshes (any change re-aggregates the day)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     google_event_id = Column(String, nullable=True)
+    # NULL for bookings made before providers were configured
+    provider_id = Column(Integer, ForeignKey("providers.id"), nullable=True)
 
     patient = relationship("Patient", back_populates="appointments")
     service_type = relationship("ServiceType", back_populates="appointments")
+    provider = relationship("Provider")
     notifications = relationship("Notification", back_populates="appointment")
 
+    # Keyset pagination walks (appointment_date, id) for the admin list
+    __table_args__ = (
+        Index("ix_appointments_date_id", "appointment_date", "id"),
+        Index("ix_appointments_status_date_id", "status", "appointment_date", "id"),
+        Index("ix_appointments_patient_date_id", "patient_id", "appointment_date", "id"),
+        Index("ix_appointments_provider_date", "provider_id", "appointment_date"),
+        Index("ix_appointments_updated_at", "updated_at"),
+    )
+
 
 class AgentLog(Base):
     __tablename__ = "agent_logs"
@@ -93,10 +176,15 @@ class AgentLog(Base):
     agent_action = Column(String, nullable=False)
     system_decision = Column(String, nullable=False)
     confidence_score = Column(Float, nullable=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
     patient = relationship("Patient", back_populates="logs")
 
+    __table_args__ = (
+        Index("ix_agent_logs_action_id", "agent_action", "id"),
+        Index("ix_agent_logs_patient_id_id", "patient_id", "id"),
+    )
+
 
 class Notification(Base):
     __tablename__ = "notifications"
@@ -106,11 +194,29 @@ class Notification(Base):
     channel = Column(String, nullable=False)
     recipient = Column(String, nullable=False)
     message = Column(String, nullable=False)
-    status = Column(String, default="sent")
+    # Doubles as the outbox queue: pending -> sending -> sent | failed (or back to pending to retry)
+    status = Column(String, default="pending")
     sent_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    # 'confirmation' or 'reminder'; selects the email template
+    kind = Column(String, nullable=False, default="confirmation", server_default="confirmation")
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(String, nullable=True)
+
     appointment = relationship("Appointment", back_populates="notifications")
 
+    __table_args__ = (
+        Index("ix_notifications_status_next_attempt", "status", "next_attempt_at"),
+        # At most one reminder per appointment, however many times the job runs
+        Index(
+            "uq_notifications_appointment_reminder",
+            "appointment_id", "kind",
+            unique=True,
+            postgresql_where=(kind == "reminder"),
+        ),
+    )
+
 
 class Conversation(Base):
     """Stores the literal chat history for the AI's memory"""
@@ -118,8 +224,12 @@ class Conversation(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String, nullable=False, index=True)
-    role = Column(String, nullable=False)  # 'human' or 'ai'
+    role = Column(String, nullable=False)  # 'user', 'assistant' or 'tool'
     content = Column(String, nullable=False)
+    # 'text', 'tool_call' (content = JSON args) or 'tool_result' (content = compact output)
+    message_type = Column(String, nullable=False, server_default="text")
+    tool_name = Column(String, nullable=True)
+    tool_call_id = Column(String, nullable=True)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
 
 
@@ -130,4 +240,120 @@ class SessionState(Base):
     session_id = Column(String, primary_key=True, index=True)
     # JSONB is faster to process and allows for indexing in Postgres
     data = Column(JSONB, default={}, nullable=False) 
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
\ No newline at end of file
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class WaitlistEntry(Base):
+    """Patients waiting for a slot to free up within a date window"""
+    __tablename__ = "waitlist_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
+    service_type_id = Column(Integer, ForeignKey("service_types.id"), nullable=False)
+
+    date_from = Column(Date, nullable=False)
+    date_to = Column(Date, nullable=False)
+    # Optional preferred window within the day; NULL means any time
+    preferred_start = Column(Time, nullable=True)
+    preferred_end = Column(Time, nullable=True)
+
+    status = Column(String, nullable=False, default="waiting")  # waiting | offered | expired
+    offered_date = Column(Date, nullable=True)
+    offered_time = Column(Time, nullable=True)
+    # Unanswered offers go back to the queue after WAITLIST_OFFER_TTL_HOURS
+    offered_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    patient = relationship("Patient")
+    service_type = relationship("ServiceType")
+
+    # Matching only ever looks at waiting entries whose window covers a date
+    __table_args__ = (
+        Index(
+            "ix_waitlist_waiting_window",
+            "date_from", "date_to", "id",
+            postgresql_where=(status == "waiting"),
+        ),
+    )
+
+
+class AgentTurn(Base):
+    """Latency breakdown of one chat turn, for querying slow turns later"""
+    __tablename__ = "agent_turns"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, nullable=False, index=True)
+    total_ms = Column(Float, nullable=False, index=True)
+    llm_calls = Column(Integer, nullable=False, default=0)
+    tool_calls = Column(Integer, nullable=False, default=0)
+    db_queries = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    # Full breakdown: per-phase ms, each LLM/tool call, DB and external time
+    breakdown = Column(JSONB, default={}, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+
+class ResponseCacheEntry(Base):
+    """Cached agent replies for turns that did not touch tools or state"""
+    __tablename__ = "response_cache"
+
+    key = Column(String, primary_key=True)
+    reply = Column(String, nullable=False)
+    # Set only for state-free FAQ turns, enables similarity lookups
+    state_free = Column(Boolean, nullable=False, default=False)
+    embedding = Column(JSONB, nullable=True)
+    scope = Column(String, nullable=False)  # prompt version + date the reply is valid for
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    last_hit_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+
+    __table_args__ = (
+        Index("ix_response_cache_semantic", "scope", "last_hit_at", postgresql_where=(state_free == True)),
+    )
+
+
+# -----------------------------
+# Analytics rollups
+# -----------------------------
+
+class AppointmentRollup(Base):
+    """Appointment counts per day, start hour, service type and status"""
+    __tablename__ = "appointment_rollups"
+
+    day = Column(Date, primary_key=True)
+    hour = Column(Integer, primary_key=True)
+    service_type_id = Column(Integer, primary_key=True)
+    status = Column(String, primary_key=True)
+    appointments = Column(Integer, nullable=False, default=0)
+    booked_minutes = Column(Integer, nullable=False, default=0)
+
+
+class AgentActionRollup(Base):
+    """AgentLog rows per day and action"""
+    __tablename__ = "agent_action_rollups"
+
+    day = Column(Date, primary_key=True)
+    agent_action = Column(String, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+
+class AnalyticsWatermark(Base):
+    """How far each rollup has consumed its source table"""
+    __tablename__ = "analytics_watermarks"
+
+    name = Column(String, primary_key=True)
+    value = Column(DateTime(timezone=True), nullable=True)  # appointments: max updated_at
+    last_id = Column(Integer, nullable=True)  # agent_logs: max id
+    refreshed_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+# -----------------------------
+# HTTP caching
+# -----------------------------
+
+class CacheVersion(Base):
+    """Write counter per table, bumped by triggers; ETags of public reads derive from it"""
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)  # table name
+    version = Column(Integer, nullable=False, default=0)
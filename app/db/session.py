@@ -1,9 +1,58 @@
+from sqlalchemy import inspect, text
+
 from app.db.database import SessionLocal, engine, Base
 
 
 def create_tables():
+    # Trigram GIN indexes on patients need pg_trgm (a trusted extension since PG 13)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
     Base.metadata.create_all(bind=engine)
 
+    # create_all skips tables that already exist, so add any
+    # columns and indexes that were introduced after the table was created.
+    _add_missing_columns()
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+def _add_missing_columns():
+    """
+    Adds model columns that an existing table lacks. This is not a real
+    migration: nothing is ever altered, renamed, dropped or backfilled
+    beyond a column's server default. Anything else needs hand-written SQL.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing:
+                    conn.execute(text(_add_column_ddl(table.name, column)))
+
+
+def _add_column_ddl(table_name: str, column) -> str:
+    ddl = f"ALTER TABLE {table_name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+    # Server defaults are carried over; existing rows get that value
+    default = getattr(column.server_default, "arg", None)
+    if isinstance(default, str):
+        ddl += f" DEFAULT '{default}'"
+    elif default is not None:
+        ddl += f" DEFAULT {default.compile(dialect=engine.dialect)}"
+    if not column.nullable:
+        # Existing rows need a value, and a Python-side default gives them none
+        if default is None:
+            raise RuntimeError(
+                f"Cannot add NOT NULL column {table_name}.{column.name} without a server_default; "
+                "add one to the model or migrate the table by hand"
+            )
+        ddl += " NOT NULL"
+    for fk in column.foreign_keys:
+        ddl += f" REFERENCES {fk.column.table.name} ({fk.column.name})"
+    return ddl
+
 
 def get_db():
     db = SessionLocal()
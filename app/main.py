@@ -1,12 +1,18 @@
 from fastapi import FastAPI, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from app.api import patients, appointments, availability, service_types, business_hours, chat, logs
-from app.db.session import create_tables
+from app.api import patients, appointments, availability, service_types, business_hours, chat, logs, providers, events, analytics
 from app.core.security import create_access_token
-from fastapi import Query
-from auth_livekit import create_livekit_token
+from fastapi import Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from dispatch_agent import dispatch_agent
+from app.services.notification_worker import NotificationWorker
+from app.services.reminder_service import ReminderScheduler
+from app.services.analytics_service import AnalyticsRefresher
+from app.core.telemetry import configure_tracing
+from app.core.events import get_broadcaster
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+import os
+
+configure_tracing()
 
 app = FastAPI(title="Healthcare Booking Assistant")
 
@@ -21,7 +27,30 @@ app.add_middleware(
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-create_tables()
+# Schema changes are applied by `python -m app.db.migrate`, not at import
+
+notification_worker = NotificationWorker()
+reminder_scheduler = ReminderScheduler()
+analytics_refresher = AnalyticsRefresher()
+
+
+@app.on_event("startup")
+def start_background_jobs():
+    # Set these to false when running the jobs as their own processes
+    if os.getenv("NOTIFICATION_WORKER_ENABLED", "true").lower() != "false":
+        notification_worker.start()
+    if os.getenv("REMINDER_SCHEDULER_ENABLED", "true").lower() != "false":
+        reminder_scheduler.start()
+    if os.getenv("ANALYTICS_REFRESHER_ENABLED", "true").lower() != "false":
+        analytics_refresher.start()
+
+
+@app.on_event("shutdown")
+def stop_background_jobs():
+    analytics_refresher.stop()
+    reminder_scheduler.stop()
+    notification_worker.stop()
+    get_broadcaster().stop()
 
 # PROTECTED ROUTES (Require Token)
 app.include_router(
@@ -36,6 +65,18 @@ app.include_router(
     tags=["Appointments"], 
     dependencies=[Depends(oauth2_scheme)]
 )
+app.include_router(
+    providers.router, 
+    prefix="/providers", 
+    tags=["Providers"], 
+    dependencies=[Depends(oauth2_scheme)]
+)
+app.include_router(
+    analytics.router, 
+    prefix="/analytics", 
+    tags=["Analytics"], 
+    dependencies=[Depends(oauth2_scheme)]
+)
 app.include_router(
     logs.router, 
     prefix="/logs", 
@@ -43,6 +84,9 @@ app.include_router(
     dependencies=[Depends(oauth2_scheme)]
 )
 
+# Live admin updates (SSE); authenticates with ?token= since EventSource cannot send headers
+app.include_router(events.router, prefix="/events", tags=["Events"])
+
 # PUBLIC ROUTES (No Token Needed)
 app.include_router(service_types.router, prefix="/service-types", tags=["Service Types"])
 app.include_router(business_hours.router, prefix="/business-hours", tags=["Business Hours"])
@@ -66,6 +110,11 @@ def health_check():
     return {"status": "running"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 
 
 @app.get("/livekit-token", include_in_schema=False)
@@ -74,6 +123,10 @@ async def get_livekit_token(
     room: str = Query(...),
     lang: str = Query(...),
 ):
+    # livekit is only needed by the voice companion; load it on first use
+    from auth_livekit import create_livekit_token
+    from dispatch_agent import dispatch_agent
+
     token = create_livekit_token(identity, room)
 
     await dispatch_agent(room, lang)
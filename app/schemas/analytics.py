@@ -0,0 +1,37 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+
+
+class UtilizationOut(BaseModel):
+    day: date
+    hour: Optional[int] = None
+    appointments: int
+    booked_minutes: int
+    utilization: Optional[float] = None
+
+
+class ServiceTypeBookingsOut(BaseModel):
+    service_type_id: int
+    name: Optional[str] = None
+    bookings: int
+    cancelled: int
+
+
+class CancellationDayOut(BaseModel):
+    day: date
+    appointments: int
+    cancelled: int
+    rate: Optional[float] = None
+
+
+class CancellationRatesOut(BaseModel):
+    appointments: int
+    cancelled: int
+    rate: Optional[float] = None
+    days: List[CancellationDayOut]
+
+
+class AgentActionCountOut(BaseModel):
+    agent_action: str
+    count: int
@@ -18,6 +18,7 @@ class AppointmentOut(BaseModel):
     status: str
     google_event_id: str | None
     sync_status: str
+    provider_id: int | None = None
     created_at: datetime
 
     class Config:
@@ -0,0 +1,44 @@
+from pydantic import BaseModel
+from datetime import date, time
+from typing import List
+
+
+class ProviderCreate(BaseModel):
+    name: str
+    kind: str = "doctor"
+    calendar_id: str | None = None
+    active: bool = True
+    service_type_ids: List[int] = []
+
+
+class ProviderOut(BaseModel):
+    id: int
+    name: str
+    kind: str
+    calendar_id: str | None
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+
+class ProviderHourIn(BaseModel):
+    day_of_week: str
+    open_time: time | None
+    close_time: time | None
+    is_closed: bool = False
+
+
+class ProviderHourOut(ProviderHourIn):
+    id: int
+    provider_id: int
+
+    class Config:
+        from_attributes = True
+
+
+class ProviderBlockedSlotCreate(BaseModel):
+    date: date
+    start_time: time
+    end_time: time
+    reason: str | None = None
@@ -0,0 +1,326 @@
+import logging
+import os
+import threading
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import Date, Integer, cast, delete, extract, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_REFRESH_SECONDS = float(os.getenv("ANALYTICS_REFRESH_SECONDS", "300"))
+
+# Stable key for pg_try_advisory_xact_lock so only one worker refreshes at a time
+ANALYTICS_LOCK_KEY = zlib.crc32(b"analytics-rollups")
+
+# updated_at is the writing transaction's start time, so a long transaction
+# can commit behind the watermark; re-scanning this window picks it up
+APPOINTMENT_OVERLAP = timedelta(minutes=10)
+# agent_logs ids are only consumed once their rows are this old, for the same reason
+LOG_SETTLE = timedelta(minutes=1)
+
+
+# =========================
+# Incremental Refresh
+# =========================
+
+def _watermark(db: Session, name: str) -> models.AnalyticsWatermark:
+    watermark = db.get(models.AnalyticsWatermark, name)
+    if watermark is None:
+        watermark = models.AnalyticsWatermark(name=name)
+        db.add(watermark)
+    return watermark
+
+
+def _refresh_appointments(db: Session) -> int:
+    """
+    Re-aggregates every appointment day touched since the watermark.
+    Appointments change status after insert, so whole days are rebuilt
+    rather than adding deltas; the work is bounded by the rows on those days.
+    """
+    watermark = _watermark(db, "appointments")
+    upper = db.query(func.max(models.Appointment.updated_at)).scalar()
+    if upper is None:
+        return 0
+
+    dirty = db.query(models.Appointment.appointment_date).distinct()
+    if watermark.value is not None:
+        dirty = dirty.filter(models.Appointment.updated_at > watermark.value - APPOINTMENT_OVERLAP)
+    days = [d for (d,) in dirty]
+
+    if days:
+        db.execute(delete(models.AppointmentRollup).where(models.AppointmentRollup.day.in_(days)))
+
+        hour = cast(extract("hour", models.Appointment.start_time), Integer)
+        minutes = cast(
+            func.sum(extract("epoch", models.Appointment.end_time - models.Appointment.start_time)) / 60,
+            Integer,
+        )
+        aggregated = (
+            select(
+                models.Appointment.appointment_date,
+                hour,
+                models.Appointment.service_type_id,
+                func.coalesce(models.Appointment.status, "pending"),
+                func.count(),
+                minutes,
+            )
+            .where(models.Appointment.appointment_date.in_(days))
+            .group_by(
+                models.Appointment.appointment_date,
+                hour,
+                models.Appointment.service_type_id,
+                func.coalesce(models.Appointment.status, "pending"),
+            )
+        )
+        db.execute(
+            insert(models.AppointmentRollup).from_select(
+                ["day", "hour", "service_type_id", "status", "appointments", "booked_minutes"],
+                aggregated,
+            )
+        )
+
+    watermark.value = upper
+    watermark.refreshed_at = func.now()
+    return len(days)
+
+
+def _refresh_agent_actions(db: Session) -> int:
+    """Adds counts for agent_logs rows past the id watermark (the table is append-only)."""
+    watermark = _watermark(db, "agent_logs")
+    last_id = watermark.last_id or 0
+
+    upper = db.query(func.max(models.AgentLog.id)).filter(
+        models.AgentLog.created_at < func.now() - LOG_SETTLE
+    ).scalar()
+    if upper is None or upper <= last_id:
+        return 0
+
+    day = cast(models.AgentLog.created_at, Date)
+    counts = (
+        select(day, models.AgentLog.agent_action, func.count())
+        .where(models.AgentLog.id > last_id, models.AgentLog.id <= upper)
+        .group_by(day, models.AgentLog.agent_action)
+    )
+    stmt = insert(models.AgentActionRollup).from_select(["day", "agent_action", "total"], counts)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["day", "agent_action"],
+        set_={"total": models.AgentActionRollup.total + stmt.excluded.total},
+    )
+    rows = db.execute(stmt).rowcount
+
+    watermark.last_id = upper
+    watermark.refreshed_at = func.now()
+    return rows
+
+
+def refresh_rollups(db: Session) -> Optional[Dict[str, int]]:
+    """
+    Brings the rollup tables up to date from rows newer than their
+    watermarks, in one transaction. Returns what was refreshed, or None if
+    another worker holds the lock.
+    """
+    locked = db.execute(
+        text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ANALYTICS_LOCK_KEY}
+    ).scalar()
+    if not locked:
+        db.rollback()
+        return None
+
+    result = {
+        "appointment_days": _refresh_appointments(db),
+        "agent_action_rows": _refresh_agent_actions(db),
+    }
+    db.commit()
+    return result
+
+
+# =========================
+# Queries (read only the rollups)
+# =========================
+
+def _capacity_providers(db: Session) -> int:
+    """Providers that can be booked in parallel; the single-doctor clinic counts as one."""
+    return max(1, db.query(func.count(models.Provider.id)).filter(models.Provider.active == True).scalar() or 0)
+
+
+def _open_minutes(db: Session) -> Dict[str, int]:
+    minutes = {}
+    for bh in db.query(models.BusinessHour).all():
+        if bh.is_closed or not bh.open_time or not bh.close_time:
+            minutes[bh.day_of_week] = 0
+        else:
+            span = datetime.combine(date.min, bh.close_time) - datetime.combine(date.min, bh.open_time)
+            minutes[bh.day_of_week] = int(span.total_seconds() // 60)
+    return minutes
+
+
+def utilization(db: Session, date_from: date, date_to: date, by_hour: bool = False) -> List[Dict[str, Any]]:
+    """Booked minutes against bookable minutes (clinic hours x providers), per day or per day and hour."""
+    providers = _capacity_providers(db)
+    open_minutes = _open_minutes(db)
+
+    group = [models.AppointmentRollup.day]
+    if by_hour:
+        group.append(models.AppointmentRollup.hour)
+
+    rows = (
+        db.query(
+            *group,
+            func.sum(models.AppointmentRollup.appointments),
+            func.sum(models.AppointmentRollup.booked_minutes),
+        )
+        .filter(
+            models.AppointmentRollup.day >= date_from,
+            models.AppointmentRollup.day <= date_to,
+            models.AppointmentRollup.status != "cancelled",
+        )
+        .group_by(*group)
+        .order_by(*group)
+        .all()
+    )
+
+    result = []
+    for row in rows:
+        day = row[0]
+        appointments, booked = int(row[-2]), int(row[-1])
+        capacity = providers * (60 if by_hour else open_minutes.get(day.strftime("%A"), 0))
+        entry = {
+            "day": day,
+            "appointments": appointments,
+            "booked_minutes": booked,
+            "utilization": round(booked / capacity, 4) if capacity else None,
+        }
+        if by_hour:
+            entry["hour"] = row[1]
+        result.append(entry)
+    return result
+
+
+def bookings_by_service_type(db: Session, date_from: date, date_to: date) -> List[Dict[str, Any]]:
+    rows = (
+        db.query(
+            models.AppointmentRollup.service_type_id,
+            models.ServiceType.name,
+            models.AppointmentRollup.status,
+            func.sum(models.AppointmentRollup.appointments),
+        )
+        .outerjoin(models.ServiceType, models.ServiceType.id == models.AppointmentRollup.service_type_id)
+        .filter(models.AppointmentRollup.day >= date_from, models.AppointmentRollup.day <= date_to)
+        .group_by(models.AppointmentRollup.service_type_id, models.ServiceType.name, models.AppointmentRollup.status)
+        .all()
+    )
+
+    by_service: Dict[int, Dict[str, Any]] = {}
+    for service_type_id, name, status, count in rows:
+        entry = by_service.setdefault(service_type_id, {
+            "service_type_id": service_type_id, "name": name, "bookings": 0, "cancelled": 0,
+        })
+        entry["cancelled" if status == "cancelled" else "bookings"] += int(count)
+    return sorted(by_service.values(), key=lambda e: -e["bookings"])
+
+
+def cancellation_rates(db: Session, date_from: date, date_to: date) -> Dict[str, Any]:
+    rows = (
+        db.query(
+            models.AppointmentRollup.day,
+            func.sum(models.AppointmentRollup.appointments),
+            func.sum(models.AppointmentRollup.appointments).filter(models.AppointmentRollup.status == "cancelled"),
+        )
+        .filter(models.AppointmentRollup.day >= date_from, models.AppointmentRollup.day <= date_to)
+        .group_by(models.AppointmentRollup.day)
+        .order_by(models.AppointmentRollup.day)
+        .all()
+    )
+
+    days = []
+    total = cancelled = 0
+    for day, day_total, day_cancelled in rows:
+        day_total, day_cancelled = int(day_total), int(day_cancelled or 0)
+        total += day_total
+        cancelled += day_cancelled
+        days.append({
+            "day": day,
+            "appointments": day_total,
+            "cancelled": day_cancelled,
+            "rate": round(day_cancelled / day_total, 4) if day_total else None,
+        })
+    return {
+        "appointments": total,
+        "cancelled": cancelled,
+        "rate": round(cancelled / total, 4) if total else None,
+        "days": days,
+    }
+
+
+def agent_action_counts(db: Session, date_from: date, date_to: date) -> List[Dict[str, Any]]:
+    rows = (
+        db.query(models.AgentActionRollup.agent_action, func.sum(models.AgentActionRollup.total))
+        .filter(models.AgentActionRollup.day >= date_from, models.AgentActionRollup.day <= date_to)
+        .group_by(models.AgentActionRollup.agent_action)
+        .order_by(func.sum(models.AgentActionRollup.total).desc())
+        .all()
+    )
+    return [{"agent_action": action, "count": int(count)} for action, count in rows]
+
+
+def last_refreshed(db: Session) -> Optional[datetime]:
+    return db.query(func.min(models.AnalyticsWatermark.refreshed_at)).scalar()
+
+
+# =========================
+# Refresher
+# =========================
+
+class AnalyticsRefresher:
+    """
+    Runs `refresh_rollups` on a fixed interval. Safe to run in every worker
+    process; the advisory lock lets one of them do each pass.
+    """
+
+    def __init__(self, interval: float = ANALYTICS_REFRESH_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="analytics-refresher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                refreshed = refresh_rollups(db)
+                if refreshed:
+                    logger.info("Analytics rollups refreshed: %s", refreshed)
+            except Exception as e:
+                db.rollback()
+                logger.error("Analytics refresher error: %s", e)
+            finally:
+                db.close()
+
+            self._stop.wait(self.interval)
+
+
+if __name__ == "__main__":
+    # One-off pass, e.g. from cron: python -m app.services.analytics_service
+    db = SessionLocal()
+    try:
+        print(f"Refreshed: {refresh_rollups(db)}")
+    finally:
+        db.close()
@@ -1,13 +1,22 @@
+import logging
 from datetime import datetime, timedelta, date, time, timezone
+from sqlalchemy import case
 from sqlalchemy.orm import Session
 from app.db import models
-from app.services.calendar_service import CalendarService
+from app.services.calendar_service import get_calendar
+from app.services.export_service import APPOINTMENT_COLUMNS
+from app.services.availability_service import assign_provider, providers_configured
 from app.services.logging_service import log_agent_action_service
-from app.services.email_service import send_confirmation_email
-from typing import Any
+from app.services.notification_service import enqueue_notification
+from app.services.waitlist_service import offer_freed_slot
+from typing import Any, Optional
+from app.core.pagination import keyset_page, ranked_page
+from app.core.search import date_prefix_range
+from app.services.patient_service import patient_match
+
+logger = logging.getLogger(__name__)
 
 LEAD_TIME_HOURS = 1
-google_cal = CalendarService()
 
 
 def parse_time_string(time_str):
@@ -28,6 +37,7 @@ def create_appointment_service(
     service_type_id: int,
     appointment_date: date,
     start_time: time,
+    provider_id: Optional[int] = None,
 ):
     # 1. Convert appointment_date string to date object
     if isinstance(appointment_date, str):
@@ -65,36 +75,12 @@ def create_appointment_service(
             f"Requested: {start_dt.strftime('%H:%M')}"
         )
 
-    # Conflict with existing appointments
-    conflict = db.query(models.Appointment).filter(
-        models.Appointment.appointment_date == appointment_date,
-        models.Appointment.start_time < end_dt.time(),
-        models.Appointment.end_time > start_time,
-        models.Appointment.status != "cancelled"
-    ).first()
-
-    if conflict:
-        raise ValueError("Time slot already booked")
-
-    # Conflict with blocked slots
-    blocked = db.query(models.BlockedSlot).filter(
-        models.BlockedSlot.date == appointment_date,
-        models.BlockedSlot.start_time < end_dt.time(),
-        models.BlockedSlot.end_time > start_time
-    ).first()
-
-    if blocked:
-        raise ValueError("Time slot is blocked")
-
-    try:
-            google_busy = google_cal.get_busy_slots(appointment_date)
-            # Check if the requested start/end overlaps with any Google event
-            for g_start, g_end in google_busy:
-                if start_dt < g_end and end_dt > g_start:
-                    raise ValueError("This slot is blocked on the doctor's external Google Calendar.")
-    except Exception as e:
-            # If Google is down, we still allow the booking based on Postgres rules
-            print(f"Warning: Could not verify Google Calendar availability: {e}")
+    provider = None
+    if providers_configured(db):
+        # Per-provider hours, blocks and calendars; picks the least-loaded free provider
+        provider = assign_provider(db, service, start_dt, end_dt, provider_id)
+    else:
+        _check_single_provider_conflicts(db, appointment_date, start_time, start_dt, end_dt)
 
     appointment = models.Appointment(
         patient_id=patient_id,
@@ -102,7 +88,8 @@ def create_appointment_service(
         appointment_date=appointment_date,
         start_time=start_time,
         end_time=end_dt.time(),
-        status="pending"
+        status="pending",
+        provider_id=provider.id if provider else None,
     )
 
     db.add(appointment)
@@ -114,10 +101,11 @@ def create_appointment_service(
         full_end = full_start + timedelta(minutes=service.duration_minutes)
         
         # Capture the response from Google
-        event = google_cal.create_event(
+        event = get_calendar().create_event(
             summary=f"Appointment: {patient.full_name} ({service.name})",
             start_time=full_start,  
-            end_time=full_end      
+            end_time=full_end,
+            calendar_id=calendar_id_for(provider),
         )
         
         # Save the Google Event ID to Postgres record
@@ -130,7 +118,8 @@ def create_appointment_service(
         patient_id=patient_id,
         log_context="[System Auto-Log]",
         agent_action="BOOKING_CREATED",
-        system_decision=f"Appt {appointment.id} for {appointment_date} at {start_time}",
+        system_decision=f"Appt {appointment.id} for {appointment_date} at {start_time}"
+        + (f" with provider {provider.id}" if provider else ""),
         confidence_score=1.0
         )
         
@@ -140,11 +129,123 @@ def create_appointment_service(
     return appointment
 
 
-def get_appointments(db: Session):
+def _check_single_provider_conflicts(db: Session, appointment_date, start_time, start_dt, end_dt):
+    """Original single-doctor rules: any overlap anywhere in the clinic is a conflict."""
+    # Conflict with existing appointments
+    conflict = db.query(models.Appointment).filter(
+        models.Appointment.appointment_date == appointment_date,
+        models.Appointment.start_time < end_dt.time(),
+        models.Appointment.end_time > start_time,
+        models.Appointment.status != "cancelled"
+    ).first()
+
+    if conflict:
+        raise ValueError("Time slot already booked")
+
+    # Conflict with blocked slots
+    blocked = db.query(models.BlockedSlot).filter(
+        models.BlockedSlot.date == appointment_date,
+        models.BlockedSlot.start_time < end_dt.time(),
+        models.BlockedSlot.end_time > start_time
+    ).first()
+
+    if blocked:
+        raise ValueError("Time slot is blocked")
+
+    try:
+            google_busy = get_calendar().get_busy_slots(appointment_date)
+            # Check if the requested start/end overlaps with any Google event
+            for g_start, g_end in google_busy:
+                if start_dt < g_end and end_dt > g_start:
+                    raise ValueError("This slot is blocked on the doctor's external Google Calendar.")
+    except Exception as e:
+            # If Google is down, we still allow the booking based on Postgres rules
+            print(f"Warning: Could not verify Google Calendar availability: {e}")
+
+
+def calendar_id_for(provider) -> str:
+    return provider.calendar_id if provider is not None and provider.calendar_id else "primary"
+
+
+def get_appointments(
+    db: Session,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    patient_id: Optional[int] = None,
+):
+    """
+    Retrieves one page of appointments for the admin dashboard,
+    newest date first. Returns (rows, next_cursor); rows are plain tuples
+    of APPOINTMENT_COLUMNS, not ORM instances.
+    """
+    query = db.query(*APPOINTMENT_COLUMNS)
+
+    if date_from:
+        query = query.filter(models.Appointment.appointment_date >= date_from)
+    if date_to:
+        query = query.filter(models.Appointment.appointment_date <= date_to)
+    if status:
+        query = query.filter(models.Appointment.status == status)
+    if patient_id:
+        query = query.filter(models.Appointment.patient_id == patient_id)
+
+    return keyset_page(
+        query,
+        columns=[models.Appointment.appointment_date, models.Appointment.id],
+        cursor=cursor,
+        limit=limit,
+        parsers=[date.fromisoformat, int],
+    )
+
+
+def search_appointments(
+    db: Session,
+    q: str,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+):
     """
-    Retrieves ALL appointments for the admin dashboard.
+    Admin search. An ISO date prefix ("2026-03", "2026-03-1") becomes a
+    date range walked newest first; anything else is matched against the
+    patient's name, phone and email (and the appointment id) and ranked.
+    Returns (appointments, next_cursor).
     """
-    return db.query(models.Appointment).order_by(models.Appointment.appointment_date.desc()).all()
+    q = q.strip()
+    date_range = date_prefix_range(q)
+
+    if date_range:
+        query = db.query(models.Appointment).filter(
+            models.Appointment.appointment_date >= date_range[0],
+            models.Appointment.appointment_date < date_range[1],
+        )
+        if status:
+            query = query.filter(models.Appointment.status == status)
+        return keyset_page(
+            query,
+            columns=[models.Appointment.appointment_date, models.Appointment.id],
+            cursor=cursor,
+            limit=limit,
+            parsers=[date.fromisoformat, int],
+        )
+
+    match, score = patient_match(q)
+    if q.isdigit():
+        # "#123" in the UI means appointment 123, not patient 123
+        match = match | (models.Appointment.id == int(q))
+        score = score + case((models.Appointment.id == int(q), 20.0), else_=0.0)
+
+    query = (
+        db.query(models.Appointment, score.label("score"))
+        .join(models.Patient, models.Patient.id == models.Appointment.patient_id)
+        .filter(match)
+    )
+    if status:
+        query = query.filter(models.Appointment.status == status)
+    return ranked_page(query, score, models.Appointment.id, cursor, limit)
 
 
 def get_appointments_by_patient(db: Session, patient_id: int):
@@ -160,18 +261,25 @@ def get_appointments_by_patient(db: Session, patient_id: int):
         models.Appointment.start_time.asc()
     ).all()
 
-    # Log the data retrieval action
+    log_appointments_retrieval(db, patient_id, len(appointments))
+
+    return appointments
+
+
+def log_appointments_retrieval(db: Session, patient_id: int, count: int, source: str = "database"):
+    """
+    Audit-logs a read of a patient's appointments. Callers serving the list
+    from somewhere other than the database (the agent's tool memo) log here too.
+    """
     log_agent_action_service(
         db=db,
         patient_id=patient_id,
         log_context="[System Auto-Log]",
         agent_action="DATA_RETRIEVAL",
-        system_decision=f"Retrieved {len(appointments)} active appointments for patient_id {patient_id}",
+        system_decision=f"Retrieved {count} active appointments for patient_id {patient_id} ({source})",
         confidence_score=1.0
     )
 
-    return appointments
-
 
 def cancel_appointment_service(db: Session, appointment_id: int):
     """
@@ -187,7 +295,7 @@ def cancel_appointment_service(db: Session, appointment_id: int):
     
     if hasattr(appointment, 'google_event_id') and appointment.google_event_id:
         try:
-            google_cal.delete_event(appointment.google_event_id)
+            get_calendar().delete_event(appointment.google_event_id, calendar_id=calendar_id_for(appointment.provider))
         except Exception as e:
             print(f"Warning: Could not delete Google event {appointment.google_event_id}: {e}")
     
@@ -203,6 +311,14 @@ def cancel_appointment_service(db: Session, appointment_id: int):
         system_decision=f"Appt {appointment_id} removed from DB/Google",
         confidence_score=1.0
     )
+
+    # Offer the freed interval to the waitlist
+    if appointment.appointment_date >= date.today():
+        try:
+            offer_freed_slot(db, appointment)
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Could not backfill from waitlist for Appt {appointment_id}: {e}")
     
     return appointment
 
@@ -228,13 +344,15 @@ def update_appointment_status_service(
     if new_status == "confirmed":
         patient = appointment.patient
         if patient and patient.email:
-            # Check if we have background_tasks available
-            print(f"DEBUG: Attempting to send email to {patient.email}")
-            send_confirmation_email(
-                    patient_email=patient.email,
-                    patient_name=patient.full_name,
-                    appt_details=f"{appointment.appointment_date} at {appointment.start_time}"
-                )
+            # Queued for the notification worker so the admin request never waits on SMTP
+            enqueue_notification(
+                db=db,
+                appointment_id=appointment.id,
+                channel="email",
+                recipient=patient.email,
+                message=f"{appointment.appointment_date} at {appointment.start_time}",
+            )
+            db.commit()
 
     log_agent_action_service(
         db=db,
@@ -1,10 +1,15 @@
+import logging
 from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from app.db import models
-from app.services.calendar_service import CalendarService
+from app.services.calendar_service import get_calendar
+
+logger = logging.getLogger(__name__)
 
 LEAD_TIME_HOURS = 1
-google_cal = CalendarService()
+SLOT_STEP = timedelta(minutes=15)
 
 def check_availability(
     appointment_date: date,
@@ -36,6 +41,9 @@ def check_availability(
     if not business_hour or business_hour.is_closed:
         return []
 
+    if providers_configured(db):
+        return _provider_availability(db, service, appointment_date, business_hour)
+
     start_dt = datetime.combine(appointment_date, business_hour.open_time)
     end_dt = datetime.combine(appointment_date, business_hour.close_time)
 
@@ -68,7 +76,7 @@ def check_availability(
 
     try:
             # Ask Google: "What is the doctor doing today that we don't know about?"
-            google_busy = google_cal.get_busy_slots(appointment_date)
+            google_busy = get_calendar().get_busy_slots(appointment_date)
             all_blocked = booked_slots + blocked_slots + google_busy
     
     except Exception:
@@ -103,3 +111,228 @@ def check_availability(
         current += timedelta(minutes=15)
 
     return available_slots
+
+
+# =========================
+# Multi-Provider Availability
+# =========================
+
+def providers_configured(db: Session) -> bool:
+    """Without any active provider the clinic is scheduled as one doctor."""
+    return db.query(models.Provider.id).filter(models.Provider.active == True).first() is not None
+
+
+def eligible_providers(db: Session, service_type_id: int) -> List[models.Provider]:
+    return (
+        db.query(models.Provider)
+        .join(models.ProviderService, models.ProviderService.provider_id == models.Provider.id)
+        .filter(
+            models.ProviderService.service_type_id == service_type_id,
+            models.Provider.active == True,
+        )
+        .order_by(models.Provider.id)
+        .all()
+    )
+
+
+def provider_schedules(
+    db: Session,
+    providers: List[models.Provider],
+    appointment_date: date,
+    business_hour: models.BusinessHour,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Working window, sorted busy intervals and booked minutes for each
+    provider working that day. Uses the same four queries and one calendar
+    round trip however many providers there are.
+    """
+    ids = [p.id for p in providers]
+    day_name = appointment_date.strftime("%A")
+
+    hours = {
+        h.provider_id: h
+        for h in db.query(models.ProviderHour).filter(
+            models.ProviderHour.provider_id.in_(ids),
+            models.ProviderHour.day_of_week == day_name,
+        )
+    }
+
+    appointments = db.query(
+        models.Appointment.provider_id, models.Appointment.start_time, models.Appointment.end_time
+    ).filter(
+        models.Appointment.appointment_date == appointment_date,
+        models.Appointment.status != "cancelled",
+        or_(models.Appointment.provider_id.in_(ids), models.Appointment.provider_id.is_(None)),
+    ).all()
+
+    blocked = db.query(
+        models.BlockedSlot.provider_id, models.BlockedSlot.start_time, models.BlockedSlot.end_time
+    ).filter(
+        models.BlockedSlot.date == appointment_date,
+        or_(models.BlockedSlot.provider_id.in_(ids), models.BlockedSlot.provider_id.is_(None)),
+    ).all()
+
+    calendar_ids = sorted({p.calendar_id for p in providers if p.calendar_id})
+    calendar_busy = {}
+    if calendar_ids:
+        try:
+            calendar_busy = get_calendar().get_busy_slots_many(appointment_date, calendar_ids)
+        except Exception as e:
+            # Fallback to just Postgres if Google fails
+            logger.warning(f"Could not read provider calendars: {e}")
+
+    schedules = {}
+    for p in providers:
+        h = hours.get(p.id, business_hour)
+        if h.is_closed or not h.open_time or not h.close_time:
+            continue
+        schedules[p.id] = {
+            "provider": p,
+            "open": datetime.combine(appointment_date, h.open_time),
+            "close": datetime.combine(appointment_date, h.close_time),
+            "busy": list(calendar_busy.get(p.calendar_id, [])),
+            "booked_minutes": 0,
+        }
+
+    # Clinic-wide blocks, and bookings made before providers existed, block everyone
+    shared = []
+    for provider_id, start, end in appointments + blocked:
+        interval = (datetime.combine(appointment_date, start), datetime.combine(appointment_date, end))
+        if provider_id is None:
+            shared.append(interval)
+        elif provider_id in schedules:
+            schedules[provider_id]["busy"].append(interval)
+
+    for provider_id, start, end in appointments:
+        if provider_id in schedules:
+            minutes = (datetime.combine(appointment_date, end) - datetime.combine(appointment_date, start)).seconds // 60
+            schedules[provider_id]["booked_minutes"] += minutes
+
+    for schedule in schedules.values():
+        schedule["busy"] = sorted(schedule["busy"] + shared)
+    return schedules
+
+
+def _free_starts(schedule: Dict[str, Any], duration: timedelta, not_before: datetime) -> List[datetime]:
+    """Slot starts on the 15-minute grid that clear every busy interval (single sweep)."""
+    busy = schedule["busy"]
+    i = 0
+    starts = []
+    current = schedule["open"]
+    while current + duration <= schedule["close"]:
+        slot_end = current + duration
+        if current >= not_before:
+            # Intervals ending before this slot can never conflict with a later one
+            while i < len(busy) and busy[i][1] <= current:
+                i += 1
+            j = i
+            conflict = False
+            while j < len(busy) and busy[j][0] < slot_end:
+                if busy[j][1] > current:
+                    conflict = True
+                    break
+                j += 1
+            if not conflict:
+                starts.append(current)
+        current += SLOT_STEP
+    return starts
+
+
+def pick_provider(candidates: List[int], schedules: Dict[int, Dict[str, Any]]) -> int:
+    """Load balancing: fewest booked minutes that day, then lowest id."""
+    return min(candidates, key=lambda pid: (schedules[pid]["booked_minutes"], pid))
+
+
+def _not_before(appointment_date: date) -> datetime:
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    if appointment_date == now.date():
+        return now + timedelta(hours=LEAD_TIME_HOURS)
+    return datetime.min
+
+
+def _provider_availability(
+    db: Session,
+    service: models.ServiceType,
+    appointment_date: date,
+    business_hour: models.BusinessHour,
+):
+    """
+    Union of free slots across every eligible provider. Each slot carries
+    the provider a booking would be assigned to and how many could take it.
+    """
+    providers = eligible_providers(db, service.id)
+    if not providers:
+        return []
+
+    duration = timedelta(minutes=service.duration_minutes)
+    schedules = provider_schedules(db, providers, appointment_date, business_hour)
+    not_before = _not_before(appointment_date)
+
+    by_start: Dict[datetime, List[int]] = {}
+    for provider_id, schedule in schedules.items():
+        for start in _free_starts(schedule, duration, not_before):
+            by_start.setdefault(start, []).append(provider_id)
+
+    available_slots = []
+    for start in sorted(by_start):
+        candidates = by_start[start]
+        chosen = pick_provider(candidates, schedules)
+        available_slots.append({
+            "start_time": start.time(),
+            "end_time": (start + duration).time(),
+            "provider_id": chosen,
+            "provider_name": schedules[chosen]["provider"].name,
+            "providers_available": len(candidates),
+        })
+    return available_slots
+
+
+def assign_provider(
+    db: Session,
+    service: models.ServiceType,
+    start_dt: datetime,
+    end_dt: datetime,
+    provider_id: Optional[int] = None,
+) -> models.Provider:
+    """
+    Picks the provider for a booking (or validates a requested one) and
+    locks its row, so concurrent bookings for the same provider serialize
+    until the caller commits. Raises ValueError when nobody is free.
+    """
+    appointment_date = start_dt.date()
+    business_hour = db.query(models.BusinessHour).filter(
+        models.BusinessHour.day_of_week == appointment_date.strftime("%A")
+    ).first()
+    if not business_hour or business_hour.is_closed:
+        raise ValueError("The clinic is closed on that day")
+
+    providers = eligible_providers(db, service.id)
+    if provider_id is not None:
+        providers = [p for p in providers if p.id == provider_id]
+        if not providers:
+            raise ValueError(f"Provider {provider_id} does not offer this service")
+
+    schedules = provider_schedules(db, providers, appointment_date, business_hour)
+    free = [
+        pid for pid, s in schedules.items()
+        if s["open"] <= start_dt and end_dt <= s["close"]
+        and not any(b_start < end_dt and b_end > start_dt for b_start, b_end in s["busy"])
+    ]
+    if not free:
+        raise ValueError("Time slot already booked")
+
+    chosen = pick_provider(free, schedules)
+    db.query(models.Provider).filter(models.Provider.id == chosen).with_for_update().one()
+
+    # Re-check under the lock: another booking may have committed meanwhile
+    clash = db.query(models.Appointment.id).filter(
+        models.Appointment.provider_id == chosen,
+        models.Appointment.appointment_date == appointment_date,
+        models.Appointment.start_time < end_dt.time(),
+        models.Appointment.end_time > start_dt.time(),
+        models.Appointment.status != "cancelled",
+    ).first()
+    if clash:
+        raise ValueError("Time slot already booked")
+
+    return schedules[chosen]["provider"]
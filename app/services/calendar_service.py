@@ -1,24 +1,105 @@
 import os
 import datetime
-from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
-from google.auth.transport.requests import Request
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Tuple
+
+from prometheus_client import Counter
+
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpen, DeadlineExceeded
+from app.core.telemetry import external_call
+
+logger = logging.getLogger(__name__)
+
+# Refresh this long before the access token expires
+REFRESH_MARGIN = datetime.timedelta(minutes=5)
+# Google caps a single freebusy query at 50 calendars
+FREEBUSY_MAX_CALENDARS = 50
+
+# Busy-slot reads sit on the chat path; writes can afford a little longer
+CALENDAR_READ_DEADLINE = float(os.getenv("CALENDAR_READ_DEADLINE_SECONDS", "2"))
+CALENDAR_WRITE_DEADLINE = float(os.getenv("CALENDAR_WRITE_DEADLINE_SECONDS", "5"))
+# Bounds how long a worker thread can stay stuck on a dead socket after its deadline
+CALENDAR_SOCKET_TIMEOUT = float(os.getenv("CALENDAR_SOCKET_TIMEOUT_SECONDS", "10"))
+CALENDAR_BREAKER_FAILURES = int(os.getenv("CALENDAR_BREAKER_FAILURES", "5"))
+CALENDAR_BREAKER_COOLDOWN = float(os.getenv("CALENDAR_BREAKER_COOLDOWN_SECONDS", "30"))
+# How old cached busy slots may be and still stand in for Google
+CALENDAR_BUSY_CACHE_SECONDS = float(os.getenv("CALENDAR_BUSY_CACHE_SECONDS", "3600"))
+
+BUSY_FALLBACKS = Counter(
+    "calendar_busy_fallback_total", "Busy-slot reads served without Google", ["source"],
+)
+
 
 class CalendarService:
+    """
+    Google Calendar client. Construction is free: credentials are loaded and
+    the API client is built on first use, from the discovery document bundled
+    with googleapiclient (no discovery round trip). After that a daemon thread
+    refreshes the OAuth token shortly before it expires, so requests never
+    wait on a refresh.
+
+    One instance is shared process-wide, but httplib2.Http is not
+    thread-safe: every request is executed on the calling thread's own
+    AuthorizedHttp (request threads, breaker deadline threads and prefetch
+    threads each keep one, with its own keep-alive connection).
+    """
+
     def __init__(self):
         self.scopes = ['https://www.googleapis.com/auth/calendar']
-        self.creds = self._load_credentials()
-        self.service = build('calendar', 'v3', credentials=self.creds)
+        self.creds = None
+        self._service = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._refresher = None
+
+    @property
+    def service(self):
+        if self._service is None:
+            with self._lock:
+                if self._service is None:
+                    from googleapiclient.discovery import build
+
+                    self.creds = self._load_credentials()
+                    self._service = build(
+                        'calendar', 'v3',
+                        http=self._thread_http(),
+                        requestBuilder=self._build_request,
+                        static_discovery=True,
+                        cache_discovery=False,
+                    )
+                    self._start_refresher()
+        return self._service
+
+    def _thread_http(self):
+        http = getattr(self._local, "http", None)
+        if http is None:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+
+            http = AuthorizedHttp(self.creds, http=httplib2.Http(timeout=CALENDAR_SOCKET_TIMEOUT))
+            self._local.http = http
+        return http
+
+    def _build_request(self, http, *args, **kwargs):
+        # Ignore the client-wide http; run on this thread's own connection
+        from googleapiclient.http import HttpRequest
+
+        return HttpRequest(self._thread_http(), *args, **kwargs)
 
     def _load_credentials(self):
+        from google.oauth2.credentials import Credentials
+        from google.auth.transport.requests import Request
+
         creds = None
         # Checks for the token generated with test_calendar.py
         paths = ['token.json', 'app/token.json']
         token_path = next((p for p in paths if os.path.exists(p)), None)
-        
+
         if token_path:
             creds = Credentials.from_authorized_user_file(token_path, self.scopes)
-        
+
         if not creds or not creds.valid:
             if creds and creds.expired and creds.refresh_token:
                 creds.refresh(Request())
@@ -26,30 +107,88 @@ class CalendarService:
                 raise Exception("Token not found. Run test_calendar.py locally first!")
         return creds
 
-    def get_busy_slots(self, target_date: datetime.date):
-        """Fetches external Google events to block them in availability logic."""
+    def _start_refresher(self):
+        if not self.creds.refresh_token:
+            return
+        self._refresher = threading.Thread(
+            target=self._refresh_loop, name="google-token-refresh", daemon=True
+        )
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        from google.auth.transport.requests import Request
+
+        stop = threading.Event()
+        while True:
+            expiry = self.creds.expiry  # naive UTC
+            if expiry is None:
+                return
+            wait = (expiry - REFRESH_MARGIN - datetime.datetime.utcnow()).total_seconds()
+            if wait > 0:
+                stop.wait(wait)
+            try:
+                self.creds.refresh(Request())
+            except Exception as e:
+                logger.warning(f"Google token refresh failed, retrying in 60s: {e}")
+                stop.wait(60)
+
+    @staticmethod
+    def _day_bounds(target_date: datetime.date):
         # Define the start and end of the day in ISO format
         start_dt = datetime.datetime.combine(target_date, datetime.time.min).isoformat() + 'Z'
         end_dt = datetime.datetime.combine(target_date, datetime.time.max).isoformat() + 'Z'
-        
-        events_result = self.service.events().list(
-            calendarId='primary', timeMin=start_dt, timeMax=end_dt,
-            singleEvents=True, orderBy='startTime'
-        ).execute()
-        
+        return start_dt, end_dt
+
+    @staticmethod
+    def _parse(value: str) -> datetime.datetime:
+        # Convert ISO strings to naive UTC datetimes for comparison in the logic
+        return datetime.datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+    def get_busy_slots(self, target_date: datetime.date, calendar_id: str = 'primary'):
+        """Fetches external Google events to block them in availability logic."""
+        start_dt, end_dt = self._day_bounds(target_date)
+
+        with external_call("google_calendar"):
+            events_result = self.service.events().list(
+                calendarId=calendar_id, timeMin=start_dt, timeMax=end_dt,
+                singleEvents=True, orderBy='startTime'
+            ).execute()
+
         busy_slots = []
         for e in events_result.get('items', []):
             start = e['start'].get('dateTime', e['start'].get('date'))
             end = e['end'].get('dateTime', e['end'].get('date'))
-            
-            # Convert ISO strings to datetime objects for comparison in the logic
-            busy_slots.append((
-                datetime.datetime.fromisoformat(start.replace('Z', '+00:00')).replace(tzinfo=None),
-                datetime.datetime.fromisoformat(end.replace('Z', '+00:00')).replace(tzinfo=None)
-            ))
+            busy_slots.append((self._parse(start), self._parse(end)))
         return busy_slots
 
-    def create_event(self, summary, start_time, end_time):
+    def get_busy_slots_many(self, target_date: datetime.date, calendar_ids):
+        """
+        Busy intervals for many calendars at once via the freebusy API,
+        one request per FREEBUSY_MAX_CALENDARS calendars.
+        Returns {calendar_id: [(start, end), ...]}.
+        """
+        start_dt, end_dt = self._day_bounds(target_date)
+        calendar_ids = list(calendar_ids)
+
+        busy = {}
+        for i in range(0, len(calendar_ids), FREEBUSY_MAX_CALENDARS):
+            body = {
+                'timeMin': start_dt,
+                'timeMax': end_dt,
+                'items': [{'id': c} for c in calendar_ids[i:i + FREEBUSY_MAX_CALENDARS]],
+            }
+            with external_call("google_calendar"):
+                result = self.service.freebusy().query(body=body).execute()
+
+            for calendar_id, info in result.get('calendars', {}).items():
+                if info.get('errors'):
+                    raise Exception(f"Free/busy lookup failed for {calendar_id}: {info['errors']}")
+                busy[calendar_id] = [
+                    (self._parse(b['start']), self._parse(b['end'])) for b in info.get('busy', [])
+                ]
+        return busy
+
+    def create_event(self, summary, start_time, end_time, calendar_id='primary'):
         """Adds the appointment to Google Calendar with UTC suffix."""
         event = {
             'summary': summary,
@@ -57,13 +196,148 @@ class CalendarService:
             'start': {'dateTime': start_time.isoformat() + 'Z'},
             'end': {'dateTime': end_time.isoformat() + 'Z'},
         }
-        return self.service.events().insert(calendarId='primary', body=event).execute()
-    
+        with external_call("google_calendar"):
+            return self.service.events().insert(calendarId=calendar_id, body=event).execute()
+
 
-    def delete_event(self, event_id):
+    def delete_event(self, event_id, calendar_id='primary'):
             """Removes an event from Google Calendar."""
             try:
-                self.service.events().delete(calendarId='primary', eventId=event_id).execute()
+                with external_call("google_calendar"):
+                    self.service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
             except Exception as e:
                 # Handle the case where the event was already deleted manually
-                print(f"Google Delete Error: {e}")    
\ No newline at end of file
+                print(f"Google Delete Error: {e}")
+
+
+# =========================
+# Circuit Breaker
+# =========================
+
+def _is_google_failure(e: BaseException) -> bool:
+    """Server errors, throttling and transport errors count; other 4xx are ours."""
+    status = getattr(getattr(e, "resp", None), "status", None)
+    if status is None:
+        return True
+    return int(status) >= 500 or int(status) == 429
+
+
+class GuardedCalendar:
+    """
+    Wraps a calendar client (CalendarService or a fake) in a circuit
+    breaker with per-call deadlines. While Google is slow or down, calls
+    fail fast with CircuitOpen or DeadlineExceeded instead of every chat
+    turn waiting out the timeout. Busy-slot reads fall back to the last
+    busy slots fetched for that calendar and day (up to
+    CALENDAR_BUSY_CACHE_SECONDS old), so availability still respects
+    known Google events during an outage.
+    """
+
+    def __init__(self, calendar, breaker: CircuitBreaker = None):
+        self.calendar = calendar
+        self.breaker = breaker or CircuitBreaker(
+            "google_calendar",
+            failure_threshold=CALENDAR_BREAKER_FAILURES,
+            cooldown=CALENDAR_BREAKER_COOLDOWN,
+            is_failure=_is_google_failure,
+        )
+        self._busy_cache: Dict[Tuple[str, datetime.date], Tuple[float, List]] = {}
+        self._cache_lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Anything not guarded here goes straight to the wrapped client
+        return getattr(self.calendar, name)
+
+    def _remember(self, target_date: datetime.date, busy: Dict[str, List]) -> None:
+        now = time.monotonic()
+        with self._cache_lock:
+            for calendar_id, slots in busy.items():
+                self._busy_cache[(calendar_id, target_date)] = (now, list(slots))
+            # Past days are never asked for again
+            today = datetime.date.today()
+            for key in [k for k in self._busy_cache if k[1] < today]:
+                del self._busy_cache[key]
+
+    def _cached(self, target_date: datetime.date, calendar_ids: Iterable[str], error: Exception) -> Dict[str, List]:
+        now = time.monotonic()
+        with self._cache_lock:
+            hits = {}
+            for calendar_id in calendar_ids:
+                entry = self._busy_cache.get((calendar_id, target_date))
+                if entry and now - entry[0] <= CALENDAR_BUSY_CACHE_SECONDS:
+                    hits[calendar_id] = list(entry[1])
+        if not hits:
+            BUSY_FALLBACKS.labels(source="none").inc()
+            raise error
+        BUSY_FALLBACKS.labels(source="cache").inc()
+        logger.warning(f"Google Calendar unavailable ({error}); using cached busy slots for {target_date}")
+        return hits
+
+    def get_busy_slots(self, target_date: datetime.date, calendar_id: str = 'primary'):
+        try:
+            slots = self.breaker.call(
+                "get_busy_slots", self.calendar.get_busy_slots, target_date, calendar_id,
+                deadline=CALENDAR_READ_DEADLINE,
+            )
+        except Exception as e:
+            if not isinstance(e, (CircuitOpen, DeadlineExceeded)) and not _is_google_failure(e):
+                raise
+            return self._cached(target_date, [calendar_id], e)[calendar_id]
+        self._remember(target_date, {calendar_id: slots})
+        return slots
+
+    def get_busy_slots_many(self, target_date: datetime.date, calendar_ids):
+        calendar_ids = list(calendar_ids)
+        try:
+            busy = self.breaker.call(
+                "get_busy_slots_many", self.calendar.get_busy_slots_many, target_date, calendar_ids,
+                deadline=CALENDAR_READ_DEADLINE,
+            )
+        except Exception as e:
+            if not isinstance(e, (CircuitOpen, DeadlineExceeded)) and not _is_google_failure(e):
+                raise
+            return self._cached(target_date, calendar_ids, e)
+        self._remember(target_date, busy)
+        return busy
+
+    def create_event(self, summary, start_time, end_time, calendar_id='primary'):
+        # A timed-out insert may still land; the appointment then stays not_synced
+        return self.breaker.call(
+            "create_event", self.calendar.create_event, summary, start_time, end_time, calendar_id,
+            deadline=CALENDAR_WRITE_DEADLINE,
+        )
+
+    def delete_event(self, event_id, calendar_id='primary'):
+        return self.breaker.call(
+            "delete_event", self.calendar.delete_event, event_id, calendar_id,
+            deadline=CALENDAR_WRITE_DEADLINE,
+        )
+
+
+# =========================
+# Shared Client
+# =========================
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def get_calendar():
+    """Process-wide calendar client, created on first use."""
+    global _calendar
+    if _calendar is None:
+        with _calendar_lock:
+            if _calendar is None:
+                _calendar = GuardedCalendar(CalendarService())
+    return _calendar
+
+
+def set_calendar(calendar, guarded: bool = True) -> None:
+    """
+    Swap in another implementation (e.g. an in-memory fake for benchmarks).
+    It is wrapped in the circuit breaker like the real client unless
+    `guarded` is False.
+    """
+    global _calendar
+    with _calendar_lock:
+        _calendar = GuardedCalendar(calendar) if guarded else calendar
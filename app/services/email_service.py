@@ -1,22 +1,22 @@
 import smtplib
 import os
+import queue
+import threading
+from contextlib import contextmanager
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
-def send_confirmation_email(patient_email, patient_name, appt_details):
-    # Load settings from .env
-    smtp_user = os.getenv("MAILTRAP_USER")
-    smtp_pass = os.getenv("MAILTRAP_PASS")
-    smtp_host = os.getenv("MAILTRAP_HOST")
-    smtp_port = os.getenv("MAILTRAP_PORT")
+SENDER = "clinic@smart-care.com"
 
+
+def build_confirmation_email(patient_email, patient_name, appt_details) -> MIMEMultipart:
     # Create the email object
     message = MIMEMultipart()
-    message["From"] = "clinic@smart-care.com"  
+    message["From"] = SENDER
     message["To"] = patient_email
     message["Subject"] = "Appointment Confirmed!"
 
-    
+
     html = f"""
     <html>
       <body>
@@ -29,12 +29,167 @@ def send_confirmation_email(patient_email, patient_name, appt_details):
     </html>
     """
     message.attach(MIMEText(html, "html"))
+    return message
+
+
+def build_reminder_email(patient_email, patient_name, appt_details) -> MIMEMultipart:
+    message = MIMEMultipart()
+    message["From"] = SENDER
+    message["To"] = patient_email
+    message["Subject"] = "Appointment Reminder"
+
+    html = f"""
+    <html>
+      <body>
+        <h3>Hello {patient_name},</h3>
+        <p>This is a reminder of your appointment <b>tomorrow</b>.</p>
+        <p>Details: {appt_details}</p>
+        <p>If you can no longer attend, please let us know so we can offer the slot to another patient.</p>
+        <br/>
+        <p>Best regards,<br/>The SmartCare Team</p>
+      </body>
+    </html>
+    """
+    message.attach(MIMEText(html, "html"))
+    return message
+
+
+def build_waitlist_offer_email(patient_email, patient_name, appt_details) -> MIMEMultipart:
+    message = MIMEMultipart()
+    message["From"] = SENDER
+    message["To"] = patient_email
+    message["Subject"] = "A slot has opened up"
 
-    try:
-        with smtplib.SMTP(smtp_host, smtp_port, timeout=10) as server:
+    html = f"""
+    <html>
+      <body>
+        <h3>Hello {patient_name},</h3>
+        <p>Good news! A slot you were waiting for is now available.</p>
+        <p>Details: {appt_details}</p>
+        <p>Reply or chat with us to book it before it is taken.</p>
+        <br/>
+        <p>Best regards,<br/>The SmartCare Team</p>
+      </body>
+    </html>
+    """
+    message.attach(MIMEText(html, "html"))
+    return message
+
+
+EMAIL_TEMPLATES = {
+    "confirmation": build_confirmation_email,
+    "reminder": build_reminder_email,
+    "waitlist_offer": build_waitlist_offer_email,
+}
+
+
+# =========================
+# SMTP Connection Pool
+# =========================
+
+class SMTPConnectionPool:
+    """
+    Keeps a few authenticated SMTP connections open and hands them out,
+    so each message skips the connect / STARTTLS / LOGIN round trips.
+
+    Point it at a local `aiosmtpd` stand-in with starttls=False and no user.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str | None = None,
+        password: str | None = None,
+        starttls: bool = True,
+        size: int = 2,
+        timeout: float = 10,
+    ):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._idle: queue.LifoQueue = queue.LifoQueue(maxsize=size)
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
             server.starttls()
-            server.login(smtp_user, smtp_pass)
-            server.sendmail(message["From"], [patient_email], message.as_string())
-        print(f"✅ SUCCESS: Email sent to {patient_email}") 
-    except Exception as e:
-        print(f"❌ EMAIL ERROR: {str(e)}") 
\ No newline at end of file
+        if self.user:
+            server.login(self.user, self.password)
+        return server
+
+    def _is_alive(self, server: smtplib.SMTP) -> bool:
+        try:
+            return server.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
+
+    @staticmethod
+    def _close(server: smtplib.SMTP) -> None:
+        try:
+            server.quit()
+        except Exception:
+            server.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a live connection; broken ones are dropped instead of returned."""
+        server = None
+        try:
+            server = self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        if server is None or not self._is_alive(server):
+            if server is not None:
+                self._close(server)
+            server = self._connect()
+
+        try:
+            yield server
+        except (smtplib.SMTPServerDisconnected, OSError):
+            self._close(server)
+            raise
+        else:
+            try:
+                self._idle.put_nowait(server)
+            except queue.Full:
+                self._close(server)
+
+    def send(self, message: MIMEMultipart) -> None:
+        with self.connection() as server:
+            server.sendmail(message["From"], [message["To"]], message.as_string())
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                self._close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+_pool: SMTPConnectionPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_smtp_pool() -> SMTPConnectionPool:
+    """Process-wide pool built from the MAILTRAP_* settings in .env."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SMTPConnectionPool(
+                    host=os.getenv("MAILTRAP_HOST"),
+                    port=int(os.getenv("MAILTRAP_PORT") or 587),
+                    user=os.getenv("MAILTRAP_USER"),
+                    password=os.getenv("MAILTRAP_PASS"),
+                    starttls=os.getenv("MAILTRAP_STARTTLS", "true").lower() != "false",
+                    size=int(os.getenv("SMTP_POOL_SIZE", "2")),
+                )
+    return _pool
+
@@ -0,0 +1,164 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from typing import Any, Iterator, List, Optional
+
+from app.db import models
+from app.db.session import SessionLocal
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# Rows fetched per round trip from the server-side cursor
+YIELD_PER = 2000
+
+APPOINTMENT_COLUMNS = [
+    models.Appointment.id,
+    models.Appointment.patient_id,
+    models.Appointment.service_type_id,
+    models.Appointment.appointment_date,
+    models.Appointment.start_time,
+    models.Appointment.end_time,
+    models.Appointment.status,
+    models.Appointment.sync_status,
+    models.Appointment.google_event_id,
+    models.Appointment.provider_id,
+    models.Appointment.created_at,
+]
+
+PATIENT_COLUMNS = [
+    models.Patient.id,
+    models.Patient.full_name,
+    models.Patient.phone_number,
+    models.Patient.email,
+    models.Patient.is_insured,
+    models.Patient.insurance_provider,
+    models.Patient.created_at,
+]
+
+LOG_COLUMNS = [
+    models.AgentLog.id,
+    models.AgentLog.patient_id,
+    models.AgentLog.log_context,
+    models.AgentLog.agent_action,
+    models.AgentLog.system_decision,
+    models.AgentLog.confidence_score,
+    models.AgentLog.created_at,
+]
+
+
+def _json_default(value: Any):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def _csv_value(value: Any):
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    return value
+
+
+def _stream(columns: List[Any], filters: List[Any], fmt: str) -> Iterator[str]:
+    """
+    Streams selected columns straight from a server-side cursor.
+
+    Opens its own session because the response body is produced after the
+    request dependencies may already have been torn down. Only plain
+    tuples are materialized, one `YIELD_PER` batch at a time, so memory
+    stays flat no matter how many rows are exported.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    names = [c.key for c in columns]
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(*columns)
+            .filter(*filters)
+            .order_by(columns[0])
+            .execution_options(stream_results=True)
+            .yield_per(YIELD_PER)
+        )
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if fmt == "csv":
+            writer.writerow(names)
+
+        pending = 0
+        for row in query:
+            if fmt == "csv":
+                writer.writerow([_csv_value(v) for v in row])
+            else:
+                buffer.write(json.dumps(dict(zip(names, row)), default=_json_default))
+                buffer.write("\n")
+
+            pending += 1
+            if pending >= YIELD_PER:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+                pending = 0
+
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+def stream_appointments(
+    fmt: str,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[str] = None,
+    patient_id: Optional[int] = None,
+) -> Iterator[str]:
+    filters = []
+    if date_from:
+        filters.append(models.Appointment.appointment_date >= date_from)
+    if date_to:
+        filters.append(models.Appointment.appointment_date <= date_to)
+    if status:
+        filters.append(models.Appointment.status == status)
+    if patient_id:
+        filters.append(models.Appointment.patient_id == patient_id)
+    return _stream(APPOINTMENT_COLUMNS, filters, fmt)
+
+
+def stream_patients(
+    fmt: str,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Iterator[str]:
+    filters = []
+    if created_from:
+        filters.append(models.Patient.created_at >= created_from)
+    if created_to:
+        filters.append(models.Patient.created_at <= created_to)
+    return _stream(PATIENT_COLUMNS, filters, fmt)
+
+
+def stream_logs(
+    fmt: str,
+    patient_id: Optional[int] = None,
+    action: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Iterator[str]:
+    filters = []
+    if patient_id:
+        filters.append(models.AgentLog.patient_id == patient_id)
+    if action:
+        filters.append(models.AgentLog.agent_action == action)
+    if created_from:
+        filters.append(models.AgentLog.created_at >= created_from)
+    if created_to:
+        filters.append(models.AgentLog.created_at <= created_to)
+    return _stream(LOG_COLUMNS, filters, fmt)
@@ -1,6 +1,9 @@
 from sqlalchemy.orm import Session
 from typing import Optional
+from datetime import datetime
 from app.db import models
+from app.core.pagination import keyset_page
+from app.services.export_service import LOG_COLUMNS
 
 
 def log_agent_action_service(
@@ -27,8 +30,34 @@ def log_agent_action_service(
     db.commit()
 
 
-def get_logs(db: Session, limit: int = 100):
+def get_logs(
+    db: Session,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    patient_id: Optional[int] = None,
+    action: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
     """
     Fetches the most recent logs for the staff dashboard.
+    Returns (rows, next_cursor); rows are plain tuples of LOG_COLUMNS.
     """
-    return db.query(models.AgentLog).order_by(models.AgentLog.id.desc()).limit(limit).all()
\ No newline at end of file
+    query = db.query(*LOG_COLUMNS)
+
+    if patient_id:
+        query = query.filter(models.AgentLog.patient_id == patient_id)
+    if action:
+        query = query.filter(models.AgentLog.agent_action == action)
+    if created_from:
+        query = query.filter(models.AgentLog.created_at >= created_from)
+    if created_to:
+        query = query.filter(models.AgentLog.created_at <= created_to)
+
+    return keyset_page(
+        query,
+        columns=[models.AgentLog.id],
+        cursor=cursor,
+        limit=limit,
+        parsers=[int],
+    )
@@ -1,6 +1,5 @@
 from sqlalchemy.orm import Session
 from app.db import models
-from app.services.email_service import send_confirmation_email
 
 
 def send_notification_service(
@@ -10,27 +9,39 @@ def send_notification_service(
     message: str,
     db: Session
 ) -> models.Notification:
-    
-    # 1. Create the DB record (Your existing code)
-    notification = models.Notification(
+    """
+    Queues a notification. The row itself is the durable queue entry;
+    the notification worker picks up 'pending' rows and delivers them,
+    so callers never block on the mail server.
+    """
+    notification = enqueue_notification(
+        db=db,
         appointment_id=appointment_id,
         channel=channel,
         recipient=recipient,
         message=message,
-        status="pending", 
     )
-    db.add(notification)
-    
-    # 2. ACTUALLY SEND THE EMAIL
-    if channel == "email":
-        try:
-            
-            send_confirmation_email(recipient, "Patient", message) 
-            notification.status = "sent" 
-        except Exception:
-            notification.status = "failed"
-
-    
     db.commit()
     db.refresh(notification)
+    return notification
+
+
+def enqueue_notification(
+    db: Session,
+    appointment_id: int | None,
+    channel: str,
+    recipient: str,
+    message: str,
+    kind: str = "confirmation",
+) -> models.Notification:
+    """Adds a pending notification to the session without committing."""
+    notification = models.Notification(
+        appointment_id=appointment_id,
+        channel=channel.lower().strip(),
+        recipient=recipient,
+        message=message,
+        status="pending",
+        kind=kind,
+    )
+    db.add(notification)
     return notification
\ No newline at end of file
@@ -0,0 +1,185 @@
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.session import SessionLocal
+from app.services.email_service import EMAIL_TEMPLATES, build_confirmation_email, get_smtp_pool
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "50"))
+POLL_INTERVAL_SECONDS = float(os.getenv("NOTIFICATION_POLL_SECONDS", "2"))
+MAX_ATTEMPTS = 5
+BACKOFF_BASE_SECONDS = 30
+# A claimed row not settled within this long is retried by the next poll
+CLAIM_LEASE_SECONDS = int(os.getenv("NOTIFICATION_CLAIM_SECONDS", "300"))
+
+
+def _backoff(attempts: int) -> timedelta:
+    # 30s, 60s, 2m, 4m, ...
+    return timedelta(seconds=BACKOFF_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def claim_batch(db: Session, batch_size: int = BATCH_SIZE):
+    """
+    Locks up to `batch_size` due email notifications. SKIP LOCKED lets
+    several workers drain the queue without handing out the same row twice;
+    rows stay locked until the caller commits. 'sending' rows whose lease
+    ran out belong to a worker that died mid-batch and are picked up again.
+    """
+    now = datetime.now(timezone.utc)
+    return (
+        db.query(models.Notification)
+        .filter(
+            models.Notification.status.in_(("pending", "sending")),
+            models.Notification.channel == "email",
+            or_(
+                models.Notification.next_attempt_at.is_(None),
+                models.Notification.next_attempt_at <= now,
+            ),
+        )
+        .order_by(models.Notification.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+
+
+def _patient_name(notification: models.Notification) -> str:
+    appointment = notification.appointment
+    if appointment and appointment.patient:
+        return appointment.patient.full_name
+    return "Patient"
+
+
+def _record(db: Session, notification_id: int, attempts: int, error: Optional[Exception]) -> None:
+    notification = db.get(models.Notification, notification_id)
+    now = datetime.now(timezone.utc)
+    if error is None:
+        notification.status = "sent"
+        notification.sent_at = now
+        notification.next_attempt_at = None
+        notification.last_error = None
+    else:
+        notification.last_error = str(error)[:500]
+        if attempts >= MAX_ATTEMPTS:
+            notification.status = "failed"
+        else:
+            notification.status = "pending"
+            notification.next_attempt_at = now + _backoff(attempts)
+    db.commit()
+
+
+def process_batch(
+    db: Session,
+    batch_size: int = BATCH_SIZE,
+    send: Optional[Callable] = None,
+) -> int:
+    """
+    Delivers one batch over a single pooled SMTP connection. Returns the
+    number of rows processed.
+
+    Rows are claimed ('sending', attempts + 1, leased for CLAIM_LEASE_SECONDS)
+    and committed before any SMTP traffic, so no row lock or transaction
+    stays open while a slow server answers. Each outcome is committed right
+    after its send; a crash can re-send at most the message in flight.
+    """
+    batch = claim_batch(db, batch_size)
+    if not batch:
+        db.commit()
+        return 0
+
+    lease_until = datetime.now(timezone.utc) + timedelta(seconds=CLAIM_LEASE_SECONDS)
+    claimed = []
+    for notification in batch:
+        if (notification.attempts or 0) >= MAX_ATTEMPTS:
+            # Lease ran out on the last attempt; its outcome is unknown
+            notification.status = "failed"
+            notification.last_error = notification.last_error or "worker lease expired"
+            continue
+        build = EMAIL_TEMPLATES.get(notification.kind, build_confirmation_email)
+        message = build(
+            notification.recipient,
+            _patient_name(notification),
+            notification.message,
+        )
+        notification.attempts = (notification.attempts or 0) + 1
+        notification.status = "sending"
+        notification.next_attempt_at = lease_until
+        claimed.append((notification.id, notification.attempts, message))
+    db.commit()
+
+    send = send or get_smtp_pool().send
+    for notification_id, attempts, message in claimed:
+        try:
+            send(message)
+            error = None
+        except Exception as e:
+            error = e
+            logger.warning(
+                "Notification %s attempt %s failed: %s",
+                notification_id, attempts, e
+            )
+        _record(db, notification_id, attempts, error)
+
+    return len(claimed)
+
+
+# =========================
+# Background Worker
+# =========================
+
+class NotificationWorker:
+    """Polls the notifications table on a daemon thread until stopped."""
+
+    def __init__(self, poll_interval: float = POLL_INTERVAL_SECONDS, batch_size: int = BATCH_SIZE):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="notification-worker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        get_smtp_pool().close_all()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            processed = 0
+            db = SessionLocal()
+            try:
+                processed = process_batch(db, self.batch_size)
+            except Exception as e:
+                db.rollback()
+                logger.error("Notification worker error: %s", e)
+            finally:
+                db.close()
+
+            # A full batch means there is likely more waiting
+            if processed < self.batch_size:
+                self._stop.wait(self.poll_interval)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    worker = NotificationWorker()
+    worker.start()
+    try:
+        while True:
+            threading.Event().wait(3600)
+    except KeyboardInterrupt:
+        worker.stop()
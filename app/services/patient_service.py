@@ -1,7 +1,12 @@
+from sqlalchemy import Float, case, cast, func, or_
 from sqlalchemy.orm import Session
 from typing import Optional
+from datetime import datetime
 from app.db import models
+from app.core.pagination import keyset_page, ranked_page
+from app.core.search import like_pattern
 from app.services.logging_service import log_agent_action_service
+from app.services.export_service import PATIENT_COLUMNS
 
 
 
@@ -21,6 +26,79 @@ def get_patient_by_id(db: Session, patient_id: int) -> Optional[models.Patient]:
     )
 
 
+def list_patients(
+    db: Session,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    """
+    One page of patients for the admin dashboard, newest first.
+    Returns (rows, next_cursor); rows are plain tuples of PATIENT_COLUMNS.
+    """
+    query = db.query(*PATIENT_COLUMNS)
+
+    if created_from:
+        query = query.filter(models.Patient.created_at >= created_from)
+    if created_to:
+        query = query.filter(models.Patient.created_at <= created_to)
+
+    return keyset_page(
+        query,
+        columns=[models.Patient.id],
+        cursor=cursor,
+        limit=limit,
+        parsers=[int],
+    )
+
+
+def patient_match(q: str):
+    """
+    (filter, score) for a free-text patient search. The ILIKE substring
+    filter is answered from the trigram GIN indexes; the score ranks exact
+    id and name-prefix hits first, then by trigram word similarity.
+    """
+    pattern = like_pattern(q)
+    email = func.coalesce(models.Patient.email, "")
+
+    conditions = [
+        models.Patient.full_name.ilike(pattern, escape="\\"),
+        models.Patient.phone_number.ilike(pattern, escape="\\"),
+        models.Patient.email.ilike(pattern, escape="\\"),
+    ]
+    boosts = [case((models.Patient.full_name.ilike(pattern[1:], escape="\\"), 1.0), else_=0.0)]
+    if q.isdigit():
+        conditions.append(models.Patient.id == int(q))
+        boosts.append(case((models.Patient.id == int(q), 10.0), else_=0.0))
+
+    similarity = func.greatest(
+        func.word_similarity(q, models.Patient.full_name),
+        func.word_similarity(q, models.Patient.phone_number),
+        func.word_similarity(q, email),
+    )
+    score = cast(similarity, Float)
+    for boost in boosts:
+        score = score + boost
+    return or_(*conditions), score
+
+
+def search_patients(
+    db: Session,
+    q: str,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+):
+    """
+    Ranked substring search on name, phone and email.
+    Returns (patients, next_cursor).
+    """
+    q = q.strip()
+    match, score = patient_match(q)
+    query = db.query(models.Patient, score.label("score")).filter(match)
+    return ranked_page(query, score, models.Patient.id, cursor, limit)
+
+
 def create_patient(
     db: Session,
     full_name: str,
@@ -0,0 +1,126 @@
+import calendar
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date, time
+from app.db import models
+
+# Availability looks hours up by date.strftime("%A")
+WEEKDAYS = list(calendar.day_name)
+
+
+def _get_provider(db: Session, provider_id: int) -> models.Provider:
+    provider = db.query(models.Provider).filter(models.Provider.id == provider_id).first()
+    if not provider:
+        raise ValueError(f"Provider {provider_id} not found")
+    return provider
+
+
+def provider_exists(db: Session, provider_id: int) -> bool:
+    return db.query(models.Provider.id).filter(models.Provider.id == provider_id).first() is not None
+
+
+def _service_type_ids(db: Session, service_type_ids: List[int]) -> List[int]:
+    """De-duplicated ids, after checking they all exist (ValueError otherwise)."""
+    ids = list(dict.fromkeys(service_type_ids))
+    found = {row[0] for row in db.query(models.ServiceType.id).filter(models.ServiceType.id.in_(ids))}
+    missing = [i for i in ids if i not in found]
+    if missing:
+        raise ValueError(f"Service type {missing[0]} not found")
+    return ids
+
+
+def _validate_hours(hours: List[dict]) -> List[dict]:
+    seen = set()
+    for h in hours:
+        day = h["day_of_week"]
+        if day not in WEEKDAYS:
+            raise ValueError(f"day_of_week must be one of {', '.join(WEEKDAYS)}, got {day!r}")
+        if day in seen:
+            raise ValueError(f"{day} is listed more than once")
+        seen.add(day)
+        if h.get("is_closed"):
+            continue
+        if h.get("open_time") is None or h.get("close_time") is None:
+            raise ValueError(f"{day} needs open_time and close_time unless is_closed")
+        if h["close_time"] <= h["open_time"]:
+            raise ValueError(f"{day}: close_time must be after open_time")
+    return hours
+
+
+def list_providers(db: Session) -> List[models.Provider]:
+    return db.query(models.Provider).order_by(models.Provider.id).all()
+
+
+def create_provider(
+    db: Session,
+    name: str,
+    kind: str = "doctor",
+    calendar_id: Optional[str] = None,
+    active: bool = True,
+    service_type_ids: Optional[List[int]] = None,
+) -> models.Provider:
+    service_type_ids = _service_type_ids(db, service_type_ids or [])
+
+    provider = models.Provider(name=name, kind=kind, calendar_id=calendar_id, active=active)
+    db.add(provider)
+    db.flush()
+
+    for service_type_id in service_type_ids:
+        db.add(models.ProviderService(provider_id=provider.id, service_type_id=service_type_id))
+
+    db.commit()
+    db.refresh(provider)
+    return provider
+
+
+def set_provider_services(db: Session, provider_id: int, service_type_ids: List[int]) -> None:
+    """Replaces the set of service types a provider can deliver."""
+    _get_provider(db, provider_id)
+    service_type_ids = _service_type_ids(db, service_type_ids)
+    db.query(models.ProviderService).filter(
+        models.ProviderService.provider_id == provider_id
+    ).delete(synchronize_session=False)
+    for service_type_id in service_type_ids:
+        db.add(models.ProviderService(provider_id=provider_id, service_type_id=service_type_id))
+    db.commit()
+
+
+def set_provider_hours(db: Session, provider_id: int, hours: List[dict]) -> List[models.ProviderHour]:
+    """Replaces a provider's weekly hours; days left out fall back to clinic hours."""
+    _get_provider(db, provider_id)
+    _validate_hours(hours)
+    db.query(models.ProviderHour).filter(
+        models.ProviderHour.provider_id == provider_id
+    ).delete(synchronize_session=False)
+
+    rows = [models.ProviderHour(provider_id=provider_id, **h) for h in hours]
+    db.add_all(rows)
+    db.commit()
+    for row in rows:
+        db.refresh(row)
+    return rows
+
+
+def block_provider_time(
+    db: Session,
+    provider_id: int,
+    blocked_date: date,
+    start_time: time,
+    end_time: time,
+    reason: Optional[str] = None,
+) -> models.BlockedSlot:
+    _get_provider(db, provider_id)
+    if end_time <= start_time:
+        raise ValueError("end_time must be after start_time")
+
+    block = models.BlockedSlot(
+        provider_id=provider_id,
+        date=blocked_date,
+        start_time=start_time,
+        end_time=end_time,
+        reason=reason,
+    )
+    db.add(block)
+    db.commit()
+    db.refresh(block)
+    return block
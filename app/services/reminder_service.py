@@ -0,0 +1,152 @@
+import logging
+import os
+import threading
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import String, cast, func, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.db.session import SessionLocal
+from app.services.logging_service import log_agent_action_service
+from app.services.waitlist_service import expire_waitlist
+
+logger = logging.getLogger(__name__)
+
+REMINDER_INTERVAL_SECONDS = float(os.getenv("REMINDER_INTERVAL_SECONDS", "900"))
+
+# Stable key for pg_try_advisory_xact_lock so only one worker runs a pass at a time
+REMINDER_LOCK_KEY = zlib.crc32(b"appointment-reminders")
+
+
+def enqueue_reminders(db: Session, target_date: Optional[date] = None) -> Optional[int]:
+    """
+    Queues one reminder email for every confirmed appointment on
+    `target_date` (tomorrow by default) in a single INSERT ... SELECT.
+
+    Idempotent: the partial unique index on (appointment_id, kind='reminder')
+    turns re-runs into no-ops, and the transaction-scoped advisory lock keeps
+    concurrent workers from doing the same pass twice. Returns the number of
+    reminders queued, or None if another worker holds the lock.
+    """
+    target_date = target_date or (date.today() + timedelta(days=1))
+
+    locked = db.execute(
+        text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": REMINDER_LOCK_KEY}
+    ).scalar()
+    if not locked:
+        db.rollback()
+        return None
+
+    details = func.concat(
+        cast(models.Appointment.appointment_date, String),
+        " at ",
+        func.to_char(models.Appointment.start_time, "HH24:MI"),
+    )
+
+    # Served by ix_appointments_status_date_id
+    due = (
+        select(
+            models.Appointment.id,
+            literal("email"),
+            models.Patient.email,
+            details,
+            literal("pending"),
+            literal("reminder"),
+        )
+        .join(models.Patient, models.Patient.id == models.Appointment.patient_id)
+        .where(
+            models.Appointment.status == "confirmed",
+            models.Appointment.appointment_date == target_date,
+            models.Patient.email.isnot(None),
+        )
+    )
+
+    stmt = (
+        insert(models.Notification)
+        .from_select(
+            ["appointment_id", "channel", "recipient", "message", "status", "kind"],
+            due,
+        )
+        .on_conflict_do_nothing(
+            index_elements=["appointment_id", "kind"],
+            index_where=(models.Notification.kind == "reminder"),
+        )
+    )
+
+    queued = db.execute(stmt).rowcount
+    db.commit()
+
+    if queued:
+        log_agent_action_service(
+            db=db,
+            patient_id=None,
+            log_context="[Reminder Scheduler]",
+            agent_action="REMINDERS_QUEUED",
+            system_decision=f"Queued {queued} reminders for {target_date}",
+            confidence_score=1.0
+        )
+
+    return queued
+
+
+# =========================
+# Scheduler
+# =========================
+
+class ReminderScheduler:
+    """
+    Runs `enqueue_reminders` for tomorrow, then the waitlist expiry pass, on a
+    fixed interval. Safe to run in every worker process; the advisory lock
+    and unique index dedupe, and the expiry updates are idempotent.
+    """
+
+    def __init__(self, interval: float = REMINDER_INTERVAL_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="reminder-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            db = SessionLocal()
+            try:
+                queued = enqueue_reminders(db)
+                if queued:
+                    logger.info("Queued %s appointment reminders", queued)
+                waitlist = expire_waitlist(db)
+                if any(waitlist.values()):
+                    logger.info("Waitlist: expired %(expired)s, re-queued %(requeued)s stale offers", waitlist)
+            except Exception as e:
+                db.rollback()
+                logger.error("Reminder scheduler error: %s", e)
+            finally:
+                db.close()
+
+            self._stop.wait(self.interval)
+
+
+if __name__ == "__main__":
+    # One-off pass, e.g. from cron: python -m app.services.reminder_service [YYYY-MM-DD]
+    import sys
+
+    target = datetime.strptime(sys.argv[1], "%Y-%m-%d").date() if len(sys.argv) > 1 else None
+    db = SessionLocal()
+    try:
+        print(f"Queued reminders: {enqueue_reminders(db, target)}")
+    finally:
+        db.close()
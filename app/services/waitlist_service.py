@@ -0,0 +1,205 @@
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import Session
+
+from app.db import models
+from app.services.logging_service import log_agent_action_service
+from app.services.notification_service import enqueue_notification
+
+# How long an emailed offer holds an entry out of the queue
+WAITLIST_OFFER_TTL_HOURS = float(os.getenv("WAITLIST_OFFER_TTL_HOURS", "24"))
+
+
+def join_waitlist(
+    db: Session,
+    patient_id: int,
+    service_type_id: int,
+    date_from: date,
+    date_to: Optional[date] = None,
+    preferred_start: Optional[time] = None,
+    preferred_end: Optional[time] = None,
+) -> models.WaitlistEntry:
+
+    date_to = date_to or date_from
+    if date_to < date_from:
+        raise ValueError("date_to must be on or after date_from")
+
+    patient = db.query(models.Patient).filter(models.Patient.id == patient_id).first()
+    if not patient:
+        raise ValueError("Patient not found")
+
+    service = db.query(models.ServiceType).filter(
+        models.ServiceType.id == service_type_id,
+        models.ServiceType.active == True
+    ).first()
+    if not service:
+        raise ValueError("Service type not found or inactive")
+
+    entry = models.WaitlistEntry(
+        patient_id=patient_id,
+        service_type_id=service_type_id,
+        date_from=date_from,
+        date_to=date_to,
+        preferred_start=preferred_start,
+        preferred_end=preferred_end,
+        status="waiting",
+    )
+    db.add(entry)
+    db.commit()
+    db.refresh(entry)
+
+    log_agent_action_service(
+        db=db,
+        patient_id=patient_id,
+        log_context="[System Auto-Log]",
+        agent_action="WAITLIST_JOINED",
+        system_decision=f"Waitlist {entry.id} for service {service_type_id}, {date_from} to {date_to}",
+        confidence_score=1.0
+    )
+    return entry
+
+
+def find_waitlist_match(
+    db: Session,
+    slot_date: date,
+    start_time: time,
+    end_time: time,
+    exclude_patient_id: Optional[int] = None,
+) -> Optional[models.WaitlistEntry]:
+    """
+    Oldest waiting entry whose date window covers `slot_date`, whose
+    service fits the freed interval and whose preferred window (if any)
+    overlaps it. Walks ix_waitlist_waiting_window and locks the row so two
+    simultaneous cancellations never offer the same patient twice.
+    """
+    freed_minutes = (
+        datetime.combine(slot_date, end_time) - datetime.combine(slot_date, start_time)
+    ) // timedelta(minutes=1)
+
+    query = (
+        db.query(models.WaitlistEntry)
+        .join(models.ServiceType, models.ServiceType.id == models.WaitlistEntry.service_type_id)
+        .join(models.Patient, models.Patient.id == models.WaitlistEntry.patient_id)
+        .filter(
+            models.WaitlistEntry.status == "waiting",
+            models.WaitlistEntry.date_from <= slot_date,
+            models.WaitlistEntry.date_to >= slot_date,
+            models.ServiceType.duration_minutes <= freed_minutes,
+            or_(
+                models.WaitlistEntry.preferred_start.is_(None),
+                models.WaitlistEntry.preferred_start < end_time,
+            ),
+            or_(
+                models.WaitlistEntry.preferred_end.is_(None),
+                models.WaitlistEntry.preferred_end > start_time,
+            ),
+            models.Patient.email.isnot(None),
+        )
+    )
+    if exclude_patient_id:
+        query = query.filter(models.WaitlistEntry.patient_id != exclude_patient_id)
+
+    return (
+        query.order_by(models.WaitlistEntry.id)
+        .limit(1)
+        .with_for_update(skip_locked=True, of=models.WaitlistEntry)
+        .first()
+    )
+
+
+def offer_freed_slot(db: Session, appointment: models.Appointment) -> Optional[models.WaitlistEntry]:
+    """
+    Backfills a cancelled appointment's interval: picks the best waitlist
+    candidate and queues an offer through the notification worker.
+    """
+    entry = find_waitlist_match(
+        db,
+        slot_date=appointment.appointment_date,
+        start_time=appointment.start_time,
+        end_time=appointment.end_time,
+        exclude_patient_id=appointment.patient_id,
+    )
+    if not entry:
+        db.commit()
+        return None
+
+    entry.status = "offered"
+    entry.offered_date = appointment.appointment_date
+    entry.offered_time = appointment.start_time
+    entry.offered_at = datetime.now(timezone.utc)
+
+    enqueue_notification(
+        db=db,
+        appointment_id=None,
+        channel="email",
+        recipient=entry.patient.email,
+        message=(
+            f"{entry.service_type.name} on {appointment.appointment_date} "
+            f"at {appointment.start_time.strftime('%H:%M')}"
+        ),
+        kind="waitlist_offer",
+    )
+    db.commit()
+
+    log_agent_action_service(
+        db=db,
+        patient_id=entry.patient_id,
+        log_context="[System Auto-Log]",
+        agent_action="WAITLIST_OFFERED",
+        system_decision=(
+            f"Waitlist {entry.id} offered freed slot {appointment.appointment_date} "
+            f"{appointment.start_time} from Appt {appointment.id}"
+        ),
+        confidence_score=1.0
+    )
+    return entry
+
+
+def expire_waitlist(db: Session, today: Optional[date] = None) -> Dict[str, int]:
+    """
+    Housekeeping for the queue, run by the reminder scheduler:
+
+    - entries whose window has passed become 'expired', which also takes
+      them out of ix_waitlist_waiting_window;
+    - offers unanswered for WAITLIST_OFFER_TTL_HOURS go back to 'waiting'
+      (keeping their place by id), unless the patient has since booked that
+      service within the window.
+    """
+    today = today or date.today()
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=WAITLIST_OFFER_TTL_HOURS)
+    entries = models.WaitlistEntry
+
+    expired = (
+        db.query(entries)
+        .filter(entries.status.in_(("waiting", "offered")), entries.date_to < today)
+        .update({entries.status: "expired"}, synchronize_session=False)
+    )
+
+    booked = exists().where(and_(
+        models.Appointment.patient_id == entries.patient_id,
+        models.Appointment.service_type_id == entries.service_type_id,
+        models.Appointment.appointment_date.between(entries.date_from, entries.date_to),
+        models.Appointment.status != "cancelled",
+    )).correlate(entries)
+    requeued = (
+        db.query(entries)
+        .filter(
+            entries.status == "offered",
+            or_(entries.offered_at.is_(None), entries.offered_at < cutoff),
+            ~booked,
+        )
+        .update(
+            {
+                entries.status: "waiting",
+                entries.offered_date: None,
+                entries.offered_time: None,
+                entries.offered_at: None,
+            },
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+    return {"expired": expired, "requeued": requeued}
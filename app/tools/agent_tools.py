@@ -1,14 +1,32 @@
 from sqlalchemy.orm import Session
 from typing import Optional, Dict, Any
-from datetime import date, time
+from datetime import date, datetime, time, timedelta
 
 from app.services.patient_service import (
     get_patient_by_phone,
     create_patient
 )
 from app.services.availability_service import check_availability
-from app.services.appointment_service import create_appointment_service, get_appointments_by_patient, cancel_appointment_service
+from app.services.appointment_service import create_appointment_service, get_appointments_by_patient, cancel_appointment_service, parse_time_string
 from app.services.notification_service import send_notification_service
+from app.services.waitlist_service import join_waitlist
+
+# Service names the model passes instead of a service_type_id
+SERVICE_TYPE_NAMES = {
+    "initial consult": 1, "initial consultation": 1,
+    "follow-up": 2, "lab review": 3
+}
+
+
+def resolve_service_type_id(service_type_id: Any) -> Any:
+    """The id for a service name or numeric string; anything else is returned as given."""
+    if isinstance(service_type_id, str):
+        clean_id = service_type_id.lower().strip()
+        if clean_id in SERVICE_TYPE_NAMES:
+            return SERVICE_TYPE_NAMES[clean_id]
+        if clean_id.isdigit():
+            return int(clean_id)
+    return service_type_id
 
 # =========================
 # Tool 1: Lookup Patient
@@ -17,12 +35,16 @@ from app.services.notification_service import send_notification_service
 def lookup_patient_tool(
     phone_number: str,
     db: Session,
-    session_state: Dict[str, Any]
+    session_state: Dict[str, Any],
+    prefetch: Any = None
 ) -> Optional[Dict[str, Any]]:
 
     session_state["phone_number"] = phone_number
 
-    patient = get_patient_by_phone(db, phone_number)
+    if prefetch is not None:
+        patient = prefetch.take("lookup_patient", phone_number, lambda: get_patient_by_phone(db, phone_number))
+    else:
+        patient = get_patient_by_phone(db, phone_number)
 
     if not patient:
         session_state["patient_id"] = None
@@ -104,27 +126,24 @@ def check_availability_tool(
     service_type_id: Any,
     requested_time: str | None,
     db: Session,
-    session_state: Dict[str, Any]
+    session_state: Dict[str, Any],
+    prefetch: Any = None
 ) -> Dict:
     
-    mapping = {
-        "initial consult": 1, "initial consultation": 1,
-        "follow-up": 2, "lab review": 3
-    }
-    
-    if isinstance(service_type_id, str):
-        clean_id = service_type_id.lower().strip()
-        if clean_id in mapping:
-            service_type_id = mapping[clean_id]
-        elif clean_id.isdigit():
-            service_type_id = int(clean_id)
+    service_type_id = resolve_service_type_id(service_type_id)
 
     try:
-        slots = check_availability(
-            appointment_date=appointment_date,
-            service_type_id=service_type_id,
-            db=db
-        )
+        def compute():
+            return check_availability(
+                appointment_date=appointment_date,
+                service_type_id=service_type_id,
+                db=db
+            )
+
+        if prefetch is not None:
+            slots = prefetch.take("check_availability", (str(appointment_date), service_type_id), compute)
+        else:
+            slots = compute()
 
         if not slots:
             return {"available_slots": []}
@@ -225,7 +244,8 @@ def create_appointment_tool(
             f"Success: Appointment confirmed! ID: {appointment.id}, "
             f"Date: {appointment.appointment_date}, "
             f"Time: {appointment.start_time.strftime('%H:%M')} to {appointment.end_time.strftime('%H:%M')}. "
-            f"The booking is DONE. Now, strictly ask the patient ONLY if they want confirmation via Email or WhatsApp."
+            + (f"Provider: {appointment.provider.name}. " if appointment.provider_id else "")
+            + f"The booking is DONE. Now, strictly ask the patient ONLY if they want confirmation via Email or WhatsApp."
         )
 
     except Exception as e:
@@ -263,9 +283,10 @@ def send_notification_tool(
         db=db
     )
 
+    # 'pending' means queued: the notification worker delivers it in the background
     return {
         "notification_id": notification.id,
-        "status": notification.status
+        "status": "queued" if notification.status == "pending" else notification.status
     }
 
 
@@ -339,6 +360,57 @@ def cancel_appointment_tool(
             "cancelled_appointment_id": selected_id
         }
 
+    except Exception as e:
+        db.rollback()
+        return {"error": str(e)}
+
+
+def join_waitlist_tool(
+    patient_id: int,
+    service_type_id: Any,
+    date_from: str,
+    date_to: str | None,
+    preferred_time: str | None,
+    db: Session,
+    session_state: dict
+) -> Dict:
+
+    if not patient_id:
+        return {"error": "missing_patient_id"}
+
+    try:
+        start = datetime.strptime(date_from, "%Y-%m-%d").date()
+        end = datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else start
+
+        preferred_start = preferred_end = None
+        if preferred_time:
+            # Accept +/- 1 hour around the time the patient asked for, kept
+            # within the same day so the window never wraps past midnight
+            requested = datetime.combine(start, parse_time_string(preferred_time.strip()))
+            day_start = datetime.combine(start, time.min)
+            day_end = datetime.combine(start, time(23, 59))
+            preferred_start = max(requested - timedelta(hours=1), day_start).time()
+            preferred_end = min(requested + timedelta(hours=1), day_end).time()
+
+        entry = join_waitlist(
+            db=db,
+            patient_id=int(patient_id),
+            service_type_id=int(resolve_service_type_id(service_type_id)),
+            date_from=start,
+            date_to=end,
+            preferred_start=preferred_start,
+            preferred_end=preferred_end,
+        )
+
+        session_state["waitlist_id"] = entry.id
+
+        return {
+            "success": True,
+            "waitlist_id": entry.id,
+            "date_from": str(entry.date_from),
+            "date_to": str(entry.date_to)
+        }
+
     except Exception as e:
         db.rollback()
         return {"error": str(e)}
\ No newline at end of file
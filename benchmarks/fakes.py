@@ -0,0 +1,191 @@
+"""
+Offline stand-ins for the two external dependencies of a chat turn:
+a scripted chat model (instead of ChatOpenAI) and an in-memory
+calendar (instead of Google Calendar), optionally fault-injecting.
+"""
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+
+ToolRule = Tuple[str, str, Callable[[re.Match], Dict[str, Any]]]
+
+# (pattern, tool name, args builder). First match on the human message wins.
+DEFAULT_RULES: List[ToolRule] = [
+    (
+        r"\b(\d{10,11})\b",
+        "lookup_patient",
+        lambda m: {"phone_number": m.group(1)},
+    ),
+    (
+        r"(\d{4}-\d{2}-\d{2})(?:\D+(\d{1,2}:\d{2}))?",
+        "check_availability",
+        lambda m: {"appointment_date": m.group(1), "service_type_id": 2, "requested_time": m.group(2)},
+    ),
+]
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic tool-calling model. On a fresh human message it emits the
+    tool call of the first matching rule (or a plain reply if none match);
+    once tool results are in the scratchpad it returns a final reply.
+    Each call sleeps `latency` seconds (+/- `jitter`) to mimic the provider;
+    a `tail_rate` fraction of calls, drawn independently per call (so a
+    hedged duplicate is usually fast), takes `tail_latency` instead.
+    """
+
+    rules: List[Any] = DEFAULT_RULES
+    latency: float = 0.5
+    jitter: float = 0.0
+    tail_rate: float = 0.0
+    tail_latency: float = 10.0
+    reply: str = "Thanks, that's all set."
+    seed: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def get_num_tokens(self, text: str) -> int:
+        # Rough 4-chars-per-token estimate so trim_messages needs no tokenizer
+        return len(text) // 4 + 1
+
+    def get_num_tokens_from_messages(self, messages: List[BaseMessage], tools=None) -> int:
+        return sum(self.get_num_tokens(str(m.content)) + 4 for m in messages)
+
+    def _sleep(self, messages: List[BaseMessage]) -> None:
+        if self.tail_rate and random.random() < self.tail_rate:
+            time.sleep(self.tail_latency)
+            return
+        if not self.latency:
+            return
+        rng = random.Random(hash((self.seed, len(messages))))
+        time.sleep(max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter)))
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        last = messages[-1]
+        prompt_tokens = self.get_num_tokens_from_messages(messages)
+        usage = {"input_tokens": prompt_tokens, "output_tokens": 12, "total_tokens": prompt_tokens + 12}
+
+        if isinstance(last, HumanMessage):
+            for pattern, tool, build_args in self.rules:
+                match = re.search(pattern, str(last.content))
+                if match:
+                    return AIMessage(
+                        content="",
+                        tool_calls=[{"name": tool, "args": build_args(match), "id": f"call_{uuid.uuid4().hex[:12]}"}],
+                        usage_metadata=usage,
+                    )
+
+        return AIMessage(content=self.reply, usage_metadata=usage)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self._sleep(messages)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+
+class InMemoryCalendar:
+    """Drop-in for CalendarService that keeps events in a dict."""
+
+    def __init__(self, latency: float = 0.0, busy: Optional[Dict[date, List[Tuple[datetime, datetime]]]] = None):
+        self.latency = latency
+        self.busy = busy or {}
+        self.events: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def _wait(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_busy_slots(self, target_date: date, calendar_id: str = "primary"):
+        self._wait()
+        return self._busy(target_date, calendar_id)
+
+    def get_busy_slots_many(self, target_date: date, calendar_ids):
+        # One round trip for all calendars, like the freebusy API
+        self._wait()
+        return {c: self._busy(target_date, c) for c in calendar_ids}
+
+    def _busy(self, target_date: date, calendar_id: str):
+        with self._lock:
+            slots = list(self.busy.get(target_date, [])) if calendar_id == "primary" else []
+            slots += [
+                (e["start"], e["end"]) for e in self.events.values()
+                if e["start"].date() == target_date and e["calendar_id"] == calendar_id
+            ]
+        return slots
+
+    def create_event(self, summary, start_time, end_time, calendar_id="primary"):
+        self._wait()
+        event_id = uuid.uuid4().hex
+        with self._lock:
+            self.events[event_id] = {
+                "summary": summary, "start": start_time, "end": end_time, "calendar_id": calendar_id,
+            }
+        return {"id": event_id}
+
+    def delete_event(self, event_id, calendar_id="primary"):
+        self._wait()
+        with self._lock:
+            self.events.pop(event_id, None)
+
+
+class CalendarFault(Exception):
+    """What FaultyCalendar raises; carries an HTTP-like status like googleapiclient's HttpError."""
+
+    def __init__(self, status: int = 503):
+        super().__init__(f"Injected calendar fault ({status})")
+        self.resp = type("Resp", (), {"status": status})()
+
+
+class FaultyCalendar(InMemoryCalendar):
+    """
+    InMemoryCalendar that misbehaves on purpose, to exercise the circuit
+    breaker: each call fails with `error_status` at `failure_rate`, hangs
+    for `hang_seconds` at `hang_rate`, and fails every call while an outage
+    started with `outage(seconds)` lasts. Seeded, so runs are repeatable.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        hang_seconds: float = 30.0,
+        error_status: int = 503,
+        seed: int = 0,
+        **kwargs,
+    ):
+        super().__init__(latency=latency, **kwargs)
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.error_status = error_status
+        self.calls = 0
+        self._outage_until = 0.0
+        self._rng = random.Random(seed)
+
+    def outage(self, seconds: float) -> None:
+        self._outage_until = time.monotonic() + seconds
+
+    def _wait(self) -> None:
+        with self._lock:
+            self.calls += 1
+            roll = self._rng.random()
+        if time.monotonic() < self._outage_until or roll < self.failure_rate:
+            raise CalendarFault(self.error_status)
+        if roll < self.failure_rate + self.hang_rate:
+            time.sleep(self.hang_seconds)
+        super()._wait()
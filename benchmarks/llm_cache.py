@@ -0,0 +1,86 @@
+"""
+Record/replay wrapper for chat models, used by the conversation replay
+benchmark. Responses are stored in a SQLite file keyed by the prompt, so
+replays are deterministic, free and safe to run from many processes.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+# The system prompt embeds today's date; mask it so recordings stay valid
+_DATE_PATTERN = re.compile(
+    r"\b(Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday), \w+ \d{2}, \d{4}\b"
+)
+
+
+def prompt_key(messages: List[BaseMessage], tools: Optional[list]) -> str:
+    payload = {
+        "messages": [
+            {"type": m.type, "content": _DATE_PATTERN.sub("<DATE>", str(m.content)),
+             "tool_calls": getattr(m, "tool_calls", None)}
+            for m in messages
+        ],
+        "tools": sorted(getattr(t, "name", str(t)) for t in (tools or [])),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class CacheMiss(Exception):
+    pass
+
+
+class RecordingChatModel(BaseChatModel):
+    """
+    mode="record": call `inner` on a miss and store the response.
+    mode="replay": serve only from the cache; a miss raises CacheMiss.
+    """
+
+    cache_path: str
+    mode: str = "replay"
+    inner: Optional[Any] = None
+    bound_tools: Optional[List[Any]] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"bound_tools": list(tools)})
+
+    def get_num_tokens_from_messages(self, messages: List[BaseMessage], tools=None) -> int:
+        if self.inner is not None:
+            return self.inner.get_num_tokens_from_messages(messages)
+        return sum(len(str(m.content)) // 4 + 5 for m in messages)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.cache_path, timeout=30)
+        conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, message TEXT NOT NULL)")
+        return conn
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        key = prompt_key(messages, self.bound_tools)
+
+        with self._connect() as conn:
+            row = conn.execute("SELECT message FROM responses WHERE key = ?", (key,)).fetchone()
+        if row:
+            message = messages_from_dict([json.loads(row[0])])[0]
+            return ChatResult(generations=[ChatGeneration(message=message)])
+
+        if self.mode != "record" or self.inner is None:
+            raise CacheMiss(f"No recorded response for prompt {key[:12]}")
+
+        model = self.inner.bind_tools(self.bound_tools) if self.bound_tools else self.inner
+        message = model.invoke(messages)
+
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, message) VALUES (?, ?)",
+                (key, json.dumps(message_to_dict(message))),
+            )
+        return ChatResult(generations=[ChatGeneration(message=message)])
@@ -0,0 +1,252 @@
+"""
+Conversation replay benchmark.
+
+Reads historical sessions from the `conversations` table, re-drives every
+user message through AgentService.handle_message against a snapshot DB,
+and compares latency, tool-call counts, token usage and the final
+session_state with the original run (from `agent_turns` / `session_states`).
+
+LLM responses come from a SQLite record/replay cache, so a run is
+deterministic and costs nothing once recorded:
+
+    # 1. once, against OpenAI, to fill the cache
+    python -m benchmarks.replay --mode record --sessions 200
+    # 2. as often as needed, fully offline, across 8 processes
+    python -m benchmarks.replay --mode replay --processes 8
+
+Point DATABASE_URL at a snapshot (e.g. a pg_dump restore) -- replays write
+new rows under a `replay-<run>-` session_id prefix.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+os.environ.setdefault("NOTIFICATION_WORKER_ENABLED", "false")
+os.environ.setdefault("REMINDER_SCHEDULER_ENABLED", "false")
+
+from benchmarks.fakes import InMemoryCalendar
+from benchmarks.llm_cache import RecordingChatModel
+
+REPLAY_PREFIX = "replay-"
+
+
+# =========================
+# Loading originals
+# =========================
+
+def load_sessions(limit: Optional[int]) -> List[Dict[str, Any]]:
+    from app.db import models
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        query = (
+            db.query(models.Conversation.session_id)
+            .filter(~models.Conversation.session_id.startswith(REPLAY_PREFIX))
+            .group_by(models.Conversation.session_id)
+            .order_by(models.Conversation.session_id)
+        )
+        if limit:
+            query = query.limit(limit)
+        session_ids = [row[0] for row in query]
+
+        sessions = []
+        for session_id in session_ids:
+            rows = (
+                db.query(models.Conversation)
+                .filter(models.Conversation.session_id == session_id)
+                .order_by(models.Conversation.timestamp.asc(), models.Conversation.id.asc())
+                .all()
+            )
+            turns = []
+            for row in rows:
+                if row.role == "user":
+                    turns.append({"message": row.content, "sent": row.timestamp, "latency": None})
+                # Tool-call rows are 'assistant' too; the reply is the text row
+                elif row.role == "assistant" and row.message_type == "text" and turns and turns[-1]["latency"] is None:
+                    turns[-1]["latency"] = (row.timestamp - turns[-1]["sent"]).total_seconds()
+
+            state = db.query(models.SessionState).filter(
+                models.SessionState.session_id == session_id
+            ).first()
+
+            sessions.append({
+                "session_id": session_id,
+                "messages": [t["message"] for t in turns],
+                "original": {
+                    "latencies": [t["latency"] for t in turns],
+                    **_turn_stats(db, session_id),
+                    "final_state": state.data if state else {},
+                },
+            })
+        return sessions
+    finally:
+        db.close()
+
+
+def _turn_stats(db, session_id: str) -> Dict[str, Any]:
+    from app.db import models
+
+    turns = (
+        db.query(models.AgentTurn)
+        .filter(models.AgentTurn.session_id == session_id)
+        .order_by(models.AgentTurn.id)
+        .all()
+    )
+    if not turns:
+        return {"tool_calls": None, "prompt_tokens": None, "completion_tokens": None}
+    return {
+        "tool_calls": sum(t.tool_calls for t in turns),
+        "prompt_tokens": sum(t.prompt_tokens for t in turns),
+        "completion_tokens": sum(t.completion_tokens for t in turns),
+    }
+
+
+# =========================
+# Worker processes
+# =========================
+
+_worker_config: Dict[str, Any] = {}
+
+
+def _init_worker(mode: str, cache_path: str, run_id: str) -> None:
+    from app.db.database import engine
+    from app.services.calendar_service import set_calendar
+
+    # Connections inherited from the parent must not be shared after fork
+    engine.dispose(close=False)
+
+    set_calendar(InMemoryCalendar())
+
+    inner = None
+    if mode == "record":
+        from langchain_openai import ChatOpenAI
+        inner = ChatOpenAI(model="gpt-4o", temperature=0, stream_usage=True)
+
+    _worker_config.update(mode=mode, cache_path=cache_path, run_id=run_id, inner=inner)
+
+
+def replay_session(session: Dict[str, Any]) -> Dict[str, Any]:
+    from app.agent.agent_service import AgentService
+    from app.db.session import SessionLocal
+
+    replay_id = f"{REPLAY_PREFIX}{_worker_config['run_id']}-{session['session_id']}"
+    llm = RecordingChatModel(
+        cache_path=_worker_config["cache_path"],
+        mode=_worker_config["mode"],
+        inner=_worker_config["inner"],
+    )
+
+    db = SessionLocal()
+    latencies: List[float] = []
+    error = None
+    state: Dict[str, Any] = {}
+    try:
+        for message in session["messages"]:
+            started = time.perf_counter()
+            result = AgentService(db, llm=llm).handle_message(replay_id, message)
+            latencies.append(time.perf_counter() - started)
+            state = result.get("session_state", {})
+    except Exception as e:
+        db.rollback()
+        error = f"{type(e).__name__}: {e}"
+
+    try:
+        stats = _turn_stats(db, replay_id)
+    finally:
+        db.close()
+
+    return {
+        "session_id": session["session_id"],
+        "original": session["original"],
+        "replay": {"latencies": latencies, **stats, "final_state": state, "error": error},
+    }
+
+
+# =========================
+# Comparison
+# =========================
+
+def compare(result: Dict[str, Any]) -> Dict[str, Any]:
+    original, replay = result["original"], result["replay"]
+    orig_latency = sum(l for l in original["latencies"] if l is not None)
+
+    def delta(key):
+        if original.get(key) is None or replay.get(key) is None:
+            return None
+        return replay[key] - original[key]
+
+    state_keys = set(original["final_state"]) | set(replay["final_state"])
+    state_diff = sorted(
+        k for k in state_keys
+        if original["final_state"].get(k) != replay["final_state"].get(k)
+    )
+
+    return {
+        "session_id": result["session_id"],
+        "error": replay["error"],
+        "original_latency_s": round(orig_latency, 3),
+        "replay_latency_s": round(sum(replay["latencies"]), 3),
+        "tool_calls_delta": delta("tool_calls"),
+        "prompt_tokens_delta": delta("prompt_tokens"),
+        "completion_tokens_delta": delta("completion_tokens"),
+        "state_matches": not state_diff,
+        "state_diff_keys": state_diff,
+    }
+
+
+def summarize(rows: List[Dict[str, Any]], wall: float) -> None:
+    ok = [r for r in rows if not r["error"]]
+    print(f"\nReplayed {len(rows)} sessions in {wall:.1f}s ({len(rows) - len(ok)} errors)")
+    if not ok:
+        return
+
+    def total(key):
+        values = [r[key] for r in ok if r[key] is not None]
+        return sum(values) if values else None
+
+    print(f"latency  original={total('original_latency_s'):.1f}s replay={total('replay_latency_s'):.1f}s")
+    print(f"tool calls delta={total('tool_calls_delta')}  "
+          f"prompt tokens delta={total('prompt_tokens_delta')}  "
+          f"completion tokens delta={total('completion_tokens_delta')}")
+    matches = sum(1 for r in ok if r["state_matches"])
+    print(f"final session_state matches: {matches}/{len(ok)}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--cache", default="replay_llm_cache.sqlite3")
+    parser.add_argument("--sessions", type=int, default=None, help="Max sessions to replay")
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--out", default=None, help="Write per-session comparison as JSON")
+    args = parser.parse_args()
+
+    from app.db.migrate import migrate
+
+    migrate()
+    sessions = load_sessions(args.sessions)
+    run_id = uuid.uuid4().hex[:8]
+    print(f"Run {run_id}: {len(sessions)} sessions across {args.processes} processes ({args.mode})")
+
+    started = time.perf_counter()
+    with multiprocessing.Pool(
+        args.processes,
+        initializer=_init_worker,
+        initargs=(args.mode, args.cache, run_id),
+    ) as pool:
+        rows = [compare(r) for r in pool.imap_unordered(replay_session, sessions)]
+    wall = time.perf_counter() - started
+
+    summarize(rows, wall)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(rows, f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Cold-start profile for an API worker.
+
+1. `python -X importtime -c "import app.main"` in a fresh interpreter,
+   reporting total import time and the slowest top-level packages.
+2. Checks that heavy stacks (LangChain/OpenAI, googleapiclient, livekit,
+   jose) are NOT imported until first use.
+3. Starts uvicorn and measures the time until GET / answers.
+
+    python -m benchmarks.startup_profile --budget-ms 1500
+
+Exits non-zero if import time exceeds the budget or a deferred module leaks
+into startup, so it can gate CI.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from collections import defaultdict
+
+DEFERRED_MODULES = [
+    "langchain",
+    "langchain_openai",
+    "langchain_core",
+    "openai",
+    "googleapiclient",
+    "google.oauth2",
+    "livekit",
+    "jose",
+    "passlib",
+]
+
+ENV = {
+    **os.environ,
+    "NOTIFICATION_WORKER_ENABLED": "false",
+    "REMINDER_SCHEDULER_ENABLED": "false",
+}
+
+
+def import_profile(top: int):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, env=ENV,
+    )
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+
+    by_package = defaultdict(int)
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _cumulative_us, name = [p.strip() for p in line[len("import time:"):].split("|")]
+        by_package[name.split(".")[0]] += int(self_us)
+        total_us += int(self_us)
+
+    print(f"import app.main: {total_us / 1000:.0f} ms (sum of self times)")
+    for name, us in sorted(by_package.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        print(f"  {name:<28}{us / 1000:>8.1f} ms")
+    return total_us / 1000
+
+
+def leaked_modules():
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=ENV)
+    return [m for m in out.stdout.strip().split(",") if m]
+
+
+def time_to_health_check(port: int, timeout: float = 60) -> float:
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        env=ENV,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1) as resp:
+                    if resp.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.02)
+        raise SystemExit("Health check never answered")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=None)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--skip-server", action="store_true")
+    args = parser.parse_args()
+
+    import_ms = import_profile(args.top)
+
+    leaked = leaked_modules()
+    print(f"deferred modules imported at startup: {leaked or 'none'}")
+
+    if not args.skip_server:
+        print(f"time until GET / responds: {time_to_health_check(args.port) * 1000:.0f} ms")
+
+    if leaked or (args.budget_ms and import_ms > args.budget_ms):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
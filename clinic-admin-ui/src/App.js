@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import { fetchLogs, fetchAppointments, fetchPatients, updateAppointmentStatus } from './api';
+import { fetchLogs, fetchAppointments, fetchPatients, searchAppointments, searchPatients, updateAppointmentStatus } from './api';
 import Login from './components/Login'; 
 import { 
   Activity, Calendar, CheckCircle, XCircle, ClipboardList, 
@@ -14,6 +14,11 @@ function App() {
   const [activeTab, setActiveTab] = useState('appointments');
   const [loading, setLoading] = useState(true);
   const [searchTerm, setSearchTerm] = useState('');
+  const [cursors, setCursors] = useState({ logs: null, appointments: null, patients: null });
+  // Results of the server-side search for the active tab; null when not searching
+  const [searchResults, setSearchResults] = useState(null);
+  // Bumped on a `resync` event to refetch the first pages
+  const [reloadKey, setReloadKey] = useState(0);
 
   const handleLogout = () => {
     localStorage.removeItem('admin_token');
@@ -48,9 +53,10 @@ function App() {
     const loadData = async () => {
       try {
         const [l, a, p] = await Promise.all([fetchLogs(), fetchAppointments(), fetchPatients()]);
-        setLogs(l.data.sort((a, b) => b.id - a.id));
-        setAppointments(a.data.sort((a, b) => b.id - a.id));
-        setPatients(p.data);
+        setLogs(l.data.items);
+        setAppointments(a.data.items);
+        setPatients(p.data.items);
+        setCursors({ logs: l.data.next_cursor, appointments: a.data.next_cursor, patients: p.data.next_cursor });
       } catch (err) { 
         console.error("Fetch error:", err);
         if (err.response?.status === 401) setToken(null);
@@ -58,14 +64,81 @@ function App() {
       finally { setLoading(false); }
     };
     loadData();
+  }, [token, reloadKey]);
+
+  // Live deltas from /events instead of re-downloading the tables
+  useEffect(() => {
+    if (!token) return;
+
+    const source = new EventSource(`/events/?token=${encodeURIComponent(token)}`);
+    source.addEventListener('appointment', (e) => {
+      const { op, row } = JSON.parse(e.data);
+      setAppointments(prev => op === 'insert'
+        ? [row, ...prev.filter(a => a.id !== row.id)]
+        : prev.map(a => (a.id === row.id ? { ...a, ...row } : a)));
+    });
+    source.addEventListener('log', (e) => {
+      const { row } = JSON.parse(e.data);
+      setLogs(prev => [row, ...prev.filter(l => l.id !== row.id)]);
+    });
+    source.addEventListener('resync', () => setReloadKey(k => k + 1));
+    return () => source.close();
   }, [token]);
 
+  useEffect(() => {
+    const q = searchTerm.trim().replace(/^#/, '');
+    if (activeTab === 'logs' || q.length < 2) {
+      setSearchResults(null);
+      return;
+    }
+
+    const searchers = { appointments: searchAppointments, patients: searchPatients };
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const res = await searchers[activeTab]({ q });
+        if (!cancelled) setSearchResults({ q, items: res.data.items, cursor: res.data.next_cursor });
+      } catch (err) {
+        console.error("Search error:", err);
+      }
+    }, 250);
+    return () => { cancelled = true; clearTimeout(timer); };
+  }, [searchTerm, activeTab]);
+
+  const loadMore = async () => {
+    if (searchResults) {
+      const searchers = { appointments: searchAppointments, patients: searchPatients };
+      if (!searchResults.cursor) return;
+      try {
+        const res = await searchers[activeTab]({ q: searchResults.q, cursor: searchResults.cursor });
+        setSearchResults(prev => ({ ...prev, items: [...prev.items, ...res.data.items], cursor: res.data.next_cursor }));
+      } catch (err) {
+        console.error("Search error:", err);
+      }
+      return;
+    }
+
+    const fetchers = { logs: fetchLogs, appointments: fetchAppointments, patients: fetchPatients };
+    const setters = { logs: setLogs, appointments: setAppointments, patients: setPatients };
+    const cursor = cursors[activeTab];
+    if (!cursor) return;
+
+    try {
+      const res = await fetchers[activeTab]({ cursor });
+      setters[activeTab](prev => [...prev, ...res.data.items]);
+      setCursors(prev => ({ ...prev, [activeTab]: res.data.next_cursor }));
+    } catch (err) {
+      console.error("Fetch error:", err);
+    }
+  };
+
   if (!token) {
     return <Login />;
   }
 
-  const filteredAppts = appointments.filter(a => a.id.toString().includes(searchTerm) || a.appointment_date.includes(searchTerm));
-  const filteredPatients = patients.filter(p => p.id.toString().includes(searchTerm) || p.full_name.toLowerCase().includes(searchTerm.toLowerCase()));
+  const filteredAppts = searchResults && activeTab === 'appointments' ? searchResults.items : appointments;
+  const filteredPatients = searchResults && activeTab === 'patients' ? searchResults.items : patients;
+  const hasMore = searchResults ? Boolean(searchResults.cursor) : Boolean(cursors[activeTab]);
 
   const containerStyle = { padding: '40px', fontFamily: '"Inter", sans-serif', backgroundColor: '#f8fafc', minHeight: '100vh' };
   const navStyle = { display: 'flex', gap: '8px', background: '#e2e8f0', padding: '5px', borderRadius: '10px' };
@@ -105,7 +178,7 @@ function App() {
           <div style={{ position: 'relative', alignSelf: 'flex-end' }}>
             <input 
               style={inputStyle} 
-              placeholder={activeTab === 'appointments' ? "Search Date or ID..." : "Search Name or ID..."}
+              placeholder={activeTab === 'appointments' ? "Search date, ID or patient..." : "Search name, phone or email..."}
               value={searchTerm}
               onChange={(e) => setSearchTerm(e.target.value)}
             />
@@ -151,6 +224,10 @@ function App() {
             new Date(l.created_at).toLocaleTimeString(), l.agent_action, l.log_context, l.system_decision
           ])} />
         )}
+
+        {hasMore && (
+          <button onClick={loadMore} style={{ ...btnStyle(false), marginTop: '16px' }}>Load more</button>
+        )}
       </div>
     </div>
   );
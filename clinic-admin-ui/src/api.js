@@ -29,9 +29,15 @@ api.interceptors.response.use(
 );
 
 // --- DASHBOARD API CALLS ---
-export const fetchLogs = () => api.get('/logs/');
-export const fetchAppointments = () => api.get('/appointments/');
-export const fetchPatients = () => api.get('/patients/');
+// List endpoints are keyset-paginated: pass back `next_cursor` as `cursor`
+// to load the next page. Any extra filters go straight into the query string.
+export const fetchLogs = (params = {}) => api.get('/logs/', { params });
+export const fetchAppointments = (params = {}) => api.get('/appointments/', { params });
+export const fetchPatients = (params = {}) => api.get('/patients/', { params });
+
+// Server-side ranked search (same page shape): `q` is at least 2 characters
+export const searchAppointments = (params = {}) => api.get('/appointments/search', { params });
+export const searchPatients = (params = {}) => api.get('/patients/search', { params });
 
 // --- AUTH CALL ---
 // Updated: Removed the manual Content-Type header so Axios auto-detects it.
@@ -0,0 +1,54 @@
+"""
+Offline tests: fake chat models and calendars from `benchmarks.fakes`, no
+OpenAI or Google. Run with `python -m pytest` from the repo root.
+
+Tests that take the `db` fixture need a throwaway Postgres database in
+TEST_DATABASE_URL (its tables are dropped and recreated) and are skipped
+without one.
+"""
+import os
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+# Importing app.db builds an engine; without a test database nothing connects to it
+if TEST_DATABASE_URL:
+    os.environ["DATABASE_URL"] = TEST_DATABASE_URL
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("RESPONSE_CACHE_ENABLED", "false")
+os.environ.setdefault("NOTIFICATION_WORKER_ENABLED", "false")
+os.environ.setdefault("REMINDER_SCHEDULER_ENABLED", "false")
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The test database's engine, migrated from scratch once per run."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    from app.db.database import Base, engine
+    from app.db.migrate import migrate
+
+    Base.metadata.drop_all(engine)
+    migrate()
+    return engine
+
+
+@pytest.fixture
+def db(database):
+    """A session on an empty schema; every table is truncated afterwards."""
+    from sqlalchemy import text
+
+    from app.db.database import Base, SessionLocal
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        tables = ", ".join(t.name for t in Base.metadata.sorted_tables)
+        with database.begin() as conn:
+            conn.execute(text(f"TRUNCATE {tables} RESTART IDENTITY CASCADE"))
+            # The truncate itself bumps the statement-level write counters
+            conn.execute(text("TRUNCATE cache_versions"))
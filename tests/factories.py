@@ -0,0 +1,36 @@
+"""Row builders for the tests that run against the `db` fixture."""
+from datetime import date, time
+from itertools import count
+
+from app.db import models
+
+_phones = count(5550000001)
+
+
+def add_patient(db, full_name="Ada Patient", email="ada@example.com", **fields) -> models.Patient:
+    patient = models.Patient(full_name=full_name, phone_number=str(next(_phones)), email=email, **fields)
+    db.add(patient)
+    db.commit()
+    return patient
+
+
+def add_service(db, name="Follow-up", duration_minutes=30, **fields) -> models.ServiceType:
+    service = models.ServiceType(name=name, duration_minutes=duration_minutes, **fields)
+    db.add(service)
+    db.commit()
+    return service
+
+
+def add_appointment(db, patient, service, day: date, start: time, end: time, status="confirmed", **fields) -> models.Appointment:
+    appointment = models.Appointment(
+        patient_id=patient.id,
+        service_type_id=service.id,
+        appointment_date=day,
+        start_time=start,
+        end_time=end,
+        status=status,
+        **fields,
+    )
+    db.add(appointment)
+    db.commit()
+    return appointment
@@ -0,0 +1,149 @@
+import time
+from typing import Any, List
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("langchain")
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+
+from app.agent import agent_service
+from app.agent.agent_service import AgentService
+from app.agent import hedged_llm
+from app.agent.callbacks import StepCollector
+from app.agent.hedged_llm import BUDGET_FILLER
+from app.agent.memory import InMemoryStore
+from app.agent.model_router import FAST, ModelRouter
+from app.core.telemetry import TurnTrace
+
+
+class ScriptedChatModel(BaseChatModel):
+    """Returns `responses` in order and keeps every prompt it was sent; call n sleeps delays[n]."""
+
+    responses: List[Any]
+    prompts: List[Any] = []
+    delays: List[float] = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def get_num_tokens_from_messages(self, messages, tools=None) -> int:
+        return sum(len(str(m.content)) // 4 + 4 for m in messages)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        self.prompts.append(list(messages))
+        if self.delays:
+            time.sleep(self.delays.pop(0))
+        return ChatResult(generations=[ChatGeneration(message=self.responses.pop(0))])
+
+
+def _call(name, args, call_id):
+    return AIMessage(content="", tool_calls=[{"name": name, "args": args, "id": call_id}])
+
+
+@pytest.fixture
+def sent():
+    return []
+
+
+@pytest.fixture
+def tools(sent):
+    def send_notification(appointment_id: int, channel: str) -> dict:
+        sent.append((appointment_id, channel))
+        return {"notification_id": len(sent), "status": "queued"}
+
+    return [StructuredTool.from_function(send_notification, name="send_notification", description="Send it.")]
+
+
+def _service(fast, full, monkeypatch):
+    monkeypatch.setattr(agent_service, "log_agent_action_service", lambda **kwargs: None)
+    return AgentService(
+        db=MagicMock(),
+        memory_store=InMemoryStore(),
+        state_store=MagicMock(),
+        llm=full,
+        fast_llm=fast,
+        router=ModelRouter(classifier=lambda *args: (FAST, "test")) if fast else None,
+    )
+
+
+def _answer(service, tools, steps=None):
+    inputs = {"input": "email me the confirmation", "chat_history": [], "current_date": "Monday, March 02, 2026"}
+    return service._answer("s-1", inputs["input"], {}, [], tools, inputs, TurnTrace("s-1"), steps or StepCollector())
+
+
+def test_escalation_does_not_rerun_tools_the_fast_model_ran(monkeypatch, tools, sent):
+    fast = ScriptedChatModel(responses=[
+        _call("send_notification", {"appointment_id": 7, "channel": "email"}, "call_send"),
+        _call("no_such_tool", {}, "call_bad"),
+        AIMessage(content="Done."),
+    ])
+    full = ScriptedChatModel(responses=[AIMessage(content="Your confirmation is on its way.")])
+
+    result = _answer(_service(fast, full, monkeypatch), tools)
+
+    assert result["output"] == "Your confirmation is on its way."
+    assert sent == [(7, "email")]
+
+    # The full model saw the notification as already sent...
+    (prompt,) = full.prompts
+    results = [m for m in prompt if isinstance(m, ToolMessage)]
+    assert [m.tool_call_id for m in results] == ["call_send"]
+    assert "queued" in results[0].content
+    # ...and the invalid call is not replayed to it
+    assert all(c["name"] != "no_such_tool" for m in prompt for c in getattr(m, "tool_calls", []))
+
+    # Both runs' steps come back for memory and the response-cache bypass
+    tools_run = [action.tool for action, _ in result["intermediate_steps"]]
+    assert tools_run[0] == "send_notification"
+    assert "no_such_tool" in tools_run
+
+
+def test_fast_turn_without_escalation_keeps_its_steps(monkeypatch, tools, sent):
+    fast = ScriptedChatModel(responses=[
+        _call("send_notification", {"appointment_id": 3, "channel": "whatsapp"}, "call_1"),
+        AIMessage(content="Sent."),
+    ])
+    full = ScriptedChatModel(responses=[])
+
+    result = _answer(_service(fast, full, monkeypatch), tools)
+
+    assert result["output"] == "Sent."
+    assert full.prompts == []
+    assert sent == [(3, "whatsapp")]
+    assert [a.tool for a, _ in result["intermediate_steps"]] == ["send_notification"]
+
+
+def test_budget_filler_keeps_the_tools_that_already_ran(monkeypatch, tools, sent):
+    full = ScriptedChatModel(
+        responses=[
+            _call("send_notification", {"appointment_id": 9, "channel": "email"}, "call_send"),
+            AIMessage(content="too late"),
+        ],
+        delays=[0.0, 1.0],
+    )
+    service = _service(None, full, monkeypatch)
+    service.state_store.get.return_value = {}
+    monkeypatch.setattr(agent_service, "get_langchain_tools", lambda **kwargs: tools)
+    monkeypatch.setattr(agent_service, "turn_budget", lambda: hedged_llm.turn_budget(0.3))
+    monkeypatch.setattr(hedged_llm, "HEDGE_DEFAULT_SECONDS", 5.0)
+
+    response = service._run_turn("s-2", "email me the confirmation", TurnTrace("s-2"))
+
+    assert response["reply"] == BUDGET_FILLER
+    assert response["degraded"] is True
+    assert sent == [(9, "email")]
+    # The notification is remembered for the next turn, ahead of the filler
+    history = service.memory_store.get("s-2")
+    assert [m["role"] for m in history] == ["user", "assistant", "tool", "assistant"]
+    assert history[1]["tool_calls"][0]["name"] == "send_notification"
+    assert history[2]["tool_call_id"] == history[1]["tool_calls"][0]["id"]
+    assert history[3]["content"] == BUDGET_FILLER
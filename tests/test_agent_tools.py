@@ -0,0 +1,51 @@
+from datetime import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.tools import agent_tools
+from app.tools.agent_tools import join_waitlist_tool, resolve_service_type_id
+
+
+@pytest.mark.parametrize("given, expected", [
+    ("follow-up", 2),
+    (" Initial Consultation ", 1),
+    ("3", 3),
+    (2, 2),
+    ("massage", "massage"),
+])
+def test_service_names_resolve_to_ids(given, expected):
+    assert resolve_service_type_id(given) == expected
+
+
+@pytest.fixture
+def joined(monkeypatch):
+    calls = []
+
+    def join_waitlist(db, **kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(id=11, date_from=kwargs["date_from"], date_to=kwargs["date_to"])
+
+    monkeypatch.setattr(agent_tools, "join_waitlist", join_waitlist)
+    return calls
+
+
+def test_waitlist_accepts_the_names_check_availability_accepts(joined):
+    result = join_waitlist_tool(
+        patient_id=4, service_type_id="follow-up", date_from="2025-03-14", date_to=None,
+        preferred_time="10:00", db=MagicMock(), session_state={},
+    )
+
+    assert result["success"] is True
+    assert joined[0]["service_type_id"] == 2
+    assert (joined[0]["preferred_start"], joined[0]["preferred_end"]) == (time(9, 0), time(11, 0))
+
+
+def test_preferred_window_stays_within_the_day(joined):
+    join_waitlist_tool(
+        patient_id=4, service_type_id=2, date_from="2025-03-14", date_to=None,
+        preferred_time="23:30", db=MagicMock(), session_state={},
+    )
+
+    assert (joined[0]["preferred_start"], joined[0]["preferred_end"]) == (time(22, 30), time(23, 59))
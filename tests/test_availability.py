@@ -0,0 +1,109 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from app.db import models
+from app.db.database import SessionLocal
+from app.services import availability_service
+from app.services.availability_service import _free_starts, assign_provider, provider_schedules
+from tests.factories import add_appointment, add_patient, add_service
+
+# Next Monday, so lead time never applies
+DAY = date.today() + timedelta(days=7 - date.today().weekday())
+THIRTY = timedelta(minutes=30)
+
+
+def at(hour, minute=0) -> datetime:
+    return datetime.combine(DAY, time(hour, minute))
+
+
+def _schedule(open_, close, busy=()):
+    return {"open": open_, "close": close, "busy": sorted(busy), "booked_minutes": 0}
+
+
+def test_sweep_skips_every_busy_interval():
+    schedule = _schedule(at(9), at(12), [(at(9, 30), at(10)), (at(10), at(10, 15)), (at(11), at(12))])
+
+    starts = _free_starts(schedule, THIRTY, datetime.min)
+
+    assert starts == [at(9), at(10, 15), at(10, 30)]
+
+
+def test_sweep_handles_an_interval_spanning_several_slots():
+    schedule = _schedule(at(9), at(11), [(at(9), at(9, 15)), (at(9, 10), at(10, 20))])
+
+    assert _free_starts(schedule, THIRTY, datetime.min) == [at(10, 30)]
+
+
+def test_sweep_respects_the_lead_time():
+    schedule = _schedule(at(9), at(10, 30))
+
+    assert _free_starts(schedule, THIRTY, not_before=at(9, 20)) == [at(9, 30), at(9, 45), at(10)]
+
+
+@pytest.fixture
+def clinic(db):
+    """Open 09:00-12:00 on DAY with two doctors who both offer a 30-minute follow-up."""
+    db.add(models.BusinessHour(day_of_week=DAY.strftime("%A"), open_time=time(9), close_time=time(12)))
+    service = add_service(db, "Follow-up", 30)
+    doctors = [models.Provider(name="Dr A"), models.Provider(name="Dr B")]
+    db.add_all(doctors)
+    db.commit()
+    db.add_all([models.ProviderService(provider_id=d.id, service_type_id=service.id) for d in doctors])
+    db.commit()
+    return service, doctors
+
+
+def test_provider_hours_and_blocks_shape_each_sweep(db, clinic):
+    service, (a, b) = clinic
+    db.add_all([
+        models.ProviderHour(provider_id=b.id, day_of_week=DAY.strftime("%A"), open_time=time(10), close_time=time(11)),
+        models.BlockedSlot(date=DAY, start_time=time(9), end_time=time(9, 30), provider_id=a.id),
+        # Clinic-wide: blocks both
+        models.BlockedSlot(date=DAY, start_time=time(10, 30), end_time=time(11)),
+    ])
+    db.commit()
+    business_hour = db.query(models.BusinessHour).one()
+
+    schedules = provider_schedules(db, [a, b], DAY, business_hour)
+
+    assert _free_starts(schedules[a.id], THIRTY, datetime.min) == [
+        at(9, 30), at(9, 45), at(10), at(11), at(11, 15), at(11, 30),
+    ]
+    assert _free_starts(schedules[b.id], THIRTY, datetime.min) == [at(10)]
+
+
+def test_least_loaded_free_provider_is_assigned(db, clinic):
+    service, (a, b) = clinic
+    patient = add_patient(db)
+    add_appointment(db, patient, service, DAY, time(11), time(11, 30), provider_id=a.id)
+
+    assert assign_provider(db, service, at(9), at(9, 30)).id == b.id
+    db.rollback()
+
+    # Equal load now, but only Dr A is free at 10:00
+    add_appointment(db, patient, service, DAY, time(10), time(10, 30), provider_id=b.id)
+    assert assign_provider(db, service, at(10), at(10, 30)).id == a.id
+    db.rollback()
+
+
+def test_booking_committed_before_the_lock_is_rejected(db, clinic, monkeypatch):
+    service, (a, b) = clinic
+    patient = add_patient(db)
+    read_schedules = provider_schedules
+
+    def schedules_then_race(db, providers, appointment_date, business_hour):
+        schedules = read_schedules(db, providers, appointment_date, business_hour)
+        # Another request books Dr A after the schedules were read
+        other = SessionLocal()
+        try:
+            add_appointment(other, patient, service, DAY, time(9), time(9, 30), provider_id=a.id)
+        finally:
+            other.close()
+        return schedules
+
+    monkeypatch.setattr(availability_service, "provider_schedules", schedules_then_race)
+
+    with pytest.raises(ValueError, match="already booked"):
+        assign_provider(db, service, at(9), at(9, 30), provider_id=a.id)
+    db.rollback()
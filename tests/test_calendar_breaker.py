@@ -0,0 +1,124 @@
+import time
+from datetime import date, datetime, timedelta
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+pytest.importorskip("langchain_core")  # benchmarks.fakes also holds the fake chat model
+
+from app.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpen, DeadlineExceeded
+from app.services import calendar_service
+from app.core.telemetry import external_call, turn_trace
+from app.services.calendar_service import GuardedCalendar, _is_google_failure
+from benchmarks.fakes import CalendarFault, FaultyCalendar
+
+DAY = date.today() + timedelta(days=1)
+BUSY = [(datetime.combine(DAY, datetime.min.time()) + timedelta(hours=10),
+         datetime.combine(DAY, datetime.min.time()) + timedelta(hours=11))]
+
+
+def _guarded(calendar, threshold=3, cooldown=0.2):
+    breaker = CircuitBreaker(
+        f"test-calendar-{id(calendar)}",
+        failure_threshold=threshold,
+        cooldown=cooldown,
+        is_failure=_is_google_failure,
+    )
+    return GuardedCalendar(calendar, breaker)
+
+
+def test_breaker_opens_then_probes_and_closes():
+    calendar = FaultyCalendar(failure_rate=1.0)
+    guarded = _guarded(calendar)
+
+    for _ in range(3):
+        with pytest.raises(CalendarFault):
+            guarded.get_busy_slots(DAY)
+    assert guarded.breaker.state == OPEN
+
+    # Open: fails fast without touching the calendar
+    calls = calendar.calls
+    with pytest.raises(CircuitOpen):
+        guarded.get_busy_slots(DAY)
+    assert calendar.calls == calls
+
+    time.sleep(0.25)
+    assert guarded.breaker.state == HALF_OPEN
+
+    calendar.failure_rate = 0.0
+    assert guarded.get_busy_slots(DAY) == []
+    assert guarded.breaker.state == CLOSED
+
+
+def test_failed_probe_reopens():
+    calendar = FaultyCalendar(failure_rate=1.0)
+    guarded = _guarded(calendar, threshold=2)
+
+    for _ in range(2):
+        with pytest.raises(CalendarFault):
+            guarded.get_busy_slots(DAY)
+    time.sleep(0.25)
+
+    with pytest.raises(CalendarFault):
+        guarded.get_busy_slots(DAY)
+    assert guarded.breaker.state == OPEN
+
+
+def test_client_errors_do_not_open_the_breaker():
+    guarded = _guarded(FaultyCalendar(failure_rate=1.0, error_status=404))
+
+    for _ in range(5):
+        with pytest.raises(CalendarFault):
+            guarded.get_busy_slots(DAY)
+    assert guarded.breaker.state == CLOSED
+
+
+def test_deadline_cuts_a_hung_call_short(monkeypatch):
+    monkeypatch.setattr(calendar_service, "CALENDAR_READ_DEADLINE", 0.05)
+    guarded = _guarded(FaultyCalendar(hang_rate=1.0, hang_seconds=1.0), threshold=1)
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        guarded.get_busy_slots(DAY)
+    assert time.monotonic() - started < 0.5
+    # A timeout counts as a failure
+    assert guarded.breaker.state == OPEN
+
+
+def test_busy_slots_fall_back_to_the_last_good_read():
+    calendar = FaultyCalendar(busy={DAY: list(BUSY)})
+    guarded = _guarded(calendar, threshold=1)
+    assert guarded.get_busy_slots(DAY) == BUSY
+    assert guarded.get_busy_slots_many(DAY, ["primary", "dr-b"]) == {"primary": BUSY, "dr-b": []}
+
+    calendar.outage(60)
+    # The failing call itself and the short-circuited ones after it are served from cache
+    assert guarded.get_busy_slots(DAY) == BUSY
+    assert guarded.breaker.state == OPEN
+    assert guarded.get_busy_slots_many(DAY, ["primary", "dr-b"]) == {"primary": BUSY, "dr-b": []}
+
+
+def test_no_fallback_for_a_day_never_read():
+    calendar = FaultyCalendar()
+    guarded = _guarded(calendar, threshold=1)
+    calendar.outage(60)
+
+    with pytest.raises(CalendarFault):
+        guarded.get_busy_slots(DAY + timedelta(days=1))
+
+
+class TimedCalendar(FaultyCalendar):
+    """Times its reads the way CalendarService does."""
+
+    def get_busy_slots(self, target_date, calendar_id="primary"):
+        with external_call("google_calendar"):
+            return super().get_busy_slots(target_date, calendar_id)
+
+
+def test_calendar_time_is_charged_to_the_calling_turn():
+    guarded = _guarded(TimedCalendar(latency=0.02))
+
+    with turn_trace("s-1") as turn:
+        guarded.get_busy_slots(DAY)
+
+    assert turn.external_seconds["google_calendar"] >= 0.02
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tools import StructuredTool
+
+from app.agent import hedged_llm
+from app.agent.hedged_llm import HedgedChatModel, LatencyTracker, TurnBudgetExceeded, turn_budget
+from benchmarks.fakes import FakeChatModel
+from benchmarks.llm_cache import CacheMiss, RecordingChatModel
+
+
+class ToolEchoModel(BaseChatModel):
+    """Answers with the names of the tools bound to it, so a lost binding shows."""
+
+    tool_names: list = []
+
+    @property
+    def _llm_type(self) -> str:
+        return "tool-echo"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.model_copy(update={"tool_names": [t.name for t in tools]})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        content = ",".join(self.tool_names) or "no tools"
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+
+def _tool():
+    def lookup_patient(phone_number: str) -> str:
+        return phone_number
+
+    return StructuredTool.from_function(lookup_patient, description="Look up a patient.")
+
+
+def test_hedged_wrapper_keeps_tools_through_record_and_replay(tmp_path):
+    cache = str(tmp_path / "llm.sqlite3")
+    messages = [HumanMessage(content="my number is 01134567890")]
+
+    recorder = RecordingChatModel(cache_path=cache, mode="record", inner=ToolEchoModel())
+    recorded = HedgedChatModel(inner=recorder).bind_tools([_tool()]).invoke(messages)
+    # Record mode reached the real model with the tools bound
+    assert recorded.content == "lookup_patient"
+
+    replayer = RecordingChatModel(cache_path=cache, mode="replay")
+    replayed = HedgedChatModel(inner=replayer).bind_tools([_tool()]).invoke(messages)
+    assert replayed.content == "lookup_patient"
+
+    # The cache key includes the tools, so an unbound replay must miss
+    with pytest.raises(CacheMiss):
+        HedgedChatModel(inner=replayer).invoke(messages)
+
+
+class ScriptedLatencyModel(FakeChatModel):
+    """FakeChatModel whose n-th call sleeps delays[n] seconds."""
+
+    delays: list = []
+    calls: list = []
+
+    def _sleep(self, messages) -> None:
+        self.calls.append(time.monotonic())
+        time.sleep(self.delays.pop(0) if self.delays else 0.0)
+
+
+@pytest.fixture(autouse=True)
+def fast_hedging(monkeypatch):
+    # No latency history yet, so hedging starts after the default threshold
+    monkeypatch.setattr(hedged_llm, "_tracker", LatencyTracker())
+    monkeypatch.setattr(hedged_llm, "HEDGE_DEFAULT_SECONDS", 0.05)
+
+
+def _elapsed(fn):
+    started = time.monotonic()
+    result = fn()
+    return result, time.monotonic() - started
+
+
+def test_slow_primary_is_hedged_and_the_hedge_wins():
+    model = ScriptedLatencyModel(delays=[1.0, 0.0])
+    hedged = HedgedChatModel(inner=model, hedging=True)
+
+    reply, elapsed = _elapsed(lambda: hedged.invoke([HumanMessage(content="hello")]))
+
+    assert reply.content == model.reply
+    assert len(model.calls) == 2
+    assert elapsed < 0.5
+
+
+def test_fast_primary_is_not_hedged():
+    model = ScriptedLatencyModel(delays=[0.0])
+    HedgedChatModel(inner=model, hedging=True).invoke([HumanMessage(content="hello")])
+    assert len(model.calls) == 1
+
+
+def test_no_hedge_when_all_hedge_slots_are_busy(monkeypatch):
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(hedged_llm, "_hedge_slots", slots)
+    model = ScriptedLatencyModel(delays=[0.2])
+
+    HedgedChatModel(inner=model, hedging=True).invoke([HumanMessage(content="hello")])
+    assert len(model.calls) == 1
+
+
+def test_turn_budget_cuts_off_a_slow_call():
+    # Every call lands in the tail, so hedging cannot rescue it
+    model = FakeChatModel(latency=0.0, tail_rate=1.0, tail_latency=1.0)
+    hedged = HedgedChatModel(inner=model, hedging=True)
+
+    started = time.monotonic()
+    with pytest.raises(TurnBudgetExceeded):
+        with turn_budget(0.2):
+            hedged.invoke([HumanMessage(content="hello")])
+    assert time.monotonic() - started < 0.6
+
+
+def test_turn_budget_returns_at_the_deadline():
+    hedged = HedgedChatModel(inner=FakeChatModel(latency=1.0), hedging=False)
+
+    started = time.monotonic()
+    with pytest.raises(TurnBudgetExceeded):
+        with turn_budget(0.1):
+            hedged.invoke([HumanMessage(content="hello")])
+    assert time.monotonic() - started < 0.5
+
+
+def test_spent_budget_fails_before_calling_the_model():
+    model = ScriptedLatencyModel()
+    with pytest.raises(TurnBudgetExceeded):
+        with turn_budget(0):
+            HedgedChatModel(inner=model).invoke([HumanMessage(content="hello")])
+    assert model.calls == []
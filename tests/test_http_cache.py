@@ -0,0 +1,77 @@
+from datetime import date, time, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import availability, service_types
+from app.core import http_cache
+from app.core.http_cache import _matches
+from app.db.session import get_db
+from tests.factories import add_appointment, add_patient, add_service
+
+DAY = date.today() + timedelta(days=7)
+
+
+@pytest.mark.parametrize("if_none_match, matches", [
+    ('"abc"', True),
+    ('W/"abc"', True),
+    ('"xyz", "abc"', True),
+    ("*", True),
+    ('"xyz"', False),
+])
+def test_if_none_match_uses_weak_comparison(if_none_match, matches):
+    assert _matches(if_none_match, '"abc"') is matches
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(service_types.router, prefix="/service-types")
+    app.include_router(availability.router, prefix="/availability")
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def test_current_etag_gets_a_bodiless_304(client, db):
+    add_service(db, "Follow-up")
+
+    first = client.get("/service-types/")
+    assert first.status_code == 200
+    assert [s["name"] for s in first.json()] == ["Follow-up"]
+    etag = first.headers["etag"]
+
+    again = client.get("/service-types/", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+    assert "max-age" in again.headers["cache-control"]
+
+
+def test_write_to_a_tracked_table_changes_the_etag(client, db):
+    etag = client.get("/service-types/").headers["etag"]
+
+    assert client.post("/service-types/", json={"name": "Lab Review", "duration_minutes": 15}).status_code == 200
+
+    fresh = client.get("/service-types/", headers={"If-None-Match": etag})
+    assert fresh.status_code == 200
+    assert fresh.headers["etag"] != etag
+    assert [s["name"] for s in fresh.json()] == ["Lab Review"]
+
+
+def test_availability_etag_follows_bookings_not_sync_bookkeeping(client, db, monkeypatch):
+    # Keep the time bucket from rolling over mid-test
+    monkeypatch.setattr(http_cache, "AVAILABILITY_ETAG_SECONDS", 3600)
+    service = add_service(db)
+    params = {"appointment_date": DAY.isoformat(), "service_type_id": service.id}
+    etag = client.get("/availability/", params=params).headers["etag"]
+
+    appointment = add_appointment(db, add_patient(db), service, DAY, time(9), time(9, 30))
+    booked = client.get("/availability/", params=params, headers={"If-None-Match": etag})
+    assert booked.status_code == 200
+    etag = booked.headers["etag"]
+
+    appointment.sync_status = "synced"
+    appointment.google_event_id = "evt-1"
+    db.commit()
+    assert client.get("/availability/", params=params, headers={"If-None-Match": etag}).status_code == 304
@@ -0,0 +1,43 @@
+from types import SimpleNamespace
+
+from app.agent.memory import InMemoryStore, prune_tool_records
+
+
+def _step(tool, args, output, call_id):
+    return SimpleNamespace(tool=tool, tool_input=args, tool_call_id=call_id), output
+
+
+def _turn(store, message, steps, reply):
+    store.save("s-1", "user", message)
+    store.save_tool_steps("s-1", steps)
+    store.save("s-1", "assistant", reply)
+
+
+def _replayed_calls(history):
+    return [call["id"] for m in history for call in m.get("tool_calls", [])]
+
+
+def test_only_the_latest_result_per_call_is_replayed():
+    store = InMemoryStore()
+    day = {"appointment_date": "2025-03-14", "service_type_id": "cleaning"}
+    _turn(store, "anything friday?", [_step("check_availability", day, {"slots": ["09:00"]}, "call_1")], "9:00 is free")
+    _turn(store, "and friday again?", [_step("check_availability", day, {"slots": []}, "call_2")], "Friday is full now")
+
+    history = prune_tool_records(store.get("s-1"))
+
+    assert _replayed_calls(history) == ["call_2"]
+    assert [m["tool_call_id"] for m in history if m["role"] == "tool"] == ["call_2"]
+    assert [m["content"] for m in history if m["role"] == "user"] == ["anything friday?", "and friday again?"]
+    assert "9:00 is free" in [m["content"] for m in history]
+
+
+def test_older_tool_results_are_dropped_past_the_cap():
+    store = InMemoryStore()
+    for n in range(5):
+        _turn(store, f"patient {n}?", [_step("get_patient_appointments", {"patient_id": n}, {"appointments": []}, f"call_{n}")], "none")
+
+    history = prune_tool_records(store.get("s-1"), max_results=2)
+
+    assert _replayed_calls(history) == ["call_3", "call_4"]
+    assert sum(m["role"] == "tool" for m in history) == 2
+    assert sum(m["role"] == "user" for m in history) == 5
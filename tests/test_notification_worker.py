@@ -0,0 +1,98 @@
+import socket
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+
+from aiosmtpd.controller import Controller
+
+from app.db import models
+from app.services import notification_worker
+from app.services.email_service import SMTPConnectionPool
+from app.services.notification_worker import process_batch
+
+
+class Inbox:
+    """aiosmtpd handler that keeps delivered mail and rejects `refuse` recipients with a 451."""
+
+    def __init__(self, refuse=()):
+        self.refuse = set(refuse)
+        self.delivered = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        if set(envelope.rcpt_tos) & self.refuse:
+            return "451 Try again later"
+        self.delivered.extend(envelope.rcpt_tos)
+        return "250 OK"
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def smtp():
+    """A local SMTP server (no STARTTLS, no auth) and a pool pointed at it."""
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    pool = SMTPConnectionPool(controller.hostname, controller.port, starttls=False, size=1)
+    try:
+        yield inbox, pool
+    finally:
+        pool.close_all()
+        controller.stop()
+
+
+def _queue(db, *recipients):
+    db.add_all([
+        models.Notification(channel="email", recipient=r, message="Friday 09:00", kind="confirmation")
+        for r in recipients
+    ])
+    db.commit()
+
+
+def test_batch_is_delivered_over_one_connection(db, smtp):
+    inbox, pool = smtp
+    _queue(db, "a@example.com", "b@example.com", "c@example.com")
+
+    assert process_batch(db, send=pool.send) == 3
+
+    assert inbox.delivered == ["a@example.com", "b@example.com", "c@example.com"]
+    assert len(inbox.sessions) == 1
+    rows = db.query(models.Notification).all()
+    assert {(n.status, n.attempts) for n in rows} == {("sent", 1)}
+    # Nothing left for the next poll
+    assert process_batch(db, send=pool.send) == 0
+
+
+def test_failed_send_is_retried_with_backoff(db, smtp):
+    inbox, pool = smtp
+    inbox.refuse.add("b@example.com")
+    _queue(db, "a@example.com", "b@example.com")
+
+    before = datetime.now(timezone.utc)
+    process_batch(db, send=pool.send)
+
+    failed = db.query(models.Notification).filter_by(recipient="b@example.com").one()
+    assert failed.status == "pending"
+    assert failed.attempts == 1
+    assert "451" in failed.last_error
+    assert failed.next_attempt_at >= before + timedelta(seconds=notification_worker.BACKOFF_BASE_SECONDS)
+    assert db.query(models.Notification).filter_by(recipient="a@example.com").one().status == "sent"
+
+    # Not due yet, so the next poll leaves it alone
+    assert process_batch(db, send=pool.send) == 0
+
+    failed.next_attempt_at = before
+    db.commit()
+    inbox.refuse.clear()
+    assert process_batch(db, send=pool.send) == 1
+    db.refresh(failed)
+    assert (failed.status, failed.attempts, failed.last_error) == ("sent", 2, None)
+    assert inbox.delivered == ["a@example.com", "b@example.com"]
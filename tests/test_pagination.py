@@ -0,0 +1,85 @@
+from datetime import date, time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api import appointments
+from app.core.pagination import decode_cursor, encode_cursor
+from app.db.session import get_db
+from tests.factories import add_appointment, add_patient, add_service
+
+
+def test_cursor_round_trips_its_sort_key():
+    cursor = encode_cursor([date(2025, 3, 14), 42])
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ["2025-03-14", 42]
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "%%%", "eyJhIjogMX0"])
+def test_malformed_cursor_is_rejected(cursor):
+    # The last one is valid base64 JSON, but an object rather than a list
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+@pytest.fixture
+def client(db):
+    app = FastAPI()
+    app.include_router(appointments.router, prefix="/appointments")
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+@pytest.fixture
+def booked(db):
+    """Seven appointments over three days, so the date sort key ties within each day."""
+    service = add_service(db)
+    ada, bob = add_patient(db, "Ada"), add_patient(db, "Bob", "bob@example.com")
+    days = [date(2025, 3, 12)] * 2 + [date(2025, 3, 13)] * 3 + [date(2025, 3, 14)] * 2
+    return [
+        add_appointment(db, ada if i % 2 else bob, service, day, time(9 + i), time(9 + i, 30),
+                        status="cancelled" if i == 3 else "confirmed")
+        for i, day in enumerate(days)
+    ]
+
+
+def _walk(client, limit, **params):
+    ids, cursor, pages = [], None, 0
+    while True:
+        response = client.get("/appointments/", params={"limit": limit, "cursor": cursor, **params})
+        assert response.status_code == 200
+        body = response.json()
+        ids += [item["id"] for item in body["items"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 7])
+def test_pages_cover_every_row_once_across_ties(client, booked, limit):
+    ids, pages = _walk(client, limit)
+
+    expected = [a.id for a in sorted(booked, key=lambda a: (a.appointment_date, a.id), reverse=True)]
+    assert ids == expected
+    assert pages == -(-len(booked) // limit)
+
+
+def test_filters_apply_on_every_page(client, booked):
+    ada_id = booked[1].patient_id
+    ids, _ = _walk(client, 1, status="confirmed", patient_id=ada_id, date_from="2025-03-13")
+
+    assert ids == [
+        a.id for a in reversed(booked)
+        if a.status == "confirmed" and a.patient_id == ada_id and a.appointment_date >= date(2025, 3, 13)
+    ]
+
+
+@pytest.mark.parametrize("cursor", ["garbage", encode_cursor([1]), encode_cursor(["soon", 1])])
+def test_malformed_cursor_returns_400(client, booked, cursor):
+    response = client.get("/appointments/", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
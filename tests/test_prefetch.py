@@ -0,0 +1,84 @@
+import time
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from app.agent import prefetch
+from app.agent.prefetch import Prefetcher, predict
+from app.core.telemetry import current_turn, turn_trace
+
+TODAY = date(2025, 3, 10)  # a Monday
+
+
+def test_phone_number_predicts_a_patient_lookup():
+    predictions = predict("hi, my number is +1 (555) 123-4567", {}, [], TODAY)
+
+    assert predictions == [("lookup_patient", ("+1 (555) 123-4567", "15551234567", "+15551234567"))]
+
+
+def test_known_phone_number_is_not_looked_up_again():
+    assert predict("it's 555 123 4567", {"phone_number": "5551234567"}, [], TODAY) == []
+
+
+def test_date_and_named_service_predict_availability():
+    history = [{"role": "user", "content": "I need a follow-up"}, {"role": "assistant", "content": "Sure, which day?"}]
+
+    assert predict("friday please", {}, history, TODAY) == [("check_availability", (date(2025, 3, 14), 2))]
+    assert predict("2025-03-12 for a lab review", {}, [], TODAY) == [("check_availability", (date(2025, 3, 12), 3))]
+
+
+def test_date_without_a_service_predicts_nothing():
+    assert predict("is friday open?", {}, [], TODAY) == []
+
+
+@pytest.fixture
+def loader(monkeypatch):
+    """Fake check_availability loader: sleeps `delay` and records the turn it ran in."""
+    fake = SimpleNamespace(delay=0.0, calls=[])
+
+    def check_availability(day, service_type_id):
+        fake.calls.append(current_turn())
+        time.sleep(fake.delay)
+        return {(day.isoformat(), service_type_id): ["09:00", "09:30"]}
+
+    monkeypatch.setattr(prefetch, "PREFETCH_ENABLED", True)
+    monkeypatch.setattr(prefetch, "predict", lambda *args: [("check_availability", (date(2025, 3, 14), 2))])
+    monkeypatch.setitem(prefetch._LOADERS, "check_availability", check_availability)
+    return fake
+
+
+def test_take_serves_a_matching_prefetch(loader):
+    with turn_trace("s-1") as turn:
+        warm = Prefetcher.start("friday, follow-up", {}, [])
+        slots = warm.take("check_availability", ("2025-03-14", 2), lambda: pytest.fail("ran live"))
+        warm.finish(turn)
+
+    assert slots == ["09:00", "09:30"]
+    # The read ran in the turn's context, so its DB time lands on the turn
+    assert loader.calls == [turn]
+    assert turn.attributes["prefetch"]["hits"] == ["check_availability"]
+    assert turn.attributes["prefetch"]["wasted"] == []
+
+
+def test_a_wrong_guess_runs_live_without_waiting(loader):
+    loader.delay = 0.5
+    warm = Prefetcher.start("friday, follow-up", {}, [])
+
+    started = time.monotonic()
+    slots = warm.take("check_availability", ("2025-03-14", 3), lambda: ["live"])
+
+    assert slots == ["live"]
+    assert time.monotonic() - started < 0.2
+    assert warm.hits == []
+
+
+def test_unused_prefetch_is_counted_as_wasted(loader):
+    with turn_trace("s-1") as turn:
+        warm = Prefetcher.start("friday, follow-up", {}, [])
+        warm.finish(turn)
+
+    assert turn.attributes["prefetch"]["wasted"] == ["check_availability"]
+    assert turn.attributes["prefetch"]["hits"] == []
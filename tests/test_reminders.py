@@ -0,0 +1,59 @@
+from datetime import date, time, timedelta
+
+from sqlalchemy import text
+
+from app.db import models
+from app.db.database import SessionLocal
+from app.services.reminder_service import REMINDER_LOCK_KEY, enqueue_reminders
+from tests.factories import add_appointment, add_patient, add_service
+
+TOMORROW = date.today() + timedelta(days=1)
+
+
+def _reminders(db):
+    return db.query(models.Notification).filter_by(kind="reminder").order_by(models.Notification.id).all()
+
+
+def test_only_tomorrows_confirmed_appointments_are_reminded(db):
+    service = add_service(db)
+    ada = add_patient(db, "Ada", "ada@example.com")
+    due = add_appointment(db, ada, service, TOMORROW, time(9), time(9, 30))
+    add_appointment(db, ada, service, TOMORROW, time(10), time(10, 30), status="pending")
+    add_appointment(db, ada, service, TOMORROW, time(11), time(11, 30), status="cancelled")
+    add_appointment(db, ada, service, TOMORROW + timedelta(days=1), time(9), time(9, 30))
+    add_appointment(db, add_patient(db, "No Email", None), service, TOMORROW, time(12), time(12, 30))
+
+    assert enqueue_reminders(db) == 1
+
+    [reminder] = _reminders(db)
+    assert (reminder.appointment_id, reminder.recipient, reminder.status) == (due.id, "ada@example.com", "pending")
+    assert reminder.message == f"{TOMORROW.isoformat()} at 09:00"
+
+
+def test_a_second_pass_queues_nothing_new(db):
+    service = add_service(db)
+    ada = add_patient(db)
+    first = add_appointment(db, ada, service, TOMORROW, time(9), time(9, 30))
+    # A confirmation for the same appointment is not a reminder and does not collide
+    db.add(models.Notification(appointment_id=first.id, channel="email", recipient="ada@example.com", message="x"))
+    db.commit()
+
+    assert enqueue_reminders(db) == 1
+    assert enqueue_reminders(db) == 0
+
+    later = add_appointment(db, ada, service, TOMORROW, time(14), time(14, 30))
+    assert enqueue_reminders(db) == 1
+    assert [n.appointment_id for n in _reminders(db)] == [first.id, later.id]
+
+
+def test_pass_is_skipped_while_another_worker_holds_the_lock(db):
+    add_appointment(db, add_patient(db), add_service(db), TOMORROW, time(9), time(9, 30))
+    other = SessionLocal()
+    try:
+        other.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": REMINDER_LOCK_KEY})
+        assert enqueue_reminders(db) is None
+    finally:
+        other.rollback()
+        other.close()
+
+    assert enqueue_reminders(db) == 1
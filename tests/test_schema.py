@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import Column, String, inspect, text
+
+from app.db import models
+from app.db.session import _add_column_ddl, _add_missing_columns
+
+
+def test_not_null_column_is_added_with_its_server_default():
+    ddl = _add_column_ddl("notifications", models.Notification.__table__.c.attempts)
+
+    assert ddl.endswith("attempts INTEGER DEFAULT '0' NOT NULL")
+
+
+def test_nullable_column_stays_nullable():
+    assert "NOT NULL" not in _add_column_ddl("notifications", models.Notification.__table__.c.last_error)
+
+
+def test_not_null_column_without_a_server_default_is_refused():
+    column = Column("tier", String, nullable=False, default="basic")
+
+    with pytest.raises(RuntimeError, match="patients.tier"):
+        _add_column_ddl("patients", column)
+
+
+def test_existing_table_gains_the_column_as_declared(db, database):
+    db.add(models.Notification(channel="email", recipient="a@example.com", message="hi"))
+    db.commit()
+    db.close()
+    with database.begin() as conn:
+        conn.execute(text("ALTER TABLE notifications DROP COLUMN attempts"))
+
+    _add_missing_columns()
+
+    column = next(c for c in inspect(database).get_columns("notifications") if c["name"] == "attempts")
+    assert column["nullable"] is False
+    with database.connect() as conn:
+        assert conn.execute(text("SELECT attempts FROM notifications")).scalar_one() == 0
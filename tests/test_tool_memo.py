@@ -0,0 +1,63 @@
+from datetime import date, time
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("langchain")
+
+from app.agent import langchain_tools, tool_memo
+from app.agent.langchain_tools import get_langchain_tools
+from app.agent.tool_memo import ToolMemo
+from app.services import appointment_service
+
+
+@pytest.fixture
+def audit(monkeypatch):
+    logged = []
+    monkeypatch.setattr(appointment_service, "log_agent_action_service", lambda **kwargs: logged.append(kwargs))
+    return logged
+
+
+@pytest.fixture
+def db():
+    db = MagicMock()
+    appointment = SimpleNamespace(id=7, appointment_date=date(2025, 3, 14), start_time=time(9, 30))
+    db.query.return_value.filter.return_value.order_by.return_value.all.return_value = [appointment]
+    return db
+
+
+def _tool(db, session_state, monkeypatch, name):
+    memo = ToolMemo()
+    monkeypatch.setattr(langchain_tools, "get_tool_memo", lambda: memo)
+    tools = get_langchain_tools(db=db, session_state=session_state, session_id="s-1")
+    return next(t for t in tools if t.name == name)
+
+
+def test_memo_hit_is_audited_like_a_database_read(monkeypatch, db, audit):
+    monkeypatch.setattr(tool_memo, "read_versions", lambda db, names: {name: 1 for name in names})
+    session_state = {}
+    tool = _tool(db, session_state, monkeypatch, "get_patient_appointments")
+
+    first = tool.func(patient_id=42)
+    session_state.clear()
+    second = tool.func(patient_id=42)
+
+    assert first == second == {"appointments": [{"id": 7, "date": "2025-03-14", "time": "09:30"}]}
+    assert db.query.call_count == 1
+    assert [(e["patient_id"], e["agent_action"]) for e in audit] == [(42, "DATA_RETRIEVAL")] * 2
+    assert "session memo" in audit[1]["system_decision"]
+    assert session_state["pending_appointments"] == first["appointments"]
+
+
+def test_write_to_the_patient_recomputes(monkeypatch, db, audit):
+    versions = {"patient:42": 1}
+    monkeypatch.setattr(tool_memo, "read_versions", lambda db, names: {name: versions[name] for name in names})
+    tool = _tool(db, {}, monkeypatch, "get_patient_appointments")
+
+    tool.func(patient_id=42)
+    versions["patient:42"] = 2
+    tool.func(patient_id=42)
+
+    assert db.query.call_count == 2
+    assert all("(database)" in e["system_decision"] for e in audit)
@@ -0,0 +1,118 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+
+from app.db import models
+from app.services import waitlist_service
+from app.services.waitlist_service import expire_waitlist, offer_freed_slot
+from tests.factories import add_appointment, add_patient, add_service
+
+DAY = date.today() + timedelta(days=3)
+
+
+@pytest.fixture
+def freed(db):
+    """A cancelled 09:00-09:30 follow-up on DAY, ready to be offered."""
+    follow_up = add_service(db, "Follow-up", 30)
+    owner = add_patient(db, "Owner", "owner@example.com")
+    return add_appointment(db, owner, follow_up, DAY, time(9, 0), time(9, 30), status="cancelled")
+
+
+def _wait(db, service, date_from=DAY, date_to=DAY, preferred=(None, None), name="Waiting", email="wait@example.com"):
+    entry = models.WaitlistEntry(
+        patient_id=add_patient(db, name, email).id,
+        service_type_id=service.id,
+        date_from=date_from,
+        date_to=date_to,
+        preferred_start=preferred[0],
+        preferred_end=preferred[1],
+        status="waiting",
+    )
+    db.add(entry)
+    db.commit()
+    return entry
+
+
+def test_oldest_matching_entry_gets_the_offer(db, freed):
+    first = _wait(db, freed.service_type, name="First", email="first@example.com")
+    second = _wait(db, freed.service_type, name="Second", email="second@example.com")
+
+    assert offer_freed_slot(db, freed).id == first.id
+
+    db.refresh(first)
+    db.refresh(second)
+    assert (first.status, first.offered_date, first.offered_time) == ("offered", DAY, time(9, 0))
+    assert first.offered_at is not None
+    assert second.status == "waiting"
+    offer = db.query(models.Notification).one()
+    assert (offer.kind, offer.recipient) == ("waitlist_offer", "first@example.com")
+
+
+def test_window_must_cover_the_freed_day(db, freed):
+    _wait(db, freed.service_type, date_from=DAY + timedelta(days=1), date_to=DAY + timedelta(days=5))
+    assert offer_freed_slot(db, freed) is None
+
+    covering = _wait(db, freed.service_type, date_from=DAY - timedelta(days=2), date_to=DAY, email="c@example.com")
+    assert offer_freed_slot(db, freed).id == covering.id
+
+
+def test_service_must_fit_the_freed_interval(db, freed):
+    _wait(db, add_service(db, "Initial Consultation", 60))
+    assert offer_freed_slot(db, freed) is None
+
+
+@pytest.mark.parametrize("preferred, offered", [
+    ((time(14, 0), time(15, 0)), False),
+    ((time(9, 30), time(10, 30)), False),  # touching is not overlapping
+    ((time(8, 15), time(9, 15)), True),
+    ((time(9, 10), time(9, 20)), True),
+])
+def test_preferred_window_must_overlap(db, freed, preferred, offered):
+    _wait(db, freed.service_type, preferred=preferred)
+    assert (offer_freed_slot(db, freed) is not None) == offered
+
+
+def test_cancelling_patient_and_patients_without_email_are_skipped(db, freed):
+    own = models.WaitlistEntry(
+        patient_id=freed.patient_id, service_type_id=freed.service_type_id,
+        date_from=DAY, date_to=DAY, status="waiting",
+    )
+    db.add(own)
+    db.commit()
+    _wait(db, freed.service_type, email=None)
+
+    assert offer_freed_slot(db, freed) is None
+
+
+def _offer(db, entry, hours_ago):
+    entry.status = "offered"
+    entry.offered_date = DAY
+    entry.offered_time = time(9, 0)
+    entry.offered_at = datetime.now(timezone.utc) - timedelta(hours=hours_ago)
+    db.commit()
+
+
+def test_expiry_closes_past_windows_and_requeues_stale_offers(db, monkeypatch):
+    monkeypatch.setattr(waitlist_service, "WAITLIST_OFFER_TTL_HOURS", 24)
+    service = add_service(db)
+    today = date.today()
+    past = _wait(db, service, today - timedelta(days=5), today - timedelta(days=1), email="past@example.com")
+    past_offer = _wait(db, service, today - timedelta(days=5), today - timedelta(days=1), email="po@example.com")
+    _offer(db, past_offer, hours_ago=1)
+    stale = _wait(db, service, email="stale@example.com")
+    _offer(db, stale, hours_ago=30)
+    fresh = _wait(db, service, email="fresh@example.com")
+    _offer(db, fresh, hours_ago=2)
+    booked = _wait(db, service, email="booked@example.com")
+    _offer(db, booked, hours_ago=30)
+    add_appointment(db, booked.patient, service, DAY, time(9, 0), time(9, 30))
+
+    assert expire_waitlist(db, today) == {"expired": 2, "requeued": 1}
+
+    for entry in (past, past_offer, stale, fresh, booked):
+        db.refresh(entry)
+    assert past.status == past_offer.status == "expired"
+    assert (stale.status, stale.offered_date, stale.offered_at) == ("waiting", None, None)
+    assert fresh.status == "offered"
+    # Took the slot it was offered; nothing to requeue
+    assert booked.status == "offered"